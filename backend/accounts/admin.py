@@ -3,7 +3,7 @@ from .models import (
     Concept, TeachingAtom, Question, StudentProgress,
     LearningSession, LearningProfile, UserXP,
     TeacherProfile, TeacherContent, QuestionApproval,
-    TeacherOverride, TeacherGoal,
+    TeacherOverride, TeacherGoal, QuestionResponse,
 )
 
 
@@ -68,3 +68,4 @@ admin.site.register(TeacherContent)
 admin.site.register(QuestionApproval)
 admin.site.register(TeacherOverride)
 admin.site.register(TeacherGoal)
+admin.site.register(QuestionResponse)
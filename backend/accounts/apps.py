@@ -3,3 +3,50 @@ from django.apps import AppConfig
 
 class AccountsConfig(AppConfig):
     name = 'accounts'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_init, post_save
+
+        from . import autocomplete, goals, http_cache, mastery_cache, near_duplicates, question_bank
+        from . import resource_cache  # noqa: F401  (registers its job handlers)
+
+        post_save.connect(autocomplete.on_concept_saved, sender='accounts.Concept',
+                          dispatch_uid='accounts_autocomplete_concept_saved')
+        post_save.connect(near_duplicates.on_question_saved, sender='accounts.Question',
+                          dispatch_uid='accounts_near_duplicates_question_saved')
+        post_delete.connect(near_duplicates.on_question_deleted, sender='accounts.Question',
+                            dispatch_uid='accounts_near_duplicates_question_deleted')
+        for model in ('accounts.Question', 'accounts.QuestionApproval'):
+            post_save.connect(question_bank.on_question_changed, sender=model,
+                              dispatch_uid=f'accounts_question_bank_saved_{model}')
+            post_delete.connect(question_bank.on_question_changed, sender=model,
+                                dispatch_uid=f'accounts_question_bank_deleted_{model}')
+        for model in ('accounts.StudentProgress', 'accounts.LearningSession', 'accounts.LearningProfile',
+                      'accounts.UserXP'):
+            post_save.connect(http_cache.on_user_data_changed, sender=model,
+                              dispatch_uid=f'accounts_http_cache_saved_{model}')
+            post_delete.connect(http_cache.on_user_data_changed, sender=model,
+                                dispatch_uid=f'accounts_http_cache_deleted_{model}')
+        for model in ('accounts.Concept', 'accounts.TeachingAtom'):
+            post_save.connect(http_cache.on_content_changed, sender=model,
+                              dispatch_uid=f'accounts_http_cache_saved_{model}')
+            post_delete.connect(http_cache.on_content_changed, sender=model,
+                                dispatch_uid=f'accounts_http_cache_deleted_{model}')
+        post_save.connect(http_cache.on_user_changed, sender='auth.User', dispatch_uid='accounts_http_cache_user_saved')
+        for model in ('auth.User', 'accounts.UserXP'):
+            post_init.connect(http_cache.remember_ranked_values, sender=model,
+                              dispatch_uid=f'accounts_http_cache_loaded_{model}')
+        post_save.connect(mastery_cache.on_progress_saved, sender='accounts.StudentProgress',
+                          dispatch_uid='accounts_mastery_cache_progress_saved')
+        post_delete.connect(mastery_cache.on_progress_deleted, sender='accounts.StudentProgress',
+                            dispatch_uid='accounts_mastery_cache_progress_deleted')
+        post_save.connect(mastery_cache.on_atom_changed, sender='accounts.TeachingAtom',
+                          dispatch_uid='accounts_mastery_cache_atom_saved')
+        post_delete.connect(mastery_cache.on_atom_changed, sender='accounts.TeachingAtom',
+                            dispatch_uid='accounts_mastery_cache_atom_deleted')
+        post_delete.connect(mastery_cache.on_concept_deleted, sender='accounts.Concept',
+                            dispatch_uid='accounts_mastery_cache_concept_deleted')
+        post_save.connect(goals.on_goal_changed, sender='accounts.TeacherGoal',
+                          dispatch_uid='accounts_goals_goal_saved')
+        post_delete.connect(goals.on_goal_changed, sender='accounts.TeacherGoal',
+                            dispatch_uid='accounts_goals_goal_deleted')
@@ -0,0 +1,253 @@
+# backend/accounts/autocomplete.py
+# In-process autocomplete for SuggestSubjectsView / SuggestConceptsView.
+#   - word-prefix trie: every word start of every term, capped ids per node
+#   - trigram map: infix and typo-tolerant matches ("algoritm" → "Algorithms")
+#   - per-user boost: subjects / concepts the user created rank first
+# Built from POPULAR_SUBJECTS, FALLBACK_CONCEPTS and the Concept table on first use,
+# kept current by a Concept post_save hook (apps.py, applied on commit) and caught up with new Concept
+# rows every REFRESH_INTERVAL so concepts created by other worker processes show up too.
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+NODE_CAP = 48              # term ids kept per trie node
+MAX_PREFIX_DEPTH = 24      # characters indexed from each word start
+MAX_TERMS = 50_000         # per namespace; further additions are dropped
+MIN_SIMILARITY = 0.3       # trigram Jaccard needed for a fuzzy match
+REFRESH_INTERVAL = 60      # seconds
+
+RANK_DB = 0
+RANK_CURATED = 1
+
+
+def normalize(text: str) -> str:
+    return ' '.join((text or '').lower().split())
+
+
+def trigrams(text: str) -> set:
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# ════════════════════════════════════════════════════════════════
+#  ONE NAMESPACE (all subjects, or the concepts of one subject)
+# ════════════════════════════════════════════════════════════════
+
+class TermIndex:
+    """Trie + trigram index over a set of display strings, deduplicated case-insensitively."""
+
+    def __init__(self, alphabetical: bool = True):
+        # alphabetical=False keeps insertion order as the tie-break (curated concept
+        # lists are ordered fundamentals → advanced)
+        self.alphabetical = alphabetical
+        self.terms: List[str] = []
+        self.keys: List[str] = []
+        self.ranks: List[int] = []
+        self.ids: Dict[str, int] = {}
+        self.trie = ({}, [])            # node = (children, term ids)
+        self.grams: Dict[str, List[int]] = defaultdict(list)
+        self._default_order: Optional[List[int]] = None
+
+    def __len__(self):
+        return len(self.terms)
+
+    def add(self, term: str, rank: int = RANK_CURATED) -> Optional[int]:
+        term = (term or '').strip()
+        key = normalize(term)
+        if not key:
+            return None
+        tid = self.ids.get(key)
+        if tid is not None:
+            if rank < self.ranks[tid]:
+                self.ranks[tid] = rank
+                self._default_order = None
+            return tid
+        if len(self.terms) >= MAX_TERMS:
+            return None
+
+        tid = len(self.terms)
+        self.terms.append(term)
+        self.keys.append(key)
+        self.ranks.append(rank)
+        self.ids[key] = tid
+        self._default_order = None
+
+        for start in range(len(key)):
+            if start and key[start - 1] != ' ':
+                continue
+            node = self.trie
+            for ch in key[start:start + MAX_PREFIX_DEPTH]:
+                node = node[0].setdefault(ch, ({}, []))
+                if len(node[1]) < NODE_CAP and tid not in node[1]:
+                    node[1].append(tid)
+        for gram in trigrams(key):
+            self.grams[gram].append(tid)
+        return tid
+
+    def _sort_key(self, tid):
+        return (self.ranks[tid], self.keys[tid] if self.alphabetical else tid)
+
+    def search(self, query: str, limit: int, boost: Iterable[str] = ()) -> List[str]:
+        q = normalize(query)
+        boosted = {self.ids[k] for k in boost if k in self.ids}
+
+        if not q:
+            if self._default_order is None:
+                self._default_order = sorted(range(len(self.terms)), key=self._sort_key)
+            head = sorted(boosted, key=self._sort_key)
+            rest = (tid for tid in self._default_order if tid not in boosted)
+            return [self.terms[tid] for tid in head + [t for _, t in zip(range(limit), rest)]][:limit]
+
+        # tier 0: whole term starts with q, 1: a later word does, 2: infix / fuzzy
+        scored = {}
+        node = self.trie
+        for ch in q[:MAX_PREFIX_DEPTH]:
+            node = node[0].get(ch)
+            if node is None:
+                break
+        else:
+            for tid in node[1]:
+                if self.keys[tid].startswith(q):
+                    scored[tid] = (0, 0.0)
+                elif f' {q}' in f' {self.keys[tid]}':
+                    scored[tid] = (1, 0.0)
+
+        if len(q) >= 3 and len(scored) < limit:
+            q_grams = trigrams(q)
+            shared = defaultdict(int)
+            for gram in q_grams:
+                for tid in self.grams.get(gram, ()):
+                    shared[tid] += 1
+            for tid, n in shared.items():
+                if tid in scored:
+                    continue
+                key = self.keys[tid]
+                similarity = n / (len(q_grams) + len(trigrams(key)) - n)
+                if q in key or similarity >= MIN_SIMILARITY:
+                    scored[tid] = (2, -similarity)
+
+        for tid in boosted:
+            if q in self.keys[tid]:
+                scored[tid] = (-1, 0.0)
+
+        ranked = sorted(scored, key=lambda tid: (*scored[tid], *self._sort_key(tid)))
+        return [self.terms[tid] for tid in ranked[:limit]]
+
+
+# ════════════════════════════════════════════════════════════════
+#  SUBJECTS + PER-SUBJECT CONCEPTS
+# ════════════════════════════════════════════════════════════════
+
+class AutocompleteIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.subjects = TermIndex(alphabetical=True)
+        self.concepts: Dict[str, TermIndex] = {}
+        self.user_subjects: Dict[int, set] = defaultdict(set)
+        self.user_concepts: Dict[tuple, set] = defaultdict(set)
+        self.last_concept_id = 0
+        self.refreshed_at = 0.0
+
+    def add_subject(self, subject: str, user_id: Optional[int] = None):
+        # subjects have no source ranking: the user's own first, then alphabetical
+        with self._lock:
+            self.subjects.add(subject)
+            if user_id:
+                self.user_subjects[user_id].add(normalize(subject))
+
+    def add_concepts(self, subject: str, names: Iterable[str], rank: int = RANK_CURATED,
+                     user_id: Optional[int] = None):
+        subject_key = normalize(subject)
+        if not subject_key:
+            return
+        with self._lock:
+            index = self.concepts.get(subject_key)
+            if index is None:
+                index = self.concepts[subject_key] = TermIndex(alphabetical=False)
+            for name in names:
+                index.add(name, rank)
+                if user_id:
+                    self.user_concepts[(user_id, subject_key)].add(normalize(name))
+
+    def add_concept(self, subject: str, name: str, user_id: Optional[int] = None):
+        """A Concept row was saved."""
+        self.add_subject(subject, user_id)
+        self.add_concepts(subject, [name], RANK_DB, user_id)
+
+    def suggest_subjects(self, query: str, user_id: Optional[int] = None, limit: int = 20) -> List[str]:
+        return self.subjects.search(query, limit, self.user_subjects.get(user_id, ()))
+
+    def suggest_concepts(self, subject: str, query: str, user_id: Optional[int] = None,
+                         limit: int = 15) -> List[str]:
+        subject_key = normalize(subject)
+        index = self.concepts.get(subject_key)
+        if index is None:
+            return []
+        return index.search(query, limit, self.user_concepts.get((user_id, subject_key), ()))
+
+
+def build_index(popular_subjects: Iterable[str], fallback_concepts: Dict[str, List[str]]) -> AutocompleteIndex:
+    index = AutocompleteIndex()
+    refresh_from_db(index)
+    for subject in popular_subjects:
+        index.add_subject(subject)
+    for subject_key, names in fallback_concepts.items():
+        index.add_concepts(subject_key, names)
+    return index
+
+
+def refresh_from_db(index: AutocompleteIndex):
+    """Add Concept rows created since the last refresh (ids only grow)."""
+    from .models import Concept
+
+    rows = (Concept.objects.filter(id__gt=index.last_concept_id)
+            .order_by('id').values_list('id', 'subject', 'name', 'created_by_id'))
+    for concept_id, subject, name, user_id in rows.iterator():
+        index.add_concept(subject, name, user_id)
+        index.last_concept_id = concept_id
+    index.refreshed_at = time.time()
+
+
+_index: Optional[AutocompleteIndex] = None
+_build_lock = threading.Lock()
+
+
+def get_index(popular_subjects, fallback_concepts) -> AutocompleteIndex:
+    """Process-wide index; built on first use, caught up with the DB every REFRESH_INTERVAL."""
+    global _index
+    index = _index
+    if index is None:
+        with _build_lock:
+            if _index is None:
+                started = time.perf_counter()
+                _index = build_index(popular_subjects, fallback_concepts)
+                logger.debug(f"Autocomplete index built in {(time.perf_counter() - started) * 1000:.1f} ms "
+                             f"({len(_index.subjects)} subjects, {len(_index.concepts)} concept lists)")
+            return _index
+    # Other requests keep using the current index while one of them refreshes it
+    if time.time() - index.refreshed_at >= REFRESH_INTERVAL and _build_lock.acquire(blocking=False):
+        try:
+            refresh_from_db(index)
+        finally:
+            _build_lock.release()
+    return index
+
+
+def on_concept_saved(sender, instance, created, **kwargs):
+    """post_save hook: make new concepts searchable (once committed) without waiting for a refresh."""
+    if not created:
+        return
+    subject, name, user_id = instance.subject, instance.name, instance.created_by_id
+
+    def add():
+        if _index is not None:
+            _index.add_concept(subject, name, user_id)
+    # a rolled-back concept must never be suggested
+    transaction.on_commit(add)
@@ -0,0 +1,146 @@
+# backend/accounts/diagnostic.py
+# The initial diagnostic quiz: grading one answer, and finishing the quiz —
+# AdaptiveLearningEngine.evaluate_initial_quiz over all answers, then every
+# write in one transaction:
+#   - LearningProfile theta
+#   - StudentProgress seeds for all of the concept's atoms: one INSERT OR IGNORE
+#     for missing rows, then set-based UPDATEs (first atom gets the capped
+#     diagnostic mastery and 'teaching', untouched atoms are reset); as with
+#     overrides.py, the UPDATEs skip post_save, so http_cache / mastery_cache
+#     are bumped / dropped here
+#   - the session's answers, evaluation and pacing history
+# Used by CompleteInitialQuizView (answers submitted one by one before) and
+# SubmitInitialQuizBatchView (the whole quiz in one request).
+
+from typing import Dict, List, Optional, Tuple
+
+from django.utils import timezone
+
+from core.sqlite import write_transaction
+from learning_engine.adaptive_flow import AdaptiveLearningEngine
+
+from . import http_cache, mastery_cache
+from .models import LearningProfile, StudentProgress, TeachingAtom
+
+FIRST_ATOM_MASTERY_CAP = 0.30
+
+FRIENDLY_PACING = {
+    'speed_up': 'Great start! You can move faster.',
+    'stay': 'Good start. Keep a steady pace.',
+    'slow_down': 'Take it slowly and build confidence.',
+    'sharp_slowdown': 'Focus on basics first; go step by step.',
+}
+
+
+def _as_int(value) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def grade(question: Dict, selected) -> Tuple[bool, Optional[int], Optional[int]]:
+    """(correct, selected index, correct index), both indexes compared as ints."""
+    selected_int = _as_int(selected)
+    correct_index = _as_int(question.get('correct_index'))
+    return selected_int is not None and selected_int == correct_index, selected_int, correct_index
+
+
+def explanation(question: Dict, correct_index: Optional[int]) -> str:
+    """Feedback for a wrong answer."""
+    options = question.get('options', [])
+    correct_option = options[correct_index] if correct_index is not None and 0 <= correct_index < len(options) else None
+    if correct_option:
+        return f"Correct answer: {correct_option}. It best matches the question focus."
+    return "Review the concept and try again."
+
+
+def seed_progress(user, concept, seeded_mastery: float, error_types: List[str]) -> int:
+    """
+    Diagnostic seeds for the concept's atoms (call inside a transaction).
+    The quiz assesses concept readiness, not per-atom mastery: only the first
+    atom gets a head start (capped), the others stay at 0 until learned.
+    """
+    atom_ids = list(TeachingAtom.objects.filter(concept=concept).order_by('order').values_list('id', flat=True))
+    if not atom_ids:
+        return 0
+    StudentProgress.objects.bulk_create([
+        StudentProgress(user=user, atom_id=atom_id, phase='not_started', mastery_score=0.0)
+        for atom_id in atom_ids
+    ], ignore_conflicts=True)
+    now = timezone.now()
+    rows = StudentProgress.objects.filter(user=user, atom_id__in=atom_ids)
+    rows.filter(atom_id=atom_ids[0]).update(
+        mastery_score=min(float(seeded_mastery), FIRST_ATOM_MASTERY_CAP), phase='teaching',
+        error_history=error_types, last_practiced=now,
+    )
+    rows.exclude(atom_id=atom_ids[0]).filter(phase__in=('diagnostic', 'not_started')).update(
+        mastery_score=0.0, phase='not_started', error_history=error_types, last_practiced=now,
+    )
+    rows.exclude(atom_id=atom_ids[0]).exclude(phase__in=('diagnostic', 'not_started')).update(
+        error_history=error_types, last_practiced=now,
+    )
+    http_cache.bump(http_cache.user_key(user.id))
+    mastery_cache.forget((user.id, atom_id) for atom_id in atom_ids)
+    return len(atom_ids)
+
+
+def finish(user, session, answers: List[Dict]) -> Dict:
+    """Evaluate the answered quiz, store the outcome, and return the completion payload."""
+    questions = session.session_data.get('initial_quiz_questions', [])
+    profile, _ = LearningProfile.objects.get_or_create(user=user)
+
+    evaluation = AdaptiveLearningEngine().evaluate_initial_quiz(
+        quiz_questions=questions,
+        quiz_answers=answers,
+        knowledge_level=session.knowledge_level,
+        current_theta=profile.overall_theta,
+    )
+    seeded_mastery = evaluation['mastery']
+    updated_theta = evaluation['theta']
+    pacing = evaluation['pacing']
+    next_step = evaluation['next_step']
+    adjusted_level = evaluation['adjusted_knowledge_level']
+
+    # answers submitted in one batch get their running values from this pass
+    metrics = {m['question_index']: m for m in evaluation['per_question_metrics']}
+    for answer in answers:
+        for field in ('error_type', 'mastery_after', 'theta_after'):
+            answer.setdefault(field, metrics.get(answer.get('question_index'), {}).get(field))
+
+    session_data = session.session_data or {}
+    session_data['initial_quiz_answers'] = answers
+    session_data['pacing_history'] = session_data.get('pacing_history', []) + [{
+        'phase': 'initial_quiz',
+        'pacing': pacing,
+        'accuracy': evaluation['accuracy'],
+        'mastery': seeded_mastery,
+        'theta': updated_theta,
+        'next_step': next_step,
+        'timestamp': str(timezone.now()),
+    }]
+    session_data['initial_quiz_evaluation'] = evaluation
+    session_data['current_phase'] = 'teaching'
+    session.session_data = session_data
+    session.knowledge_level = adjusted_level
+
+    with write_transaction():
+        profile.overall_theta = updated_theta
+        profile.save()
+        seed_progress(user, session.concept, seeded_mastery, evaluation.get('error_types', []))
+        session.save()
+
+    return {
+        'accuracy': evaluation['accuracy'],
+        'mastery': seeded_mastery,
+        'theta': updated_theta,
+        'initial_pacing': pacing,
+        'next_step': next_step,
+        'next_step_message': evaluation['next_step_message'],
+        'adjusted_knowledge_level': adjusted_level,
+        'error_analysis': evaluation['error_analysis'],
+        'mastery_verdict': evaluation.get('mastery_verdict', ''),
+        'recommended_difficulty': evaluation.get('recommended_difficulty', 'medium'),
+        'reasoning': evaluation.get('reasoning', ''),
+        'recommendation': FRIENDLY_PACING.get(pacing, 'Learn at your own pace'),
+    }
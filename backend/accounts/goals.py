@@ -0,0 +1,136 @@
+# backend/accounts/goals.py
+# TeacherGoal evaluation: for every active goal, the fraction of its targeted
+# students whose mastery on the goal's concept has reached target_mastery.
+#   - a student's concept mastery is the mean over the concept's atoms, atoms
+#     never started counting as 0 (same as the progress dashboard)
+#   - one grouped SUM over StudentProgress for all goal concepts at once, plus
+#     an atom count per concept and the class roster size: a fixed handful of
+#     queries however many goals and students there are
+#   - class-wide goals target every student (non-staff users without a teacher
+#     or parent profile); the others target their one student
+# evaluate_goals (management command, run from cron) applies transitions in
+# bulk — active → completed when every targeted student is there, active →
+# overdue once the deadline has passed — and refreshes each teacher's cached
+# summary, which the teacher dashboard reads. Goal edits drop the teacher's
+# summary (post_save / post_delete, see apps.py).
+
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import models
+from django.utils import timezone
+
+from core.sqlite import write_transaction
+
+from .models import StudentProgress, TeacherGoal, TeachingAtom
+
+GOAL_SUMMARY_TTL = 300   # seconds; progress changes show up at the latest after this
+
+
+def summary_key(teacher_id) -> str:
+    return f'goal-summary:{teacher_id}'
+
+
+def student_roster():
+    return User.objects.filter(is_staff=False, is_superuser=False,
+                               teacher_profile__isnull=True, parent_profile__isnull=True)
+
+
+def evaluate(goals: Iterable[TeacherGoal]) -> Dict[int, Dict]:
+    """goal id → {'targeted', 'reached', 'attainment'} for goals with a concept (others: attainment None)."""
+    goals = list(goals)
+    concept_ids = {g.concept_id for g in goals if g.concept_id}
+    atom_counts = dict(
+        TeachingAtom.objects.filter(concept_id__in=concept_ids)
+        .values_list('concept_id').annotate(n=models.Count('id'))
+    )
+    # concept id → {student id: sum of mastery over the concept's atoms}
+    totals: Dict[int, Dict[int, float]] = defaultdict(dict)
+    rows = (StudentProgress.objects.filter(atom__concept_id__in=concept_ids, user__in=student_roster())
+            .values_list('atom__concept_id', 'user_id').annotate(total=models.Sum('mastery_score')))
+    for concept_id, user_id, total in rows:
+        totals[concept_id][user_id] = total or 0.0
+    class_size = student_roster().count() if any(g.is_class_wide for g in goals) else 0
+
+    results = {}
+    for goal in goals:
+        atoms = atom_counts.get(goal.concept_id, 0)
+        if not goal.concept_id or not atoms:
+            results[goal.id] = {'targeted': 0, 'reached': 0, 'attainment': None}
+            continue
+        threshold = goal.target_mastery * atoms - 1e-9
+        by_student = totals.get(goal.concept_id, {})
+        if goal.is_class_wide:
+            targeted = class_size
+            reached = sum(1 for total in by_student.values() if total >= threshold)
+        elif goal.student_id:
+            targeted = 1
+            reached = int(by_student.get(goal.student_id, 0.0) >= threshold)
+        else:
+            targeted = reached = 0
+        results[goal.id] = {
+            'targeted': targeted,
+            'reached': reached,
+            'attainment': round(reached / targeted, 3) if targeted else None,
+        }
+    return results
+
+
+def _summary(goals: List[TeacherGoal], results: Dict[int, Dict]) -> Dict:
+    counts = defaultdict(int)
+    for goal in goals:
+        counts[goal.status] += 1
+    return {
+        'evaluated_at': time.time(),
+        'status_counts': dict(counts),
+        'goals': [{
+            'id': goal.id,
+            'title': goal.title,
+            'concept_id': goal.concept_id,
+            'is_class_wide': goal.is_class_wide,
+            'status': goal.status,
+            'deadline': goal.deadline,
+            'target_mastery': goal.target_mastery,
+            **results.get(goal.id, {'targeted': 0, 'reached': 0, 'attainment': None}),
+        } for goal in goals if goal.status == 'active'],
+    }
+
+
+def teacher_summary(teacher_id: int) -> Dict:
+    """Cached attainment of the teacher's active goals (evaluated on a miss, no transitions)."""
+    summary = cache.get(summary_key(teacher_id))
+    if summary is None:
+        goals = list(TeacherGoal.objects.filter(teacher_id=teacher_id).exclude(status='cancelled'))
+        summary = _summary(goals, evaluate(g for g in goals if g.status == 'active'))
+        cache.set(summary_key(teacher_id), summary, GOAL_SUMMARY_TTL)
+    return summary
+
+
+def run_transitions(now=None) -> Dict[str, int]:
+    """
+    Evaluate every active goal, move finished ones to completed and expired
+    ones to overdue (one UPDATE each), then refresh every teacher's summary.
+    """
+    now = now or timezone.now()
+    active = list(TeacherGoal.objects.filter(status='active'))
+    results = evaluate(active)
+    # exact counts: the rounded attainment already reads 1.0 with 1 of 2000 students short
+    completed = {g.id for g in active if results[g.id]['reached'] == results[g.id]['targeted'] > 0}
+    overdue = {g.id for g in active if g.id not in completed and g.deadline is not None and g.deadline < now}
+    with write_transaction():
+        done = TeacherGoal.objects.filter(id__in=completed, status='active').update(status='completed')
+        late = TeacherGoal.objects.filter(id__in=overdue, status='active').update(status='overdue')
+
+    by_teacher = defaultdict(list)
+    for goal in TeacherGoal.objects.exclude(status='cancelled'):
+        by_teacher[goal.teacher_id].append(goal)
+    for teacher_id, goals in by_teacher.items():
+        cache.set(summary_key(teacher_id), _summary(goals, results), GOAL_SUMMARY_TTL)
+    return {'evaluated': len(active), 'completed': done, 'overdue': late}
+
+
+def on_goal_changed(sender, instance, **kwargs):
+    cache.delete(summary_key(instance.teacher_id))
@@ -0,0 +1,143 @@
+# backend/accounts/http_cache.py
+# Conditional GET for the polled dashboards (progress, parent insights, calendar,
+# velocity graph, leaderboard, XP).
+#   - DataVersion counters are bumped (post_save / post_delete, see apps.py) in
+#     the same transaction as the write they describe: 'user:<id>' for the
+#     user's progress, sessions, XP and profile; 'xp' when a total_xp or a
+#     displayed name actually changes (ranks); 'content' for concepts and atoms
+#   - a response's ETag is a hash of (view, requesting user, path, versions it
+#     depends on); If-None-Match → 304, otherwise the rendered data is cached
+#     under that ETag, so an unchanged dashboard costs one indexed lookup
+# Versions are read before the view body runs: a write landing in between can
+# only put newer data under an older tag, never older data under a newer one.
+
+import hashlib
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from django.core.cache import cache
+from django.db import connection
+from rest_framework.response import Response
+
+from .models import DataVersion
+
+RESPONSE_CACHE_TTL = 600   # seconds a rendered dashboard stays in the cache
+CACHE_CONTROL = 'private, no-cache'   # browsers keep the body but revalidate every time
+CLOCK_WINDOW = 300         # seconds; tag rollover for views with "today" / "last 7 days" figures
+
+
+def user_key(user_id) -> str:
+    return f'user:{user_id}'
+
+
+def bump(*keys: str) -> None:
+    """Increment the counters for keys (creating them at 1)."""
+    table = connection.ops.quote_name(DataVersion._meta.db_table)
+    key, version = connection.ops.quote_name('key'), connection.ops.quote_name('version')
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {table} ({key}, {version}) VALUES (%s, 1) '
+            f'ON CONFLICT ({key}) DO UPDATE SET {version} = {table}.{version} + 1',
+            [(k,) for k in keys],
+        )
+
+
+def versions(keys: Iterable[str]) -> Dict[str, int]:
+    keys = list(keys)
+    found = dict(DataVersion.objects.filter(key__in=keys).values_list('key', 'version'))
+    return {k: found.get(k, 0) for k in keys}
+
+
+# ════════════════════════════════════════════════════════════════
+#  SIGNAL HANDLERS
+# ════════════════════════════════════════════════════════════════
+
+# Fields whose change moves the global 'xp' views (leaderboard ranks, names on it)
+RANKED_FIELDS = {
+    'UserXP': ('total_xp',),
+    'User': ('username', 'first_name', 'last_name'),
+}
+
+
+def _ranked_values(instance):
+    # __dict__, not getattr: a deferred field must not cost a query here
+    return tuple(instance.__dict__.get(field) for field in RANKED_FIELDS[type(instance).__name__])
+
+
+def remember_ranked_values(sender, instance, **kwargs):
+    """post_init hook for User / UserXP: what was loaded, to tell real changes from re-saves."""
+    instance._ranked_as_loaded = _ranked_values(instance)
+
+
+def _ranked_values_changed(instance, created, update_fields) -> bool:
+    if created:
+        return True
+    if update_fields is not None and not set(update_fields) & set(RANKED_FIELDS[type(instance).__name__]):
+        return False
+    current = _ranked_values(instance)
+    changed = current != getattr(instance, '_ranked_as_loaded', None)
+    instance._ranked_as_loaded = current
+    return changed
+
+
+def on_user_data_changed(sender, instance, created=None, update_fields=None, **kwargs):
+    """StudentProgress / LearningSession / LearningProfile / UserXP saved or deleted."""
+    deleted = created is None   # post_delete has no `created`
+    if sender.__name__ == 'UserXP' and (deleted or _ranked_values_changed(instance, created, update_fields)):
+        bump(user_key(instance.user_id), 'xp')
+    else:
+        bump(user_key(instance.user_id))
+
+
+def on_user_changed(sender, instance, created=False, update_fields=None, **kwargs):
+    """Names show up on the leaderboard and in parent insights; logins and passwords don't."""
+    if _ranked_values_changed(instance, created, update_fields):
+        bump(user_key(instance.pk), 'xp')
+
+
+def on_content_changed(sender, instance, **kwargs):
+    bump('content')
+
+
+# ════════════════════════════════════════════════════════════════
+#  CONDITIONAL RESPONSES
+# ════════════════════════════════════════════════════════════════
+
+def etag_for(request, view_name: str, keys: Iterable[str], window: Optional[int] = None) -> str:
+    parts = [view_name, str(request.user.pk), request.get_full_path()]
+    parts += [f'{k}={v}' for k, v in sorted(versions(keys).items())]
+    if window:
+        parts.append(str(int(time.time() // window)))
+    return '"' + hashlib.blake2b('|'.join(parts).encode(), digest_size=16).hexdigest() + '"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison (RFC 9110 13.1.2): the compression middleware sends W/ tags
+    candidates = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    return '*' in candidates or etag in candidates
+
+
+def conditional_response(request, view_name: str, keys: Iterable[str], build: Callable[[], Response],
+                         window: Optional[int] = None) -> Response:
+    """
+    GET response whose data depends only on the DataVersion `keys` (and the
+    request path): 304 when the client has it, cached data when the server has
+    it, otherwise build() — cached only when it returns 200.
+
+    Call after authorization checks; the cache key does not re-check access.
+    """
+    etag = etag_for(request, view_name, keys, window)
+    if _matches(request.META.get('HTTP_IF_NONE_MATCH', ''), etag):
+        response = Response(status=304)
+    else:
+        data = cache.get(f'response:{etag}')
+        if data is not None:
+            response = Response(data)
+        else:
+            response = build()
+            if response.status_code != 200:
+                return response
+            cache.set(f'response:{etag}', response.data, RESPONSE_CACHE_TTL)
+    response['ETag'] = etag
+    response['Cache-Control'] = CACHE_CONTROL
+    return response
@@ -0,0 +1,155 @@
+# backend/accounts/item_params.py
+# Learned IRT parameters for stored questions.
+#   - calibrate(): batches of atoms → their QuestionResponse rows → joint 2PL fit
+#     (learning_engine/irt_calibration.py) → irt_a / irt_b stored on Question
+#   - ItemParameterTable: process-wide {question id: (a, b)} read by the answer
+#     path, so the online theta update uses learned parameters without a query
+# Students' recorded theta at answer time is the ability prior, which keeps the
+# fitted b on the same scale as LearningProfile.overall_theta.
+
+import logging
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from django.utils import timezone
+
+from core.sqlite import write_transaction
+from learning_engine.irt_calibration import fit_2pl
+from learning_engine.knowledge_tracing import ITEM_DIFFICULTY_PRIORS, ITEM_DISCRIMINATION_PRIORS
+
+from .models import Question, QuestionResponse
+
+logger = logging.getLogger(__name__)
+
+MIN_RESPONSES = 20         # responses before an item's fitted parameters are stored
+ATOM_BATCH_SIZE = 200      # atoms fitted together (their responses share student thetas)
+REFRESH_INTERVAL = 300     # seconds between catch-ups of the in-process table
+
+
+# ════════════════════════════════════════════════════════════════
+#  CALIBRATION
+# ════════════════════════════════════════════════════════════════
+
+def calibrate_atoms(atom_ids: Iterable[int], min_responses: int = MIN_RESPONSES) -> Dict[str, int]:
+    """Fit and store 2PL parameters for the questions of one batch of atoms."""
+    rows = list(
+        QuestionResponse.objects.filter(question__atom_id__in=list(atom_ids))
+        .values_list('user_id', 'question_id', 'correct', 'theta',
+                     'question__difficulty', 'question__cognitive_operation')
+    )
+    if not rows:
+        return {'responses': 0, 'items': 0, 'calibrated': 0}
+
+    user_ids, question_ids, correct, theta, difficulty, cognitive = zip(*rows)
+    users, students = np.unique(np.array(user_ids), return_inverse=True)
+    questions, items = np.unique(np.array(question_ids), return_inverse=True)
+
+    # Ability prior: each student's mean theta at answer time
+    answered = np.bincount(students, minlength=len(users))
+    theta_prior = np.bincount(students, np.array(theta, dtype=float), len(users)) / np.maximum(answered, 1)
+
+    labels = {}
+    for item, diff, cog in zip(items, difficulty, cognitive):
+        labels.setdefault(item, (diff, cog))
+    a_prior = np.array([ITEM_DISCRIMINATION_PRIORS.get(labels[i][1], 1.0) for i in range(len(questions))])
+    b_prior = np.array([ITEM_DIFFICULTY_PRIORS.get(labels[i][0], 0.0) for i in range(len(questions))])
+
+    fit = fit_2pl(students, items, np.array(correct, dtype=float), theta_prior, a_prior, b_prior)
+
+    now = timezone.now()
+    updates = [
+        Question(id=int(question_id), irt_a=round(float(a), 4), irt_b=round(float(b), 4),
+                 irt_responses=int(n), irt_calibrated_at=now)
+        for question_id, a, b, n in zip(questions, fit['a'], fit['b'], fit['responses'])
+        if n >= min_responses
+    ]
+    if updates:
+        with write_transaction():
+            Question.objects.bulk_update(updates, ['irt_a', 'irt_b', 'irt_responses', 'irt_calibrated_at'],
+                                         batch_size=500)
+        table = _table
+        if table is not None:
+            table.update((q.id, (q.irt_a, q.irt_b)) for q in updates)
+
+    return {'responses': len(rows), 'items': len(questions), 'calibrated': len(updates)}
+
+
+def calibrate(atom_ids: Optional[Iterable[int]] = None, batch_size: int = ATOM_BATCH_SIZE,
+              min_responses: int = MIN_RESPONSES) -> Dict[str, int]:
+    """Calibrate every atom with responses (or just atom_ids), batch_size atoms per fit."""
+    atoms = QuestionResponse.objects.values_list('question__atom_id', flat=True).distinct()
+    if atom_ids is not None:
+        atoms = atoms.filter(question__atom_id__in=list(atom_ids))
+    atoms = sorted(atoms)
+
+    totals = {'atoms': len(atoms), 'batches': 0, 'responses': 0, 'items': 0, 'calibrated': 0}
+    for start in range(0, len(atoms), batch_size):
+        batch = calibrate_atoms(atoms[start:start + batch_size], min_responses)
+        totals['batches'] += 1
+        for key in ('responses', 'items', 'calibrated'):
+            totals[key] += batch[key]
+    return totals
+
+
+# ════════════════════════════════════════════════════════════════
+#  IN-PROCESS PARAMETER TABLE
+# ════════════════════════════════════════════════════════════════
+
+class ItemParameterTable:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.params: Dict[int, Tuple[float, float]] = {}
+        self.loaded_until = None
+        self.refreshed_at = 0.0
+
+    def __len__(self):
+        return len(self.params)
+
+    def get(self, question_id) -> Optional[Tuple[float, float]]:
+        return self.params.get(question_id)
+
+    def update(self, items):
+        with self._lock:
+            self.params.update(items)
+
+    def refresh_from_db(self):
+        """Pick up questions calibrated since the last refresh (by any process)."""
+        started = timezone.now()
+        rows = Question.objects.filter(irt_a__isnull=False, irt_b__isnull=False)
+        if self.loaded_until is not None:
+            rows = rows.filter(irt_calibrated_at__gte=self.loaded_until)
+        self.update((qid, (a, b)) for qid, a, b in rows.values_list('id', 'irt_a', 'irt_b').iterator())
+        self.loaded_until = started
+        self.refreshed_at = time.time()
+
+
+_table: Optional[ItemParameterTable] = None
+_table_lock = threading.Lock()
+
+
+def get_table() -> ItemParameterTable:
+    global _table
+    table = _table
+    if table is None:
+        with _table_lock:
+            if _table is None:
+                table = ItemParameterTable()
+                table.refresh_from_db()
+                _table = table
+            return _table
+    if time.time() - table.refreshed_at >= REFRESH_INTERVAL and _table_lock.acquire(blocking=False):
+        try:
+            table.refresh_from_db()
+        finally:
+            _table_lock.release()
+    return table
+
+
+def with_item_parameters(question: Dict) -> Dict:
+    """Copy of a session question dict with its calibrated irt_a / irt_b, if any."""
+    params = get_table().get(question.get('id')) if question.get('id') else None
+    if params is None:
+        return question
+    return {**question, 'irt_a': params[0], 'irt_b': params[1]}
@@ -0,0 +1,191 @@
+# backend/accounts/jobs.py
+# Background jobs kept in the Job table: no broker, the database is the queue.
+#   - handlers register by name (@handler('resources.refresh')) and take the
+#     job's payload as keyword arguments; what they return is stored as result
+#   - enqueue() is one INSERT, so a job enqueued inside a transaction only
+#     exists if that transaction commits; an idempotency key makes a second
+#     enqueue while the first is queued or running return the same job
+#   - claiming: SELECT … FOR UPDATE SKIP LOCKED where the database has it
+#     (PostgreSQL); on SQLite a compare-and-set UPDATE on status, one statement,
+#     so two workers never get the same job and no read lock is upgraded
+#   - a claimed job holds a lease (JOB_LEASE); a worker that died mid-job
+#     loses it and the job is claimed again
+#   - failures retry with exponential backoff until max_attempts, then 'failed'
+# Runners: `manage.py run_workers` (threads, any number of processes), or with
+# JOB_RUNNER='thread' a few daemon threads in the web process itself, woken
+# when a job is enqueued.
+
+import logging
+import os
+import socket
+import threading
+import traceback
+from datetime import timedelta
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.sqlite import writer_lock
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+JOB_LEASE = timedelta(minutes=10)
+JOB_BACKOFF_BASE = 5        # seconds before the first retry, doubling per attempt
+JOB_BACKOFF_MAX = 600
+JOB_POLL_INTERVAL = 1.0     # seconds an idle worker sleeps between scans
+
+_handlers: Dict[str, Callable] = {}
+
+
+def handler(name: str):
+    """Register the decorated function as the handler for jobs called `name`."""
+    def register(func):
+        _handlers[name] = func
+        return func
+    return register
+
+
+def enqueue(name: str, payload: Dict = None, key: str = None, delay: float = 0, max_attempts: int = 3,
+            user=None) -> Job:
+    """Queue a job (or return the queued/running one with the same key)."""
+    if name not in _handlers:
+        raise ValueError(f'no job handler registered for {name!r}')
+    job = Job(name=name, payload=payload or {}, key=key, max_attempts=max_attempts, created_by=user,
+              run_at=timezone.now() + timedelta(seconds=delay))
+    if key is None:
+        job.save()
+    else:
+        # INSERT OR IGNORE / ON CONFLICT DO NOTHING against job_active_key_uniq
+        Job.objects.bulk_create([job], ignore_conflicts=True)
+        job = Job.objects.filter(key=key, status__in=('queued', 'running')).first() or job
+    if getattr(settings, 'JOB_RUNNER', 'thread') == 'thread':
+        transaction.on_commit(_wake_in_process_runner)
+    return job
+
+
+def backoff(attempts: int) -> float:
+    return min(JOB_BACKOFF_BASE * 2 ** max(attempts - 1, 0), JOB_BACKOFF_MAX)
+
+
+def _claimable(now):
+    return Job.objects.filter(Q(status='queued', run_at__lte=now) |
+                              Q(status='running', locked_at__lt=now - JOB_LEASE))
+
+
+def claim(worker: str) -> Optional[Job]:
+    """Take the next due job for `worker`, or None."""
+    now = timezone.now()
+    taken = {'status': 'running', 'locked_by': worker, 'locked_at': now, 'attempts': F('attempts') + 1}
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job = _claimable(now).select_for_update(skip_locked=True).order_by('run_at', 'id').first()
+            if job is None:
+                return None
+            Job.objects.filter(id=job.id).update(**taken)
+    else:
+        with writer_lock:
+            for job_id in _claimable(now).order_by('run_at', 'id').values_list('id', flat=True)[:10]:
+                if _claimable(now).filter(id=job_id).update(**taken):
+                    break
+            else:
+                return None
+        job = Job(id=job_id)
+    job.refresh_from_db()
+    return job
+
+
+def run(job: Job, worker: str) -> None:
+    """Run a claimed job and record the outcome (ignored if the job's lease went to another worker)."""
+    mine = Job.objects.filter(id=job.id, locked_by=worker, status='running')
+    try:
+        func = _handlers[job.name]
+    except KeyError:
+        mine.update(status='failed', last_error=f'no job handler registered for {job.name!r}',
+                    finished_at=timezone.now())
+        return
+    try:
+        result = func(**job.payload)
+    except Exception:
+        error = traceback.format_exc(limit=5)
+        if job.attempts >= job.max_attempts:
+            logger.error('Job %s #%s failed after %s attempts', job.name, job.id, job.attempts)
+            mine.update(status='failed', last_error=error, finished_at=timezone.now())
+        else:
+            mine.update(status='queued', last_error=error, locked_by='',
+                        run_at=timezone.now() + timedelta(seconds=backoff(job.attempts)))
+        return
+    mine.update(status='done', result=result, finished_at=timezone.now())
+
+
+def drain(worker: str = None, max_jobs: int = None) -> int:
+    """Run due jobs until none are left (or max_jobs ran); returns how many ran."""
+    worker = worker or worker_name()
+    done = 0
+    while max_jobs is None or done < max_jobs:
+        job = claim(worker)
+        if job is None:
+            break
+        run(job, worker)
+        done += 1
+    return done
+
+
+def worker_name(index: int = 0) -> str:
+    return f'{socket.gethostname()}:{os.getpid()}:{index}'
+
+
+def work(worker: str, stop: threading.Event, wakeup: threading.Event = None) -> None:
+    """Worker thread loop: drain, then sleep until woken or JOB_POLL_INTERVAL passes."""
+    wakeup = wakeup or threading.Event()
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            try:
+                drain(worker)
+            except Exception:
+                logger.exception('Job worker %s crashed while draining', worker)
+            wakeup.wait(JOB_POLL_INTERVAL)
+            wakeup.clear()
+    finally:
+        connection.close()
+
+
+def status(job: Job) -> Dict:
+    return {
+        'id': job.id,
+        'name': job.name,
+        'status': job.status,
+        'attempts': job.attempts,
+        'max_attempts': job.max_attempts,
+        'run_at': job.run_at,
+        'result': job.result,
+        'last_error': job.last_error.strip().splitlines()[-1] if job.last_error else '',
+        'created_at': job.created_at,
+        'finished_at': job.finished_at,
+    }
+
+
+# ════════════════════════════════════════════════════════════════
+#  IN-PROCESS RUNNER (JOB_RUNNER = 'thread')
+# ════════════════════════════════════════════════════════════════
+
+_runner_lock = threading.Lock()
+_runner_threads = []
+_runner_wakeup = threading.Event()
+_runner_stop = threading.Event()
+
+
+def _wake_in_process_runner() -> None:
+    with _runner_lock:
+        if not _runner_threads:
+            for i in range(max(int(getattr(settings, 'JOB_THREADS', 2)), 1)):
+                thread = threading.Thread(target=work, args=(worker_name(i), _runner_stop, _runner_wakeup),
+                                          name=f'jobs-{i}', daemon=True)
+                thread.start()
+                _runner_threads.append(thread)
+    _runner_wakeup.set()
@@ -0,0 +1,212 @@
+# backend/accounts/loadtest.py
+# Building blocks for the end-to-end load test (`manage.py load_test`):
+#   - seed_population(): load-test students / teachers / parents + one concept
+#   - start_wsgi_server(): the Django app on a threaded in-process HTTP server
+#   - DBProbe: per-statement timing for writes + "database is locked" counts
+#   - Recorder: thread-safe per-endpoint latency / status collection
+#   - summarize(): nearest-rank percentiles for JSON reports
+
+import math
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from django.contrib.auth.models import User
+from django.db import OperationalError
+from django.db.backends.signals import connection_created
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import (
+    Concept, TeachingAtom, TeacherProfile, ParentProfile, ParentChild,
+    LearningProfile, UserXP,
+)
+
+PERCENTILES = (50, 90, 95, 99)
+LOADTEST_ATOMS = ['Foundations', 'Core Structure', 'Key Operations', 'Common Patterns', 'Applications']
+_WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+# ════════════════════════════════════════════════════════════════
+#  STATISTICS
+# ════════════════════════════════════════════════════════════════
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(values_ms: List[float]) -> Dict[str, float]:
+    values = sorted(values_ms)
+    out = {'count': len(values)}
+    if not values:
+        return out
+    out['mean'] = round(sum(values) / len(values), 2)
+    for p in PERCENTILES:
+        out[f'p{p}'] = round(percentile(values, p), 2)
+    out['max'] = round(values[-1], 2)
+    return out
+
+
+class Recorder:
+    """Collects latency and status per endpoint from many virtual-user threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.lock_errors = defaultdict(int)
+
+    def record(self, endpoint: str, elapsed_ms: float, status: int, body: str = ''):
+        with self._lock:
+            self.latencies[endpoint].append(elapsed_ms)
+            self.statuses[endpoint][status] += 1
+            if status >= 500 and 'database is locked' in body:
+                self.lock_errors[endpoint] += 1
+
+    def report(self) -> Dict[str, Dict]:
+        endpoints = {}
+        for endpoint in sorted(self.latencies):
+            stats = summarize(self.latencies[endpoint])
+            statuses = dict(self.statuses[endpoint])
+            stats['errors'] = sum(n for code, n in statuses.items() if code >= 400 or code == 0)
+            stats['status'] = {str(code): n for code, n in sorted(statuses.items())}
+            stats['lock_errors'] = self.lock_errors.get(endpoint, 0)
+            endpoints[endpoint] = stats
+        return endpoints
+
+
+# ════════════════════════════════════════════════════════════════
+#  DATABASE LOCK PROBE
+# ════════════════════════════════════════════════════════════════
+
+class DBProbe:
+    """
+    Times every write statement on every new DB connection and counts lock errors.
+
+    With SQLite a writer blocked by another writer spins in the busy handler inside
+    execute(), so write-statement time is a direct measure of lock wait. Only
+    meaningful when the server runs in this process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.write_ms: List[float] = []
+        self.lock_errors = 0
+        self.statements = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        is_write = sql.lstrip()[:7].upper().startswith(_WRITE_PREFIXES)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        except OperationalError as e:
+            if 'locked' in str(e).lower():
+                with self._lock:
+                    self.lock_errors += 1
+            raise
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000.0
+            with self._lock:
+                self.statements += 1
+                if is_write:
+                    self.write_ms.append(elapsed)
+
+    def _on_connection(self, sender, connection, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    def install(self):
+        connection_created.connect(self._on_connection, weak=False, dispatch_uid='loadtest_db_probe')
+
+    def uninstall(self):
+        connection_created.disconnect(dispatch_uid='loadtest_db_probe')
+
+    def report(self) -> Dict:
+        return {
+            'statements': self.statements,
+            'lock_errors': self.lock_errors,
+            'write_ms': summarize(self.write_ms),
+        }
+
+
+# ════════════════════════════════════════════════════════════════
+#  IN-PROCESS SERVER
+# ════════════════════════════════════════════════════════════════
+
+def start_wsgi_server(host: str = '127.0.0.1', port: int = 0):
+    """Serve the Django app on a threaded HTTP server. Returns (server, base_url)."""
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadedWSGIServer((host, port), QuietHandler, allow_reuse_address=True)
+    server.daemon_threads = True
+    server.set_app(WSGIHandler())
+    threading.Thread(target=server.serve_forever, name='loadtest-wsgi', daemon=True).start()
+    bound_host, bound_port = server.server_address[:2]
+    return server, f'http://{bound_host}:{bound_port}'
+
+
+# ════════════════════════════════════════════════════════════════
+#  FIXTURES
+# ════════════════════════════════════════════════════════════════
+
+def _user(username: str) -> User:
+    user, created = User.objects.get_or_create(username=username, defaults={'email': f'{username}@loadtest.local'})
+    if created:
+        user.set_unusable_password()
+        user.save(update_fields=['password'])
+    LearningProfile.objects.get_or_create(user=user)
+    UserXP.objects.get_or_create(user=user)
+    return user
+
+
+def access_token(user: User) -> str:
+    return str(RefreshToken.for_user(user).access_token)
+
+
+def seed_population(prefix: str, students: int, teachers: int, parents: int) -> Dict:
+    """
+    Idempotently create the load-test population and a 5-atom concept.
+
+    Parents are linked round-robin to students so every parent has at least one child
+    (when there are students).
+    """
+    owner = _user(f'{prefix}_owner')
+    concept, _ = Concept.objects.get_or_create(
+        name='Load Test Concept', subject='Load Testing', created_by=owner,
+        defaults={'description': 'Synthetic concept for load testing'},
+    )
+    for order, name in enumerate(LOADTEST_ATOMS):
+        TeachingAtom.objects.get_or_create(concept=concept, name=name, defaults={'order': order})
+
+    student_users = [_user(f'{prefix}_student_{i}') for i in range(students)]
+
+    teacher_users = []
+    for i in range(teachers):
+        user = _user(f'{prefix}_teacher_{i}')
+        TeacherProfile.objects.update_or_create(user=user, defaults={'is_active': True, 'subject': 'Load Testing'})
+        teacher_users.append(user)
+
+    parent_users = []
+    for i in range(parents):
+        user = _user(f'{prefix}_parent_{i}')
+        ParentProfile.objects.get_or_create(user=user, defaults={'display_name': user.username})
+        children = student_users[i::parents] if parents else []
+        for child in children:
+            ParentChild.objects.get_or_create(parent=user, child=child)
+        parent_users.append((user, [c.id for c in children]))
+
+    return {
+        'concept_id': concept.id,
+        'students': [(u, access_token(u)) for u in student_users],
+        'teachers': [(u, access_token(u)) for u in teacher_users],
+        'parents': [(u, access_token(u), child_ids) for u, child_ids in parent_users],
+    }
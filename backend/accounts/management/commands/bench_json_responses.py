@@ -0,0 +1,86 @@
+import gzip
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from accounts.models import LearningSession, ParentChild, StudentProgress, TeacherProfile
+from accounts.views import (
+    GetLearningProgressView, LearningCalendarView, ParentChildInsightsView, TeacherClassAnalyticsView,
+)
+from core import middleware, renderers
+
+
+def _payload(view, user, path, **kwargs):
+    """response.data of one view call, before rendering."""
+    request = APIRequestFactory().get(path)
+    force_authenticate(request, user=user)
+    response = view.as_view()(request, **kwargs)
+    if response.status_code != 200:
+        raise CommandError(f'{view.__name__} returned {response.status_code} for {user.username}')
+    return response.data
+
+
+def _per_call_us(fn, data, iterations):
+    fn(data)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn(data)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark rendering of the largest dashboard responses (learning progress, parent "
+        "insights, teacher class analytics, learning calendar) on the current database: "
+        "serialization time with DRF's stdlib JSONRenderer vs core.renderers, and bytes on "
+        "the wire raw / gzip / brotli."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--student', type=int, help='Student user id (default: the one with most progress rows)')
+        parser.add_argument('--iterations', type=int, default=200)
+
+    def _student(self, student_id):
+        if student_id:
+            return User.objects.get(pk=student_id)
+        top = (StudentProgress.objects.values('user').annotate(n=Count('id')).order_by('-n').first())
+        if top is None:
+            raise CommandError('No StudentProgress rows; seed some data first (e.g. load_test)')
+        return User.objects.get(pk=top['user'])
+
+    def handle(self, *args, **opts):
+        student = self._student(opts['student'])
+        cases = [('progress', _payload(GetLearningProgressView, student, '/auth/api/progress/'))]
+
+        latest = LearningSession.objects.filter(user=student).order_by('-start_time').first()
+        month = f'?year={latest.start_time.year}&month={latest.start_time.month}' if latest else ''
+        cases.append(('calendar', _payload(LearningCalendarView, student, f'/auth/api/learning-calendar/{month}')))
+
+        link = ParentChild.objects.filter(child=student, parent__parent_profile__is_active=True).first()
+        if link:
+            cases.append(('parent_insights', _payload(ParentChildInsightsView, link.parent,
+                                                      f'/auth/api/parent/child/{student.id}/insights/',
+                                                      child_id=student.id)))
+        teacher = TeacherProfile.objects.filter(is_active=True).select_related('user').first()
+        if teacher:
+            cases.append(('class_analytics', _payload(TeacherClassAnalyticsView, teacher.user,
+                                                      '/auth/api/teacher/class-analytics/')))
+
+        drf = JSONRenderer()
+        backends = [('drf-json', drf.render), ('stdlib', renderers.stdlib_dumps)]
+        if renderers.orjson is not None:
+            backends.append(('orjson', renderers.orjson_dumps))
+
+        self.stdout.write(f'student={student.username} renderer in use: {renderers.BACKEND}')
+        header = f"{'response':<18}" + ''.join(f'{name + " us":>13}' for name, _ in backends)
+        self.stdout.write(header + f"{'raw B':>10}{'gzip B':>10}{'br B':>10}")
+        for name, data in cases:
+            timings = ''.join(f'{_per_call_us(fn, data, opts["iterations"]):>13.1f}' for _, fn in backends)
+            body = renderers.dumps(data)
+            gz = len(gzip.compress(body, compresslevel=middleware.GZIP_LEVEL))
+            br = len(middleware.compress(body, 'br')) if middleware.brotli is not None else '-'
+            self.stdout.write(f'{name:<18}{timings}{len(body):>10}{gz:>10}{br:>10}')
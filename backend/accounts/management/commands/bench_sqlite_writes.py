@@ -0,0 +1,158 @@
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.loadtest import summarize
+from core.sqlite import writer_lock, production_pragmas
+
+# Trimmed-down versions of the tables SubmitAtomAnswerView writes per answer
+SCHEMA = """
+CREATE TABLE progress (id INTEGER PRIMARY KEY, student INTEGER, atom INTEGER, mastery REAL,
+                       streak INTEGER, error_history TEXT, UNIQUE(student, atom));
+CREATE TABLE profile (student INTEGER PRIMARY KEY, theta REAL);
+CREATE TABLE session (id INTEGER PRIMARY KEY, student INTEGER, session_data TEXT, engagement REAL);
+CREATE TABLE xp (student INTEGER PRIMARY KEY, total INTEGER);
+"""
+
+PROFILES = {
+    # Django defaults: rollback journal, deferred transactions, 5s busy timeout
+    'default': {'pragmas': [], 'begin': 'BEGIN', 'single_writer': False},
+    'production': {'pragmas': production_pragmas(), 'begin': 'BEGIN IMMEDIATE', 'single_writer': False},
+    'production+single-writer': {'pragmas': production_pragmas(), 'begin': 'BEGIN IMMEDIATE', 'single_writer': True},
+}
+
+
+def _setup(path, students, atoms):
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.executemany('INSERT INTO progress (student, atom, mastery, streak, error_history) VALUES (?, ?, 0.3, 0, "[]")',
+                     [(s, a) for s in range(students) for a in range(atoms)])
+    conn.executemany('INSERT INTO profile VALUES (?, 0.0)', [(s,) for s in range(students)])
+    conn.executemany('INSERT INTO session (id, student, session_data, engagement) VALUES (?, ?, "{}", 0.5)',
+                     [(s, s) for s in range(students)])
+    conn.executemany('INSERT INTO xp VALUES (?, 0)', [(s,) for s in range(students)])
+    conn.commit()
+    conn.close()
+
+
+def _answer(conn, student, atoms, rng):
+    """The write set of one submitted answer: read-modify-write on four tables."""
+    atom = rng.randrange(atoms)
+    mastery, = conn.execute('SELECT mastery FROM progress WHERE student=? AND atom=?', (student, atom)).fetchone()
+    conn.execute('UPDATE progress SET mastery=?, streak=streak+1, error_history=? WHERE student=? AND atom=?',
+                 (min(1.0, mastery + 0.05), '[]', student, atom))
+    conn.execute('UPDATE profile SET theta=theta+0.01 WHERE student=?', (student,))
+    data, = conn.execute('SELECT session_data FROM session WHERE id=?', (student,)).fetchone()
+    data = json.loads(data)
+    data.setdefault('answers', []).append({'atom': atom, 'correct': rng.random() < 0.7})
+    data['answers'] = data['answers'][-50:]
+    conn.execute('UPDATE session SET session_data=?, engagement=? WHERE id=?', (json.dumps(data), rng.random(), student))
+    conn.execute('UPDATE xp SET total=total+10 WHERE student=?', (student,))
+
+
+def run_profile(name, threads, answers, atoms, busy_timeout_ms, seed):
+    profile = PROFILES[name]
+    workdir = tempfile.mkdtemp(prefix='bench_sqlite_')
+    path = os.path.join(workdir, 'bench.sqlite3')
+    _setup(path, threads, atoms)
+
+    latencies, lock_errors = [], [0]
+    stats_lock = threading.Lock()
+
+    def worker(student):
+        rng = random.Random(seed + student)
+        # isolation_level=None: we issue BEGIN ourselves, as Django does
+        conn = sqlite3.connect(path, timeout=busy_timeout_ms / 1000.0, isolation_level=None,
+                               check_same_thread=False)
+        for pragma in profile['pragmas']:
+            conn.execute(pragma)
+        for _ in range(answers):
+            start = time.perf_counter()
+            try:
+                if profile['single_writer']:
+                    with writer_lock:
+                        _write(conn, profile['begin'], student, atoms, rng)
+                else:
+                    _write(conn, profile['begin'], student, atoms, rng)
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e):
+                    raise
+                with stats_lock:
+                    lock_errors[0] += 1
+                continue
+            with stats_lock:
+                latencies.append((time.perf_counter() - start) * 1000.0)
+        conn.close()
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    t0 = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    duration = time.perf_counter() - t0
+
+    for suffix in ('', '-wal', '-shm', '-journal'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    os.rmdir(workdir)
+
+    return {
+        'profile': name,
+        'duration_s': round(duration, 3),
+        'committed': len(latencies),
+        'lock_errors': lock_errors[0],
+        'writes_per_s': round(len(latencies) / duration, 1) if duration else 0,
+        'latency_ms': summarize(latencies),
+    }
+
+
+def _write(conn, begin, student, atoms, rng):
+    conn.execute(begin)
+    try:
+        _answer(conn, student, atoms, rng)
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('COMMIT')
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark concurrent answer-shaped write transactions on a throwaway SQLite file "
+        "under the default and production SQLite profiles (see core/sqlite.py)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--answers', type=int, default=200, help='Answers written per thread')
+        parser.add_argument('--atoms', type=int, default=5)
+        parser.add_argument('--busy-timeout-ms', type=int, default=5000)
+        parser.add_argument('--profiles', default=','.join(PROFILES),
+                            help=f"Comma-separated subset of: {', '.join(PROFILES)}")
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', default='', help='Also write results as JSON to this file')
+
+    def handle(self, *args, **opts):
+        names = [n.strip() for n in opts['profiles'].split(',') if n.strip()]
+        results = [
+            run_profile(name, opts['threads'], opts['answers'], opts['atoms'], opts['busy_timeout_ms'], opts['seed'])
+            for name in names
+        ]
+
+        self.stdout.write(f"{'profile':<28}{'writes/s':>10}{'ok':>8}{'locked':>8}{'p50':>9}{'p99':>9}{'max':>9}")
+        for r in results:
+            lat = r['latency_ms']
+            self.stdout.write(
+                f"{r['profile']:<28}{r['writes_per_s']:>10}{r['committed']:>8}{r['lock_errors']:>8}"
+                f"{lat.get('p50', 0):>9.2f}{lat.get('p99', 0):>9.2f}{lat.get('max', 0):>9.2f}"
+            )
+        if opts['output']:
+            with open(opts['output'], 'w') as f:
+                json.dump(results, f, indent=2)
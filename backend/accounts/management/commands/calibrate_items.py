@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.item_params import ATOM_BATCH_SIZE, MIN_RESPONSES, calibrate
+
+
+class Command(BaseCommand):
+    help = (
+        "Fit 2PL IRT parameters (discrimination a, difficulty b) per question from "
+        "QuestionResponse rows and store them on Question (see accounts/item_params.py)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--atom', type=int, action='append', default=None, help='Only this atom id (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=ATOM_BATCH_SIZE, help='Atoms fitted together')
+        parser.add_argument('--min-responses', type=int, default=MIN_RESPONSES,
+                            help='Responses an item needs before its fitted parameters are stored')
+
+    def handle(self, *args, **opts):
+        started = time.perf_counter()
+        totals = calibrate(opts['atom'], opts['batch_size'], opts['min_responses'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{totals['atoms']} atoms in {totals['batches']} batches: {totals['responses']} responses, "
+            f"{totals['items']} items, {totals['calibrated']} calibrated "
+            f"({time.perf_counter() - started:.2f}s)"
+        ))
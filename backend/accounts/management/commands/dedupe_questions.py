@@ -0,0 +1,88 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from accounts import near_duplicates
+from accounts.models import Question, QuestionResponse
+from accounts.question_bank import SERVABLE_STATUSES
+from core.sqlite import write_transaction
+
+
+def _status(question):
+    try:
+        return question.approval.status
+    except Question.approval.RelatedObjectDoesNotExist:
+        return 'pending'
+
+
+def plan_atom(questions, threshold):
+    """
+    Near-duplicate groups for one atom's questions as (keep, [remove, ...]) pairs.
+
+    The kept question is the oldest teacher-approved one, else the oldest. Other
+    approved / edited questions are never removed: a teacher already curated them.
+    """
+    by_id = {q.id: q for q in questions}
+    groups = defaultdict(list)
+    items = [(q.id, near_duplicates.signature(q.question_text, q.options)) for q in questions]
+    for question_id, cluster in near_duplicates.clusters(items, threshold).items():
+        groups[cluster].append(by_id[question_id])
+
+    plan = []
+    for members in groups.values():
+        members.sort(key=lambda q: (_status(q) not in SERVABLE_STATUSES, q.id))
+        keep = members[0]
+        remove = [q for q in members[1:] if _status(q) not in SERVABLE_STATUSES]
+        plan.append((keep, remove))
+    return plan
+
+
+class Command(BaseCommand):
+    help = (
+        "Find near-duplicate questions per atom (MinHash/LSH, see accounts/near_duplicates.py). "
+        "Reports by default; --apply deletes the unapproved duplicates and moves their "
+        "answer history to the question that is kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--atom', type=int, action='append', default=[], help='Only this atom id (repeatable)')
+        parser.add_argument('--threshold', type=float, default=near_duplicates.THRESHOLD,
+                            help='Estimated Jaccard similarity that counts as a duplicate')
+        parser.add_argument('--apply', action='store_true', help='Delete duplicates instead of only reporting')
+        parser.add_argument('--show', type=int, default=3, help='Example groups printed per atom')
+
+    def handle(self, *args, **opts):
+        atoms = Question.objects.values('atom_id').annotate(n=Count('id')).filter(n__gt=1)
+        if opts['atom']:
+            atoms = atoms.filter(atom_id__in=opts['atom'])
+        atom_ids = [row['atom_id'] for row in atoms.order_by('atom_id')]
+
+        total_groups = total_removed = 0
+        for atom_id in atom_ids:
+            questions = list(Question.objects.filter(atom_id=atom_id).select_related('approval').order_by('id'))
+            plan = plan_atom(questions, opts['threshold'])
+            if not plan:
+                continue
+            removable = sum(len(remove) for _, remove in plan)
+            total_groups += len(plan)
+            total_removed += removable
+            self.stdout.write(f"atom {atom_id}: {len(questions)} questions, {len(plan)} duplicate groups, "
+                              f"{removable} removable")
+            for keep, remove in plan[:opts['show']]:
+                self.stdout.write(f"  keep #{keep.id}: {keep.question_text[:80]}")
+                for q in remove:
+                    self.stdout.write(f"    drop #{q.id}: {q.question_text[:80]}")
+
+            if opts['apply'] and removable:
+                with write_transaction():
+                    for keep, remove in plan:
+                        if remove:
+                            ids = [q.id for q in remove]
+                            QuestionResponse.objects.filter(question_id__in=ids).update(question=keep)
+                            Question.objects.filter(id__in=ids).delete()
+
+        verb = 'Removed' if opts['apply'] else 'Would remove'
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(atom_ids)} atoms scanned, {total_groups} duplicate groups. {verb} {total_removed} questions."
+        ))
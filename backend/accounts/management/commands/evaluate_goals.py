@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from accounts import goals
+
+
+class Command(BaseCommand):
+    help = (
+        "Evaluate every active TeacherGoal with set-based aggregates over StudentProgress, "
+        "mark goals every targeted student has reached as completed and goals past their "
+        "deadline as overdue, and refresh the teachers' cached goal summaries. Run from cron "
+        "(e.g. every 15 minutes)."
+    )
+
+    def handle(self, *args, **opts):
+        result = goals.run_transitions()
+        self.stdout.write(
+            f"evaluated {result['evaluated']} active goal(s): "
+            f"{result['completed']} completed, {result['overdue']} overdue"
+        )
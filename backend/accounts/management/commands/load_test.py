@@ -0,0 +1,240 @@
+import json
+import random
+import subprocess
+import threading
+import time
+from datetime import datetime
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from accounts.loadtest import DBProbe, Recorder, seed_population, start_wsgi_server, summarize
+
+
+class VirtualUser:
+    """One JWT-authenticated HTTP client that records every call."""
+
+    def __init__(self, base_url, token, recorder, think_time, timeout, seed):
+        self.base_url = base_url.rstrip('/')
+        self.recorder = recorder
+        self.think_time = think_time
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.http = requests.Session()
+        self.http.headers['Authorization'] = f'Bearer {token}'
+
+    def call(self, method, path, endpoint=None, **kwargs):
+        endpoint = endpoint or path
+        start = time.perf_counter()
+        try:
+            resp = self.http.request(method, f'{self.base_url}/auth/api/{path}', timeout=self.timeout, **kwargs)
+            status, body = resp.status_code, resp.text
+        except requests.RequestException as e:
+            resp, status, body = None, 0, str(e)
+        self.recorder.record(endpoint.strip('/'), (time.perf_counter() - start) * 1000.0, status, body)
+        if self.think_time:
+            time.sleep(self.rng.uniform(0, 2 * self.think_time))
+        if resp is None or status >= 400:
+            return None
+        try:
+            return resp.json()
+        except ValueError:
+            return None
+
+    def answer(self, options_count=4):
+        return {'selected': self.rng.randrange(options_count), 'time_taken': self.rng.randint(10, 90)}
+
+
+def student_loop(vu, concept_id, iterations, level):
+    """start-teaching-session → initial quiz → teaching → practice → complete-atom."""
+    for _ in range(iterations):
+        start = vu.call('POST', 'start-teaching-session/', json={'concept_id': concept_id, 'knowledge_level': level})
+        if not start:
+            continue
+        session_id = start['session_id']
+        atom = start.get('current_atom') or {}
+
+        quiz = vu.call('POST', 'initial-quiz/', json={'session_id': session_id}) or {}
+        for i, _q in enumerate(quiz.get('questions', [])):
+            vu.call('POST', 'submit-initial-quiz-answer/', json={'session_id': session_id, 'question_index': i, **vu.answer()})
+        vu.call('POST', 'complete-initial-quiz/', json={'session_id': session_id})
+
+        atom_id = atom.get('id')
+        if not atom_id:
+            continue
+        vu.call('POST', 'teaching-content/', json={'session_id': session_id, 'atom_id': atom_id})
+        generated = vu.call('POST', 'generate-questions-from-teaching/', json={'session_id': session_id, 'atom_id': atom_id}) or {}
+        for i, _q in enumerate(generated.get('questions', [])):
+            vu.call('POST', 'submit-atom-answer/', json={
+                'session_id': session_id, 'atom_id': atom_id, 'question_index': i, **vu.answer(),
+            })
+        vu.call('POST', 'complete-atom/', json={'session_id': session_id, 'atom_id': atom_id})
+
+        vu.call('GET', 'progress/')
+        vu.call('GET', 'my-xp/')
+
+
+def teacher_loop(vu, stop):
+    while not stop.is_set():
+        vu.call('GET', 'teacher/dashboard/')
+        vu.call('GET', 'teacher/class-analytics/')
+        vu.call('GET', 'teacher/questions/')
+        vu.call('GET', 'teacher/students/')
+
+
+def parent_loop(vu, child_ids, stop):
+    while not stop.is_set():
+        vu.call('GET', 'parent/children/')
+        for child_id in child_ids:
+            vu.call('GET', f'parent/child/{child_id}/insights/', endpoint='parent/child/<id>/insights')
+        if not child_ids:
+            time.sleep(0.05)
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the full student learning loop (plus teacher/parent dashboard readers) with "
+        "concurrent JWT virtual users and write per-endpoint latency percentiles as JSON. "
+        "Seeds '<prefix>_*' users into the configured database — use a scratch DB."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='',
+                            help='Target a running server (default: serve the app in-process)')
+        parser.add_argument('--students', type=int, default=10)
+        parser.add_argument('--teachers', type=int, default=1)
+        parser.add_argument('--parents', type=int, default=1)
+        parser.add_argument('--iterations', type=int, default=1,
+                            help='Learning loops per student')
+        parser.add_argument('--knowledge-level', default='intermediate',
+                            choices=['zero', 'beginner', 'intermediate', 'advanced'])
+        parser.add_argument('--think-time', type=float, default=0.0,
+                            help='Mean seconds of think time between requests')
+        parser.add_argument('--timeout', type=float, default=60.0)
+        parser.add_argument('--prefix', default='loadtest')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--fake-llm', action='store_true',
+                            help='Start the fake LLM provider in-process (in-process server only)')
+        parser.add_argument('--fake-llm-latency', default='lognormal:600,0.5')
+        parser.add_argument('--output', default='',
+                            help='Results file (default: loadtest-<timestamp>.json)')
+
+    def handle(self, *args, **opts):
+        in_process = not opts['base_url']
+        if opts['fake_llm'] and not in_process:
+            raise CommandError('--fake-llm only applies to the in-process server; '
+                               'start `manage.py run_fake_llm` next to the remote server instead.')
+
+        population = seed_population(opts['prefix'], opts['students'], opts['teachers'], opts['parents'])
+        connection.close()  # seeding connection must not hold locks during the run
+
+        fake_server = wsgi_server = None
+        probe = DBProbe() if in_process else None
+        if opts['fake_llm']:
+            from learning_engine.fake_llm import FakeLLMConfig, start_in_thread
+            fake_server, fake_url = start_in_thread(FakeLLMConfig(latency=opts['fake_llm_latency'], seed=opts['seed']))
+            settings.FAKE_LLM_URL = fake_url
+        if in_process:
+            probe.install()
+            wsgi_server, base_url = start_wsgi_server()
+        else:
+            base_url = opts['base_url']
+
+        llm = 'fake' if getattr(settings, 'FAKE_LLM_URL', '') else ('live' if settings.GROQ_API_KEY else 'fallback')
+        self.stdout.write(f"Load test against {base_url} — {opts['students']} students, "
+                          f"{opts['teachers']} teachers, {opts['parents']} parents, LLM={llm}")
+
+        recorder = Recorder()
+        stop = threading.Event()
+        seed = opts['seed']
+
+        def vu(token, offset):
+            return VirtualUser(base_url, token, recorder, opts['think_time'], opts['timeout'], seed + offset)
+
+        students = [threading.Thread(target=student_loop, args=(
+            vu(token, i), population['concept_id'], opts['iterations'], opts['knowledge_level']))
+            for i, (_user, token) in enumerate(population['students'])]
+        readers = [threading.Thread(target=teacher_loop, args=(vu(token, 10_000 + i), stop))
+                   for i, (_user, token) in enumerate(population['teachers'])]
+        readers += [threading.Thread(target=parent_loop, args=(vu(token, 20_000 + i), child_ids, stop))
+                    for i, (_user, token, child_ids) in enumerate(population['parents'])]
+
+        started_at = datetime.now()
+        t0 = time.perf_counter()
+        try:
+            for t in students + readers:
+                t.start()
+            for t in students:
+                t.join()
+        finally:
+            stop.set()
+            for t in readers:
+                t.join()
+            duration = time.perf_counter() - t0
+            if wsgi_server:
+                wsgi_server.shutdown()
+                wsgi_server.server_close()
+            if probe:
+                probe.uninstall()
+            if fake_server:
+                fake_server.shutdown()
+
+        endpoints = recorder.report()
+        total = sum(e['count'] for e in endpoints.values())
+        all_latencies = [v for values in recorder.latencies.values() for v in values]
+        results = {
+            'meta': {
+                'started_at': started_at.isoformat(timespec='seconds'),
+                'git_revision': _git_revision(),
+                'base_url': base_url,
+                'in_process': in_process,
+                'llm': llm,
+                'db_vendor': connection.vendor,
+                'students': opts['students'],
+                'teachers': opts['teachers'],
+                'parents': opts['parents'],
+                'iterations': opts['iterations'],
+                'think_time': opts['think_time'],
+            },
+            'summary': {
+                'duration_s': round(duration, 2),
+                'requests': total,
+                'errors': sum(e['errors'] for e in endpoints.values()),
+                'throughput_rps': round(total / duration, 2) if duration else 0,
+                'latency_ms': summarize(all_latencies),
+            },
+            'endpoints': endpoints,
+            'db': probe.report() if probe else {
+                'lock_errors': sum(e['lock_errors'] for e in endpoints.values()),
+                'note': 'remote server: only lock errors surfaced in 5xx bodies are counted',
+            },
+        }
+
+        output = opts['output'] or f"loadtest-{started_at:%Y%m%d-%H%M%S}.json"
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+        self._print_table(endpoints)
+        s = results['summary']
+        self.stdout.write(self.style.SUCCESS(
+            f"{s['requests']} requests in {s['duration_s']}s ({s['throughput_rps']} req/s), "
+            f"{s['errors']} errors, db lock errors: {results['db']['lock_errors']} → {output}"
+        ))
+
+    def _print_table(self, endpoints):
+        self.stdout.write(f"{'endpoint':<40}{'count':>7}{'err':>6}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+        for name, e in endpoints.items():
+            self.stdout.write(
+                f"{name:<40}{e['count']:>7}{e['errors']:>6}"
+                f"{e.get('p50', 0):>10.1f}{e.get('p95', 0):>10.1f}{e.get('p99', 0):>10.1f}{e.get('max', 0):>10.1f}"
+            )
@@ -0,0 +1,39 @@
+import threading
+
+from django.core.management.base import BaseCommand
+
+from accounts import jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Run background jobs from the Job table (accounts/jobs.py) on N worker threads until "
+        "interrupted. Start it in as many processes or on as many hosts as needed: workers "
+        "claim jobs atomically. Set JOB_RUNNER=worker on the web processes so they leave "
+        "jobs to these workers. With --once, run the jobs due now and exit (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=2)
+        parser.add_argument('--once', action='store_true', help='Run the jobs that are due, then exit')
+
+    def handle(self, *args, **opts):
+        if opts['once']:
+            self.stdout.write(f"ran {jobs.drain()} job(s)")
+            return
+
+        stop = threading.Event()
+        threads = [threading.Thread(target=jobs.work, args=(jobs.worker_name(i), stop), name=f'jobs-{i}')
+                   for i in range(max(opts['threads'], 1))]
+        for thread in threads:
+            thread.start()
+        self.stdout.write(f"{len(threads)} worker thread(s) running; Ctrl-C to stop")
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=1.0)
+        except KeyboardInterrupt:
+            stop.set()
+            for thread in threads:
+                thread.join()
+        self.stdout.write("workers stopped")
@@ -0,0 +1,329 @@
+# backend/accounts/mastery_cache.py
+# Per-(user, concept) mastery snapshots: the concept's atoms plus the user's
+# StudentProgress state for each, read by the adaptive flow (next-step
+# selection, session start, mastery overview, final challenge) several times
+# per request without touching the database once warm.
+#   - write-through: every StudentProgress save (post_save, see apps.py) updates
+#     the cached entry. Writes inside a transaction go to a thread-local overlay
+#     that the same thread reads immediately and that is merged on commit; a
+#     rollback discards it with the transaction's on-commit hooks
+#   - builds race-checked against a per-user write counter, so a snapshot read
+#     from the database before a concurrent write landed is never stored
+#   - in-process LRU by default; set MASTERY_CACHE_ALIAS to a CACHES alias
+#     (e.g. Redis) to share snapshots between workers — writes then invalidate
+#     instead of merging, since a read-modify-write on a shared key could lose
+#     another worker's update; the write counter lives in that cache too, and a
+#     write looks its atom's concept up in the database (another worker may
+#     hold a snapshot this process never built)
+# TeachingAtom / Concept changes drop the concept's snapshots; entries expire
+# after MASTERY_SNAPSHOT_TTL regardless.
+
+import dataclasses
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .models import StudentProgress, TeachingAtom
+
+MASTERY_SNAPSHOT_TTL = 300   # seconds
+MAX_SNAPSHOTS = 4096
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class AtomMastery:
+    mastery_score: float = 0.0
+    phase: str = 'not_started'
+    streak: int = 0
+    hint_usage: int = 0
+    error_history: Tuple = ()
+    retention_verified: bool = False
+    times_practiced: int = 0
+
+    @classmethod
+    def of(cls, progress: StudentProgress) -> 'AtomMastery':
+        return cls(float(progress.mastery_score), progress.phase, progress.streak, progress.hint_usage,
+                   tuple(progress.error_history or ()), progress.retention_verified,
+                   progress.times_practiced or 0)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class MasterySnapshot:
+    concept_id: int
+    atoms: Tuple[TeachingAtom, ...]          # curriculum order
+    progress: Dict[int, AtomMastery]         # atom id → state; atoms never started are absent
+    built_at: float
+
+    def get(self, atom_id: int) -> Optional[AtomMastery]:
+        return self.progress.get(atom_id)
+
+    def mastery(self, atom_id: int) -> float:
+        entry = self.progress.get(atom_id)
+        return entry.mastery_score if entry else 0.0
+
+    def with_progress(self, updates: Dict[int, AtomMastery]) -> 'MasterySnapshot':
+        return dataclasses.replace(self, progress={**self.progress, **updates})
+
+
+def _build(user_id: int, concept_id: int) -> MasterySnapshot:
+    atoms = tuple(TeachingAtom.objects.filter(concept_id=concept_id).order_by('order'))
+    progress = {
+        p.atom_id: AtomMastery.of(p)
+        for p in StudentProgress.objects.filter(user_id=user_id, atom__concept_id=concept_id)
+    }
+    return MasterySnapshot(concept_id, atoms, progress, time.time())
+
+
+# ════════════════════════════════════════════════════════════════
+#  BACKENDS
+# ════════════════════════════════════════════════════════════════
+
+class LocalBackend:
+    """Process-wide LRU; writes merge into cached snapshots."""
+
+    merges = True
+    shared = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshots: 'OrderedDict[Tuple[int, int], MasterySnapshot]' = OrderedDict()
+        self._writes: Dict[int, int] = {}       # user id → stamp of the last write
+        self._stamps = itertools.count(1)
+
+    def write_stamp(self, user_id):
+        return self._writes.get(user_id)
+
+    def bump(self, user_id):
+        self._writes[user_id] = next(self._stamps)
+
+    def get(self, key):
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is None:
+                return None
+            if time.time() - snapshot.built_at >= MASTERY_SNAPSHOT_TTL:
+                del self._snapshots[key]
+                return None
+            self._snapshots.move_to_end(key)
+            return snapshot
+
+    def set(self, key, snapshot):
+        with self._lock:
+            self._snapshots[key] = snapshot
+            self._snapshots.move_to_end(key)
+            while len(self._snapshots) > MAX_SNAPSHOTS:
+                self._snapshots.popitem(last=False)
+
+    def merge(self, key, updates):
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None:
+                self._snapshots[key] = snapshot.with_progress(updates)
+
+    def delete(self, key):
+        with self._lock:
+            self._snapshots.pop(key, None)
+
+    def delete_concept(self, concept_id):
+        with self._lock:
+            for key in [k for k in self._snapshots if k[1] == concept_id]:
+                del self._snapshots[key]
+
+    def clear(self):
+        with self._lock:
+            self._snapshots.clear()
+        self._writes.clear()
+
+
+class SharedBackend:
+    """A Django cache alias; keys carry a per-concept generation so atom edits drop them all."""
+
+    merges = False
+    shared = True
+
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def write_stamp(self, user_id):
+        return self.cache.get(f'mastery-writes:{user_id}')
+
+    def bump(self, user_id):
+        # Outlives any build in flight; an expired stamp still fails the build's check
+        key = f'mastery-writes:{user_id}'
+        self.cache.add(key, 0, MASTERY_SNAPSHOT_TTL)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.set(key, 1, MASTERY_SNAPSHOT_TTL)
+
+    def _key(self, key):
+        generation = self.cache.get(f'mastery-concept:{key[1]}', 0)
+        return f'mastery:{key[0]}:{key[1]}:{generation}'
+
+    def get(self, key):
+        return self.cache.get(self._key(key))
+
+    def set(self, key, snapshot):
+        self.cache.set(self._key(key), snapshot, MASTERY_SNAPSHOT_TTL)
+
+    def merge(self, key, updates):
+        self.delete(key)
+
+    def delete(self, key):
+        self.cache.delete(self._key(key))
+
+    def delete_concept(self, concept_id):
+        try:
+            self.cache.incr(f'mastery-concept:{concept_id}')
+        except ValueError:
+            self.cache.set(f'mastery-concept:{concept_id}', 1, None)
+
+    def clear(self):
+        pass
+
+
+_backend = None
+_backend_lock = threading.Lock()
+_atom_concepts: Dict[int, int] = {}      # atom id → concept id, for atoms any snapshot holds
+_local = threading.local()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                alias = getattr(settings, 'MASTERY_CACHE_ALIAS', None)
+                _backend = SharedBackend(alias) if alias else LocalBackend()
+    return _backend
+
+
+def _overlay(connection) -> Dict:
+    """This thread's uncommitted writes, if they belong to the connection's current transaction."""
+    if getattr(_local, 'hooks', None) is not connection.run_on_commit or not connection.in_atomic_block:
+        # commit / rollback replace run_on_commit: whatever was pending is merged or void
+        _local.hooks, _local.pending = connection.run_on_commit, {}
+    return _local.pending
+
+
+# ════════════════════════════════════════════════════════════════
+#  READS
+# ════════════════════════════════════════════════════════════════
+
+def snapshot(user_id: int, concept_id: int) -> MasterySnapshot:
+    """The user's mastery state for every atom of the concept."""
+    key = (user_id, concept_id)
+    connection = transaction.get_connection()
+    overlay = _overlay(connection)
+    pending = overlay.get(key)
+
+    backend = get_backend()
+    cached = backend.get(key) if key not in overlay or pending is not None else None
+    if cached is None:
+        stamp = backend.write_stamp(user_id)
+        cached = _build(user_id, concept_id)
+        for atom in cached.atoms:
+            _atom_concepts[atom.id] = concept_id
+        # Don't publish a build that may include this transaction's uncommitted rows
+        dirty = any(k[0] == user_id for k in overlay)
+        if not dirty and backend.write_stamp(user_id) == stamp:
+            backend.set(key, cached)
+        return cached
+    return cached.with_progress(pending) if pending else cached
+
+
+def ensure_progress(user, concept_id: int) -> MasterySnapshot:
+    """snapshot(), creating StudentProgress rows for atoms the user hasn't started."""
+    current = snapshot(user.id, concept_id)
+    created = {}
+    for atom in current.atoms:
+        if current.get(atom.id) is None:
+            progress, _ = StudentProgress.objects.get_or_create(
+                user=user, atom=atom, defaults={'mastery_score': 0.0, 'phase': 'not_started', 'error_history': []}
+            )
+            created[atom.id] = AtomMastery.of(progress)
+    return current.with_progress(created) if created else current
+
+
+# ════════════════════════════════════════════════════════════════
+#  WRITE-THROUGH (signal handlers)
+# ════════════════════════════════════════════════════════════════
+
+def _concepts(atom_ids) -> Dict[int, int]:
+    """atom id → concept id for the atoms whose snapshots a write has to reach."""
+    if get_backend().shared:
+        # other workers may cache snapshots of atoms this process never loaded
+        return dict(TeachingAtom.objects.filter(id__in=atom_ids).values_list('id', 'concept_id'))
+    return {atom_id: _atom_concepts[atom_id] for atom_id in atom_ids if atom_id in _atom_concepts}
+
+
+def _concept_of(progress: StudentProgress) -> Optional[int]:
+    if get_backend().shared and StudentProgress.atom.is_cached(progress):
+        return progress.atom.concept_id
+    return _concepts([progress.atom_id]).get(progress.atom_id)
+
+
+def _apply(user_id, atom_id, entry, concept_id):
+    """A committed write: fence builds in flight, then merge (or drop) the cached snapshot."""
+    backend = get_backend()
+    backend.bump(user_id)
+    if concept_id is None:
+        return   # no snapshot holds the atom
+    if entry is not None and backend.merges:
+        backend.merge((user_id, concept_id), {atom_id: entry})
+    else:
+        backend.delete((user_id, concept_id))
+
+
+def _record(user_id, atom_id, entry, concept_id):
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        _apply(user_id, atom_id, entry, concept_id)
+        return
+    # Visible to this thread now, to everyone once committed
+    overlay = _overlay(connection)
+    key = (user_id, concept_id)
+    if entry is None or key[1] is None or (key in overlay and overlay[key] is None):
+        overlay[key] = None      # read this key from the database until commit
+    else:
+        overlay.setdefault(key, {})[atom_id] = entry
+    get_backend().bump(user_id)
+    transaction.on_commit(lambda: _apply(user_id, atom_id, entry, concept_id))
+
+
+def on_progress_saved(sender, instance, **kwargs):
+    _record(instance.user_id, instance.atom_id, AtomMastery.of(instance), _concept_of(instance))
+
+
+def on_progress_deleted(sender, instance, **kwargs):
+    _record(instance.user_id, instance.atom_id, None, _concept_of(instance))
+
+
+def forget(pairs):
+    """(user id, atom id) rows changed without post_save (queryset.update): drop their snapshots."""
+    pairs = list(pairs)
+    concepts = _concepts({atom_id for _, atom_id in pairs})
+    for user_id, atom_id in pairs:
+        _record(user_id, atom_id, None, concepts.get(atom_id))
+
+
+def on_atom_changed(sender, instance, **kwargs):
+    """TeachingAtom saved / deleted: drop snapshots of its old and new concept."""
+    backend = get_backend()
+    for concept_id in {_atom_concepts.pop(instance.pk, None), instance.concept_id} - {None}:
+        backend.delete_concept(concept_id)
+
+
+def on_concept_deleted(sender, instance, **kwargs):
+    get_backend().delete_concept(instance.pk)
+
+
+def reset():
+    """Drop everything (tests)."""
+    get_backend().clear()
+    _atom_concepts.clear()
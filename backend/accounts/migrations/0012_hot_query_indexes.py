@@ -0,0 +1,43 @@
+# Generated by Django 6.0.2 on 2026-10-18 23:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_merge_20260222_0817'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='learningsession',
+            index=models.Index(condition=models.Q(('end_time__isnull', True)), fields=['user', 'concept'], name='session_user_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='learningsession',
+            index=models.Index(fields=['user', 'start_time'], name='session_user_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='questionapproval',
+            index=models.Index(fields=['status', 'created_at'], name='qapproval_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentprogress',
+            index=models.Index(fields=['user', 'mastery_score'], name='progress_user_mastery_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentprogress',
+            index=models.Index(fields=['atom', 'mastery_score'], name='progress_atom_mastery_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentprogress',
+            index=models.Index(fields=['user', 'phase'], name='progress_user_phase_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentprogress',
+            index=models.Index(condition=models.Q(('next_review_at__isnull', False)), fields=['user', 'next_review_at'], name='progress_user_review_idx'),
+        ),
+    ]
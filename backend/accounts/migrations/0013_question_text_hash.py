@@ -0,0 +1,41 @@
+# Generated by Django 6.0.2 on 2026-10-18 23:27
+
+import hashlib
+import re
+
+from django.db import migrations, models
+
+
+def backfill_text_hash(apps, schema_editor):
+    # Same normalization as Question.hash_text (historical models have no methods)
+    Question = apps.get_model('accounts', 'Question')
+    batch = []
+    for question in Question.objects.only('id', 'question_text').iterator():
+        normalized = ' '.join(re.sub(r'[^\w\s]', ' ', (question.question_text or '').lower()).split())
+        question.text_hash = hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+        batch.append(question)
+        if len(batch) >= 500:
+            Question.objects.bulk_update(batch, ['text_hash'])
+            batch = []
+    if batch:
+        Question.objects.bulk_update(batch, ['text_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='text_hash',
+            field=models.CharField(blank=True, default='', max_length=40),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['atom', 'text_hash'], name='question_atom_hash_idx'),
+        ),
+        migrations.RunPython(backfill_text_hash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-18 23:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0014_questionresponse'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='irt_a',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='irt_b',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='irt_calibrated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='irt_responses',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 6.0.2 on 2026-10-19 00:07
+
+from django.db import migrations, models
+
+from learning_engine.timeseries import VelocitySeries
+
+
+def _series(snapshots, times, end, session_id=None):
+    """Legacy JSON lists → series; points spaced one second apart ending at `end` (originals had no timestamps)."""
+    snapshots = [s for s in (snapshots or []) if isinstance(s, dict)]
+    times = list(times or [])[-len(snapshots):] if snapshots else []
+    times = [None] * (len(snapshots) - len(times)) + times
+    if not snapshots:
+        return None
+    series = VelocitySeries()
+    for i, (snap, taken) in enumerate(zip(snapshots, times)):
+        series.append(end - (len(snapshots) - 1 - i), {**snap, 'time_taken': taken}, session_id)
+    return series.encode()
+
+
+def convert_velocity_lists(apps, schema_editor):
+    LearningSession = apps.get_model('accounts', 'LearningSession')
+    StudentProgress = apps.get_model('accounts', 'StudentProgress')
+
+    batch = []
+    for session in LearningSession.objects.exclude(velocity_data=[]).only('id', 'start_time', 'velocity_data').iterator():
+        session.velocity_series = _series(session.velocity_data, [], session.start_time.timestamp(), session.id)
+        batch.append(session)
+        if len(batch) >= 500:
+            LearningSession.objects.bulk_update(batch, ['velocity_series'])
+            batch = []
+    if batch:
+        LearningSession.objects.bulk_update(batch, ['velocity_series'])
+
+    batch = []
+    rows = (StudentProgress.objects.exclude(velocity_snapshots=[])
+            .only('id', 'last_practiced', 'velocity_snapshots', 'time_per_question'))
+    for progress in rows.iterator():
+        progress.velocity_series = _series(progress.velocity_snapshots, progress.time_per_question,
+                                           progress.last_practiced.timestamp())
+        batch.append(progress)
+        if len(batch) >= 500:
+            StudentProgress.objects.bulk_update(batch, ['velocity_series'])
+            batch = []
+    if batch:
+        StudentProgress.objects.bulk_update(batch, ['velocity_series'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0016_dataversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='learningsession',
+            name='velocity_series',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='studentprogress',
+            name='velocity_series',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.RunPython(convert_velocity_lists, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='learningsession',
+            name='velocity_data',
+        ),
+        migrations.RemoveField(
+            model_name='studentprogress',
+            name='time_per_question',
+        ),
+        migrations.RemoveField(
+            model_name='studentprogress',
+            name='velocity_snapshots',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 00:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0017_velocity_series'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plannersubject',
+            name='exam_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.0.2 on 2026-10-19 00:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0018_plannersubject_exam_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studyplanitem',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='studyplanitem',
+            name='kind',
+            field=models.CharField(default='study', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='studyplanitem',
+            name='position',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='studyplanitem',
+            index=models.Index(fields=['planner', 'date'], name='planitem_planner_date_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-19 00:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0019_studyplanitem_rows'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plannersubject',
+            name='topics',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='plannersubject',
+            name='topics_pending',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0.2 on 2026-10-19 01:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0020_plannersubject_topics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExternalResource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=100)),
+                ('concept', models.CharField(max_length=200)),
+                ('atom_name', models.CharField(blank=True, default='', max_length=200)),
+                ('videos', models.JSONField(default=list)),
+                ('images', models.JSONField(default=list)),
+                ('fetched_at', models.DateTimeField(auto_now=True)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('subject', 'concept', 'atom_name'), name='extresource_key_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-19 01:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0021_externalresource'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='externalresource',
+            name='requested_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='externalresource',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready')], default='ready', max_length=10),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
+import hashlib
 import json
+import re
 
 class LearningProfile(models.Model):
     """Student's learning profile and progress"""
@@ -85,7 +87,30 @@ class Question(models.Model):
     question_text = models.TextField()
     options = models.JSONField(default=list)
     correct_index = models.IntegerField()
-    
+    # sha1 of the normalized question text — dedupes regenerated questions per atom
+    text_hash = models.CharField(max_length=40, blank=True, default='')
+    # 2PL item parameters fitted from QuestionResponse rows (calibrate_items);
+    # null until enough responses, label priors apply meanwhile
+    irt_a = models.FloatField(null=True, blank=True)
+    irt_b = models.FloatField(null=True, blank=True)
+    irt_responses = models.PositiveIntegerField(default=0)
+    irt_calibrated_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['atom', 'text_hash'], name='question_atom_hash_idx'),
+        ]
+
+    @staticmethod
+    def hash_text(text):
+        """Case, punctuation and whitespace-insensitive hash of a question's text."""
+        normalized = ' '.join(re.sub(r'[^\w\s]', ' ', (text or '').lower()).split())
+        return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+    def save(self, *args, **kwargs):
+        self.text_hash = self.hash_text(self.question_text)
+        super().save(*args, **kwargs)
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -97,6 +122,27 @@ class Question(models.Model):
             'correct_index': self.correct_index,
         }
 
+class QuestionResponse(models.Model):
+    """One student's answer to a stored Question (bank reuse, item calibration)."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='question_responses')
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='responses')
+    session = models.ForeignKey('LearningSession', on_delete=models.SET_NULL, null=True, blank=True)
+    selected = models.IntegerField(null=True, blank=True)
+    correct = models.BooleanField()
+    time_taken = models.FloatField(default=0.0)
+    theta = models.FloatField(default=0.0)  # learner ability when answering
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'question_response'
+        indexes = [
+            models.Index(fields=['user', 'question'], name='qresponse_user_question_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} → Q#{self.question_id} ({'✓' if self.correct else '✗'})"
+
+
 class StudentProgress(models.Model):
     """Track student progress on atoms — enriched for 10-feature pacing engine."""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='progress')
@@ -110,20 +156,28 @@ class StudentProgress(models.Model):
     last_practiced = models.DateTimeField(auto_now=True)
     times_practiced = models.IntegerField(default=0)
 
-    # ── Feature 2: per-atom learning speed ──
-    time_per_question = models.JSONField(default=list, blank=True)  # list of floats (seconds)
-
     # ── Feature 6: retention tracking ──
     retention_score = models.FloatField(default=1.0)
     retention_checks_passed = models.IntegerField(default=0)
     retention_checks_failed = models.IntegerField(default=0)
     next_review_at = models.DateTimeField(null=True, blank=True)
 
-    # ── Feature 10: velocity snapshots ──
-    velocity_snapshots = models.JSONField(default=list, blank=True)
+    # ── Features 2 / 10: per-atom velocity and time per question ──
+    # learning_engine.timeseries.VelocitySeries blob (bounded, downsampled)
+    velocity_series = models.BinaryField(null=True, blank=True)
 
     class Meta:
         unique_together = ['user', 'atom']
+        indexes = [
+            models.Index(fields=['user', 'mastery_score'], name='progress_user_mastery_idx'),
+            # class-level mastery aggregates over a concept's atoms (teacher views)
+            models.Index(fields=['atom', 'mastery_score'], name='progress_atom_mastery_idx'),
+            models.Index(fields=['user', 'phase'], name='progress_user_phase_idx'),
+            models.Index(
+                fields=['user', 'next_review_at'], name='progress_user_review_idx',
+                condition=models.Q(next_review_at__isnull=False),
+            ),
+        ]
 
 
     
@@ -161,7 +215,18 @@ class LearningSession(models.Model):
     consecutive_skips = models.IntegerField(default=0)
 
     # ── Feature 10: session-level velocity snapshots ──
-    velocity_data = models.JSONField(default=list, blank=True)  
+    # learning_engine.timeseries.VelocitySeries blob (bounded, downsampled)
+    velocity_series = models.BinaryField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # "resume the open session for this concept"
+            models.Index(
+                fields=['user', 'concept'], name='session_user_open_idx',
+                condition=models.Q(end_time__isnull=True),
+            ),
+            models.Index(fields=['user', 'start_time'], name='session_user_start_idx'),
+        ]
 
 
 class UserXP(models.Model):
@@ -192,6 +257,22 @@ class UserXP(models.Model):
         self.save()
 
 
+class DataVersion(models.Model):
+    """
+    Change counter behind ETags / the response cache (accounts/http_cache.py).
+    key: 'user:<id>' (that user's progress, sessions, XP, profile), 'xp' (any
+    user's XP — leaderboard and ranks) or 'content' (concepts and atoms).
+    """
+    key = models.CharField(max_length=64, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'data_version'
+
+    def __str__(self):
+        return f"{self.key} v{self.version}"
+
+
 # ==================== TEACHER MODELS ====================
 
 class TeacherProfile(models.Model):
@@ -261,6 +342,9 @@ class QuestionApproval(models.Model):
     class Meta:
         db_table = 'question_approval'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='qapproval_status_idx'),
+        ]
 
     def __str__(self):
         return f"Q#{self.question.id} - {self.status}"
@@ -387,6 +471,9 @@ class PlannerSubject(models.Model):
     planner = models.ForeignKey(StudyPlanner, on_delete=models.CASCADE, related_name='subjects')
     subject_name = models.CharField(max_length=200)
     priority = models.IntegerField(default=1)  # 1 = high, 2 = medium, 3 = low
+    exam_date = models.DateField(null=True, blank=True)  # scheduling urgency (planner_engine)
+    topics = models.JSONField(default=list, blank=True)  # generated subtopics, in study order
+    topics_pending = models.BooleanField(default=False)  # still generating (planner_topics)
 
 class StudyPlanItem(models.Model):
     planner = models.ForeignKey(
@@ -399,10 +486,84 @@ class StudyPlanItem(models.Model):
     subject = models.CharField(max_length=255)
     topic = models.CharField(max_length=255)
     hours = models.FloatField(default=1)
+    kind = models.CharField(max_length=10, default='study')   # study | review (planner_engine)
+    position = models.PositiveSmallIntegerField(default=0)    # order within the day
 
     completed = models.BooleanField(default=False)
+    completed_at = models.DateTimeField(null=True, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # "today" / "this week" for one planner
+            models.Index(fields=['planner', 'date'], name='planitem_planner_date_idx'),
+        ]
+
     def __str__(self):
         return f"{self.date} - {self.subject} - {self.topic}"
+
+
+class ExternalResource(models.Model):
+    """Videos/images found for (subject, concept, atom), kept until expires_at (accounts/resource_cache.py)."""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),   # a background search is running
+        ('ready', 'Ready'),
+    ]
+
+    subject = models.CharField(max_length=100)
+    concept = models.CharField(max_length=200)
+    atom_name = models.CharField(max_length=200, blank=True, default='')
+    videos = models.JSONField(default=list)
+    images = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='ready')
+    requested_at = models.DateTimeField(null=True, blank=True)  # background search claimed at
+    fetched_at = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['subject', 'concept', 'atom_name'], name='extresource_key_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} / {self.concept} / {self.atom_name}"
+
+
+class Job(models.Model):
+    """A unit of background work for accounts/jobs.py (run by `manage.py run_workers` or in-process threads)."""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),     # out of attempts
+    ]
+
+    name = models.CharField(max_length=100)                  # registered handler
+    payload = models.JSONField(default=dict, blank=True)     # handler keyword arguments
+    key = models.CharField(max_length=200, null=True, blank=True)  # idempotency key
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_at = models.DateTimeField()                          # not before (retry backoff)
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    locked_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # the workers' "next due job" scan
+            models.Index(fields=['status', 'run_at'], name='job_status_run_at_idx'),
+        ]
+        constraints = [
+            # one queued/running job per key; finished jobs don't block a new one
+            models.UniqueConstraint(fields=['key'], condition=models.Q(status__in=['queued', 'running']),
+                                    name='job_active_key_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.id} ({self.status})"
@@ -0,0 +1,237 @@
+# backend/accounts/near_duplicates.py
+# MinHash / LSH near-duplicate detection for stored questions.
+#   - shingles: word bigrams of the normalized question text + option words
+#     (option order doesn't matter, so reshuffled copies still match)
+#   - signature: NUM_PERM MinHash values; agreement ≈ Jaccard of the shingle sets
+#   - LSH: BANDS bands of ROWS values; two questions become candidates when any
+#     band matches, so a lookup touches a handful of buckets, not the whole bank
+# Used by _persist_generated_questions (one incrementally maintained index per atom;
+# a generated paraphrase is served as the stored question it matches, never under
+# its id with its own options), the dedupe_questions command and the clusters in
+# TeacherQuestionListView.
+
+import hashlib
+import random
+import re
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS   # candidate threshold ≈ (1/BANDS) ** (1/ROWS) ≈ 0.5
+THRESHOLD = 0.6            # estimated Jaccard at which two questions count as the same item
+MAX_ATOMS = 512            # per-atom indexes kept in memory (least recently used dropped)
+REBUILD_AFTER = 600        # seconds before an atom's index is rebuilt from the table
+
+_PRIME = (1 << 61) - 1
+_MASK = (1 << 32) - 1
+_rng = random.Random(0x5EED)   # fixed: signatures must agree across processes and restarts
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+
+def normalize(text: str) -> str:
+    # Same normalization as Question.hash_text
+    return ' '.join(re.sub(r'[^\w\s]', ' ', (text or '').lower()).split())
+
+
+def shingles(text: str, options: Sequence = ()) -> set:
+    words = normalize(text).split()
+    grams = {f'{a} {b}' for a, b in zip(words, words[1:])} or set(words)
+    for option in options or ():
+        grams.update(f'o:{w}' for w in normalize(str(option)).split())
+    return grams
+
+
+def _hash64(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+@lru_cache(maxsize=50_000)
+def _signature(text: str, options: Tuple[str, ...]) -> Tuple[int, ...]:
+    hashes = [_hash64(s) for s in shingles(text, options)]
+    if not hashes:
+        return (_MASK,) * NUM_PERM
+    return tuple(min(((a * h + b) % _PRIME) & _MASK for h in hashes) for a, b in _PERMS)
+
+
+def signature(text: str, options: Sequence = ()) -> Tuple[int, ...]:
+    return _signature(text or '', tuple(str(o) for o in options or ()))
+
+
+def similarity(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of the two shingle sets."""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / NUM_PERM
+
+
+def _bands(sig: Sequence[int]):
+    for band in range(BANDS):
+        yield band, tuple(sig[band * ROWS:(band + 1) * ROWS])
+
+
+# ════════════════════════════════════════════════════════════════
+#  LSH INDEX
+# ════════════════════════════════════════════════════════════════
+
+class NearDuplicateIndex:
+    """LSH buckets over MinHash signatures; keys are question ids (or any hashable)."""
+
+    def __init__(self, threshold: float = THRESHOLD):
+        self.threshold = threshold
+        self.signatures: Dict = {}
+        self.buckets: Dict[tuple, List] = defaultdict(list)
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def add(self, key, sig: Sequence[int]):
+        if key in self.signatures:
+            return
+        self.signatures[key] = sig
+        for band in _bands(sig):
+            self.buckets[band].append(key)
+
+    def remove(self, key):
+        sig = self.signatures.pop(key, None)
+        if sig is None:
+            return
+        for band in _bands(sig):
+            bucket = self.buckets.get(band)
+            if bucket and key in bucket:
+                bucket.remove(key)
+                if not bucket:
+                    del self.buckets[band]
+
+    def candidates(self, sig: Sequence[int]) -> set:
+        found = set()
+        for band in _bands(sig):
+            found.update(self.buckets.get(band, ()))
+        return found
+
+    def matches(self, sig: Sequence[int]) -> List[Tuple[object, float]]:
+        """Indexed keys similar to sig, most similar first."""
+        scored = []
+        for key in self.candidates(sig):
+            score = similarity(sig, self.signatures[key])
+            if score >= self.threshold:
+                scored.append((key, score))
+        scored.sort(key=lambda item: (-item[1], str(item[0])))
+        return scored
+
+    def find(self, sig: Sequence[int]):
+        """Best near-duplicate key for sig, or None."""
+        found = self.matches(sig)
+        return found[0][0] if found else None
+
+
+def clusters(items: Iterable[Tuple[object, Sequence[int]]], threshold: float = THRESHOLD) -> Dict[object, object]:
+    """
+    Group (key, signature) pairs into near-duplicate clusters.
+
+    Returns {key: cluster id} for keys that have at least one near duplicate; the
+    cluster id is the smallest key in the cluster. Singletons are left out.
+    """
+    index = NearDuplicateIndex(threshold)
+    parent = {}
+
+    def root(key):
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    for key, sig in items:
+        parent[key] = key
+        for other, _ in index.matches(sig):
+            a, b = root(key), root(other)
+            if a != b:
+                parent[max(a, b)] = min(a, b)
+        index.add(key, sig)
+
+    members = defaultdict(list)
+    for key in parent:
+        members[root(key)].append(key)
+    return {key: min(group) for group in members.values() if len(group) > 1 for key in group}
+
+
+# ════════════════════════════════════════════════════════════════
+#  PER-ATOM INDEXES OVER THE QUESTION TABLE
+# ════════════════════════════════════════════════════════════════
+
+class AtomQuestionIndex(NearDuplicateIndex):
+    def __init__(self, atom_id: int):
+        super().__init__()
+        self.atom_id = atom_id
+        self.last_question_id = 0
+        self.built_at = time.monotonic()
+
+    def refresh_from_db(self):
+        """Index Question rows created since the last refresh (one query)."""
+        from .models import Question
+
+        # Saves and deletes in this process reach the index through the Question
+        # signals; a periodic rebuild picks up the ones other processes made
+        # (e.g. dedupe_questions --apply) without counting rows on every call
+        if time.monotonic() - self.built_at > REBUILD_AFTER:
+            self.signatures.clear()
+            self.buckets.clear()
+            self.last_question_id = 0
+            self.built_at = time.monotonic()
+        rows = (Question.objects.filter(atom_id=self.atom_id, id__gt=self.last_question_id)
+                .order_by('id').values_list('id', 'question_text', 'options'))
+        for question_id, text, options in rows:
+            self.add(question_id, signature(text, options))
+            self.last_question_id = question_id
+
+    def add_question(self, question):
+        # last_question_id is left alone: rows other processes insert meanwhile
+        # may have lower ids, and re-adding ours on the next refresh is a no-op
+        self.add(question.id, signature(question.question_text, question.options))
+
+
+_indexes: 'OrderedDict[int, AtomQuestionIndex]' = OrderedDict()
+_lock = threading.Lock()
+
+
+def index_for_atom(atom_id: int) -> AtomQuestionIndex:
+    """Process-wide index for one atom, caught up with rows other processes created."""
+    with _lock:
+        index = _indexes.pop(atom_id, None)
+        if index is None:
+            index = AtomQuestionIndex(atom_id)
+        _indexes[atom_id] = index
+        while len(_indexes) > MAX_ATOMS:
+            _indexes.popitem(last=False)
+        index.refresh_from_db()
+        return index
+
+
+def on_question_saved(sender, instance, created, **kwargs):
+    """post_save hook: match against the question's current text and options."""
+    index = _indexes.get(instance.atom_id)
+    if index is not None:
+        with _lock:
+            index.remove(instance.id)
+            index.add_question(instance)
+
+
+def on_question_deleted(sender, instance, **kwargs):
+    """post_delete hook: stop matching against removed questions."""
+    index = _indexes.get(instance.atom_id)
+    if index is not None:
+        with _lock:
+            index.remove(instance.id)
+
+
+def question_clusters(questions) -> Dict[int, int]:
+    """{question id: cluster id} for near-duplicate groups among Question objects, per atom."""
+    by_atom = defaultdict(list)
+    for q in questions:
+        by_atom[q.atom_id].append((q.id, signature(q.question_text, q.options)))
+    result = {}
+    for items in by_atom.values():
+        result.update(clusters(sorted(items)))
+    return result
+
@@ -0,0 +1,115 @@
+# backend/accounts/overrides.py
+# Class-wide teacher overrides ("force_review atom X for everyone below 0.5").
+#   - a selector picks StudentProgress rows: concept and/or atoms (required),
+#     optionally students and a mastery range [mastery_min, mastery_max)
+#   - the action is one set-based UPDATE over the selection, inside the same
+#     transaction as the bulk-created TeacherOverride audit rows
+#   - queryset.update() skips post_save, so the dashboard versions (http_cache)
+#     and mastery snapshots (mastery_cache) are bumped / dropped here explicitly
+# Action semantics match the single-student TeacherOverrideListView.post.
+
+from typing import Dict, List, Tuple
+
+from django.db.models import QuerySet
+
+from core.sqlite import write_transaction
+
+from . import http_cache, mastery_cache
+from .models import StudentProgress, TeacherOverride
+
+BULK_ACTIONS = ('reset_mastery', 'set_mastery', 'force_review', 'skip_atom')
+AUDIT_BATCH_SIZE = 500
+
+
+def _ids(value, name) -> List[int]:
+    if value is None:
+        return []
+    if not isinstance(value, (list, tuple)):
+        value = [value]
+    try:
+        return [int(v) for v in value]
+    except (TypeError, ValueError):
+        raise ValueError(f'{name} must be a list of ids')
+
+
+def _fraction(value, name):
+    if value is None or value == '':
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{name} must be a number')
+    if not 0.0 <= value <= 1.0:
+        raise ValueError(f'{name} must be between 0 and 1')
+    return value
+
+
+def select_progress(selector: Dict) -> QuerySet:
+    """StudentProgress rows matched by a bulk-override selector; raises ValueError on a bad one."""
+    concepts = _ids(selector.get('concept'), 'concept')
+    atoms = _ids(selector.get('atoms'), 'atoms')
+    if not concepts and not atoms:
+        raise ValueError('selector needs a concept or a list of atoms')
+
+    rows = StudentProgress.objects.all()
+    if concepts:
+        rows = rows.filter(atom__concept_id__in=concepts)
+    if atoms:
+        rows = rows.filter(atom_id__in=atoms)
+    students = _ids(selector.get('students'), 'students')
+    if students:
+        rows = rows.filter(user_id__in=students)
+    low = _fraction(selector.get('mastery_min'), 'mastery_min')
+    high = _fraction(selector.get('mastery_max'), 'mastery_max')
+    if low is not None:
+        rows = rows.filter(mastery_score__gte=low)
+    if high is not None:
+        rows = rows.filter(mastery_score__lt=high)
+    return rows
+
+
+def action_updates(action: str, parameters: Dict) -> Dict:
+    """Field values one action writes to every selected StudentProgress row."""
+    if action == 'reset_mastery':
+        return {'mastery_score': 0.0, 'phase': 'not_started', 'streak': 0}
+    if action == 'set_mastery':
+        mastery = _fraction(parameters.get('mastery', 0.5), 'parameters.mastery')
+        return {'mastery_score': mastery}
+    if action == 'force_review':
+        return {'phase': 'reinforcement', 'retention_verified': False}
+    if action == 'skip_atom':
+        return {'phase': 'complete'}
+    raise ValueError(f"action must be one of {', '.join(BULK_ACTIONS)}")
+
+
+def apply_bulk_override(teacher, selector: Dict, action: str, parameters: Dict = None, reason: str = '') -> Dict:
+    """
+    Apply `action` to every StudentProgress row the selector matches, with one
+    audit TeacherOverride per row. Returns the affected counts.
+    """
+    parameters = parameters or {}
+    updates = action_updates(action, parameters)
+    rows = select_progress(selector)
+
+    with write_transaction():
+        matched: List[Tuple[int, int, int]] = list(rows.values_list('user_id', 'atom_id', 'atom__concept_id'))
+        if not matched:
+            return {'action': action, 'rows_updated': 0, 'students': 0, 'atoms': 0, 'overrides_created': 0}
+        updated = rows.update(**updates)
+        TeacherOverride.objects.bulk_create([
+            TeacherOverride(teacher=teacher, student_id=user_id, atom_id=atom_id, concept_id=concept_id,
+                            action=action, parameters=parameters, reason=reason)
+            for user_id, atom_id, concept_id in matched
+        ], batch_size=AUDIT_BATCH_SIZE)
+
+        students = {user_id for user_id, _, _ in matched}
+        http_cache.bump(*(http_cache.user_key(user_id) for user_id in students))
+        mastery_cache.forget((user_id, atom_id) for user_id, atom_id, _ in matched)
+
+    return {
+        'action': action,
+        'rows_updated': updated,
+        'students': len(students),
+        'atoms': len({atom_id for _, atom_id, _ in matched}),
+        'overrides_created': len(matched),
+    }
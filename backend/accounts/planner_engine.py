@@ -1,39 +1,284 @@
-import random
+# backend/accounts/planner_engine.py
+# Study planner scheduling.
+# TimetableSolver hands out each day's free hours one at a time from a
+# priority queue (stride scheduling): every subject carries a "pass" value,
+# the smallest pass gets the next hour and then advances by 1 / weight, so over
+# the horizon each subject's share of hours follows its weight
+#     weight = (4 - priority) × max(1 - mastery, MIN_GAP) × urgency(day)
+# where urgency grows as the subject's exam date approaches and drops to 0
+# after it. Reviews due that day (StudentProgress.next_review_at) are placed
+# first; what doesn't fit carries over. O(hours × log subjects) per day — a
+# semester is a few milliseconds. The state at the start of each day is kept,
+# so changing one day's hours (replan) only re-solves from that day on.
+# Plans are stored as StudyPlanItem rows (one bulk_create, read by
+# (planner, date)); StudyPlanner.timetable is only read for plans made before.
+# A stored plan is re-planned (PlannerReplanView) by rebuilding its solver
+# from the rows — each day's hours are the hours stored for it — and
+# rewriting the rows from the changed day on.
+
+import bisect
+import dataclasses
+import heapq
+import math
 from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence
+
+from django.db.models import Avg
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from .models import StudentProgress, StudyPlanItem
 
 DAYS_MON_FRI = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
 DAYS_MON_SUN = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
 
+MIN_GAP = 0.2            # a mastered subject still gets some maintenance time
+EXAM_URGENCY = 7.0       # weight × (1 + EXAM_URGENCY / days to exam)
+REVIEWS_PER_HOUR = 6     # due review items one hour covers
+MAX_REVIEW_SHARE = 0.5   # of a day's hours
 
-def generate_timetable(planner):
-    if planner.day_option == "mon_fri":
-        days = DAYS_MON_FRI
-    else:
-        days = DAYS_MON_SUN
 
-    subjects = list(planner.subjects.all())
-    subjects_sorted = sorted(subjects, key=lambda x: x.priority)
+@dataclasses.dataclass
+class SubjectDemand:
+    name: str
+    priority: int = 1                       # 1 = high, 2 = medium, 3 = low
+    topics: Sequence[str] = ()
+    mastery: float = 0.0                    # mean StudentProgress mastery for the subject
+    exam_date: Optional[date] = None
+    reviews: Dict[date, int] = dataclasses.field(default_factory=dict)   # due review items per day
 
-    timetable = defaultdict(list)
+    def weight(self, day: date) -> float:
+        if self.exam_date is not None and day > self.exam_date:
+            return 0.0
+        base = 4 - min(max(int(self.priority or 1), 1), 3)
+        urgency = 1.0
+        if self.exam_date is not None:
+            urgency += EXAM_URGENCY / ((self.exam_date - day).days + 1)
+        return base * max(1.0 - self.mastery, MIN_GAP) * urgency
 
-    subject_cycle = []
 
-    for subject in subjects_sorted:
-        subject_cycle.extend([subject.subject_name] * (4 - subject.priority))
+@dataclasses.dataclass
+class _State:
+    passes: List[float]
+    topic_index: List[int]
+    backlog: List[int]          # review items carried over
 
-    if not subject_cycle:
-        return {}
+    def copy(self):
+        return _State(list(self.passes), list(self.topic_index), list(self.backlog))
+
+
+def schedule_days(start: date, count: int, day_option: str) -> List[date]:
+    """The next `count` calendar days from start, without weekends for mon_fri."""
+    days = [start + timedelta(days=i) for i in range(count)]
+    if day_option == 'mon_fri':
+        days = [d for d in days if d.weekday() < 5]
+    return days
+
+
+class TimetableSolver:
+    def __init__(self, subjects: Sequence[SubjectDemand], days: Sequence[date], hours_per_day: int,
+                 day_hours: Optional[Dict[date, int]] = None):
+        self.subjects = list(subjects)
+        self.days = list(days)
+        self.hours_per_day = hours_per_day
+        self.day_hours = dict(day_hours or {})
+        self.sessions: List[List[Dict]] = [[] for _ in self.days]
+        self._checkpoints: List[Optional[_State]] = [None] * len(self.days)
+        n = len(self.subjects)
+        self._solve_from(0, _State([0.0] * n, [0] * n, [0] * n))
+
+    def _solve_from(self, first: int, state: _State) -> None:
+        for i in range(first, len(self.days)):
+            self._checkpoints[i] = state.copy()
+            self.sessions[i] = self._solve_day(self.days[i], state)
+
+    def _solve_day(self, day: date, state: _State) -> List[Dict]:
+        hours = max(int(self.day_hours.get(day, self.hours_per_day)), 0)
+        weights = [s.weight(day) for s in self.subjects]
+        live = [i for i, w in enumerate(weights) if w > 0]
+        if not live or not hours:
+            for i, s in enumerate(self.subjects):
+                state.backlog[i] += s.reviews.get(day, 0)
+            return []
+        # subjects coming back (or starting) join at the current front, not with stale credit
+        front = min(state.passes[i] for i in live)
+        for i in live:
+            state.passes[i] = max(state.passes[i], front)
+
+        sessions = []
+        review_hours = int(hours * MAX_REVIEW_SHARE)   # 0 on a 1-hour day: reviews carry over
+        for i, subject in enumerate(self.subjects):
+            state.backlog[i] += subject.reviews.get(day, 0)
+            if not state.backlog[i] or weights[i] <= 0 or not review_hours:
+                continue
+            take = min(math.ceil(state.backlog[i] / REVIEWS_PER_HOUR), review_hours)
+            items = min(state.backlog[i], take * REVIEWS_PER_HOUR)
+            state.backlog[i] -= items
+            review_hours -= take
+            hours -= take
+            state.passes[i] += take / weights[i]
+            sessions.append({'subject': subject.name, 'topic': f'Review {subject.name} ({items} due)',
+                             'hours': take, 'kind': 'review'})
+
+        heap = [(state.passes[i], i) for i in live]
+        heapq.heapify(heap)
+        picked = defaultdict(int)
+        for _ in range(hours):
+            current, i = heapq.heappop(heap)
+            picked[i] += 1
+            state.passes[i] = current + 1.0 / weights[i]
+            heapq.heappush(heap, (state.passes[i], i))
+
+        for i in sorted(picked, key=lambda i: (-picked[i], i)):
+            subject = self.subjects[i]
+            for _ in range(picked[i]):
+                if subject.topics:
+                    topic = subject.topics[state.topic_index[i] % len(subject.topics)]
+                    state.topic_index[i] += 1
+                else:
+                    topic = f'Study {subject.name}'
+                sessions.append({'subject': subject.name, 'topic': topic, 'hours': 1, 'kind': 'study'})
+        return sessions
+
+    def replan(self, day: date, hours: int) -> List[date]:
+        """Change one day's available hours; re-solves from that day and returns the days re-solved."""
+        if day not in self.days:
+            raise ValueError(f'{day} is not a scheduled day of this plan')
+        self.day_hours[day] = hours
+        first = self.days.index(day)
+        self._solve_from(first, self._checkpoints[first].copy())
+        return self.days[first:]
+
+    def schedule(self) -> List[Dict]:
+        """Same shape as ai_study_planner.distribute_topics: one entry per day."""
+        return [{
+            'date': day.strftime('%Y-%m-%d'),
+            'day': day.strftime('%A'),
+            'sessions': sessions,
+            'total_hours': sum(s['hours'] for s in sessions),
+        } for day, sessions in zip(self.days, self.sessions)]
+
+
+def subject_demands(user, subjects_with_topics: Sequence[Dict], days: Sequence[date]) -> List[SubjectDemand]:
+    """
+    SubjectDemand per planner subject, with the student's mastery and due reviews
+    on concepts of that subject (matched case-insensitively on Concept.subject):
+    two grouped queries whatever the number of subjects. A review due on a day
+    off (or already overdue) lands on the next scheduled day.
+    """
+    names = {s['subject_name'].strip().lower() for s in subjects_with_topics if s.get('subject_name')}
+    progress = (StudentProgress.objects.filter(user=user)
+                .annotate(subject=Lower('atom__concept__subject')).filter(subject__in=names))
+    mastery = dict(progress.values_list('subject').annotate(avg=Avg('mastery_score')))
+    reviews = defaultdict(lambda: defaultdict(int))
+    if days:
+        due_rows = progress.filter(next_review_at__date__lte=days[-1]).values_list('subject', 'next_review_at')
+        for subject, due in due_rows:
+            reviews[subject][days[bisect.bisect_left(days, timezone.localdate(due))]] += 1
 
-    index = 0
+    demands = []
+    for s in subjects_with_topics:
+        key = s['subject_name'].strip().lower()
+        demands.append(SubjectDemand(
+            name=s['subject_name'], priority=s.get('priority', 1), topics=list(s.get('topics') or ()),
+            mastery=float(mastery.get(key) or 0.0), exam_date=s.get('exam_date'), reviews=dict(reviews[key]),
+        ))
+    return demands
 
-    for day in days:
-        for hour in range(planner.free_hours_per_day):
-            subject_name = subject_cycle[index % len(subject_cycle)]
-            timetable[day].append({
-                "hour": hour + 1,
-                "subject": subject_name,
-                "status": "pending"
-            })
-            index += 1
 
-    return dict(timetable)
\ No newline at end of file
+# ════════════════════════════════════════════════════════════════
+#  STORED PLANS
+# ════════════════════════════════════════════════════════════════
+
+PLAN_ITEM_BATCH_SIZE = 500
+MAX_PLAN_DAYS = 182      # a semester
+
+
+def materialize(planner, solver: TimetableSolver) -> List[StudyPlanItem]:
+    """Write the solved plan as StudyPlanItem rows (one bulk INSERT per batch)."""
+    items = [
+        StudyPlanItem(planner=planner, date=day, subject=s['subject'], topic=s['topic'], hours=s['hours'],
+                      kind=s['kind'], position=position)
+        for day, sessions in zip(solver.days, solver.sessions)
+        for position, s in enumerate(sessions)
+    ]
+    return StudyPlanItem.objects.bulk_create(items, batch_size=PLAN_ITEM_BATCH_SIZE)
+
+
+def stored_solver(planner) -> Optional[TimetableSolver]:
+    """The solver of a stored plan, from its first to its last day, with each day's stored hours."""
+    day_hours = defaultdict(int)
+    for day, hours in planner.items.values_list('date', 'hours'):
+        day_hours[day] += int(hours)
+    if not day_hours:
+        return None
+    first, last = min(day_hours), max(day_hours)
+    days = schedule_days(first, (last - first).days + 1, planner.day_option)
+    subjects = [{'subject_name': s.subject_name, 'priority': s.priority, 'exam_date': s.exam_date,
+                 'topics': s.topics} for s in planner.subjects.order_by('id')]
+    return TimetableSolver(subject_demands(planner.user, subjects, days), days, planner.free_hours_per_day,
+                           day_hours={day: day_hours.get(day, 0) for day in days})
+
+
+def rematerialize_from(planner, solver: TimetableSolver, first: date) -> List[StudyPlanItem]:
+    """
+    Replace the plan's rows from `first` on with the solver's sessions (call
+    inside a transaction). Items completed before keep their completion when
+    the same (date, subject, topic) is planned again.
+    """
+    rows = planner.items.filter(date__gte=first)
+    completed = {(d, subject, topic): at for d, subject, topic, at in
+                 rows.filter(completed=True).values_list('date', 'subject', 'topic', 'completed_at')}
+    rows.delete()
+    items = []
+    for day, sessions in zip(solver.days, solver.sessions):
+        if day < first:
+            continue
+        for position, s in enumerate(sessions):
+            key = (day, s['subject'], s['topic'])
+            items.append(StudyPlanItem(planner=planner, date=day, subject=s['subject'], topic=s['topic'],
+                                       hours=s['hours'], kind=s['kind'], position=position,
+                                       completed=key in completed, completed_at=completed.pop(key, None)))
+    return StudyPlanItem.objects.bulk_create(items, batch_size=PLAN_ITEM_BATCH_SIZE)
+
+
+def item_entry(item: StudyPlanItem) -> Dict:
+    return {
+        'id': item.id,
+        'date': item.date,
+        'hour': item.position + 1,
+        'subject': item.subject,
+        'topic': item.topic,
+        'hours': item.hours,
+        'kind': item.kind,
+        'status': 'completed' if item.completed else 'pending',
+    }
+
+
+def timetable_from_items(items: Sequence[StudyPlanItem]) -> Dict[str, List[Dict]]:
+    """{day name: sessions} for up to a week of items, sorted by (date, position)."""
+    timetable: Dict[str, List[Dict]] = {}
+    for item in items:
+        timetable.setdefault(item.date.strftime('%A'), []).append(item_entry(item))
+    return timetable
+
+
+def week_items(planner, start: date):
+    return planner.items.filter(date__gte=start, date__lt=start + timedelta(days=7)).order_by('date', 'position')
+
+
+def generate_timetable(planner):
+    """Weekly {day name: [{'hour', 'subject', 'status'}]} for a saved planner."""
+    days = schedule_days(date.today(), 7, planner.day_option)
+    subjects = [SubjectDemand(name=s.subject_name, priority=s.priority, exam_date=s.exam_date)
+                for s in planner.subjects.all()]
+    if not subjects:
+        return {}
+    solver = TimetableSolver(subjects, days, planner.free_hours_per_day)
+    timetable = {}
+    for day, sessions in zip(days, solver.sessions):
+        timetable[day.strftime('%A')] = [
+            {"hour": hour + 1, "subject": s['subject'], "status": "pending"} for hour, s in enumerate(sessions)
+        ]
+    return timetable
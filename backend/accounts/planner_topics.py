@@ -0,0 +1,140 @@
+# backend/accounts/planner_topics.py
+# Subtopic generation for new study planners.
+#   - one Gemini call per subject, fanned out on a bounded module-level pool;
+#     each call has its own timeout (SUBTOPIC_TIMEOUT), the request waits at
+#     most SUBTOPIC_DEADLINE for all of them together
+#   - results are cached process-wide by (subject, goal, num_topics), so the
+#     fiftieth "Mathematics / exam" planner costs no LLM call; the generic
+#     fallback topics are cached only briefly
+#   - subjects still generating at the deadline are planned with placeholder
+#     topics and marked topics_pending; when their call finishes, a done
+#     callback rewrites that subject's StudyPlanItem topics in place and
+#     clears the flag (polled through PlannerTopicsView)
+#   - the callback lives in this process only, so each late subject also gets
+#     a 'planner.subtopics' job (accounts/jobs.py) due after SUBTOPIC_TIMEOUT:
+#     if a restart lost the callback, the job fills the subject; otherwise it
+#     finds the flag cleared (or the topics cached) and costs no LLM call
+
+import logging
+import threading
+from concurrent.futures import ALL_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Sequence, Tuple
+
+from django.core.cache import cache
+from django.db import connection
+
+from core.sqlite import write_transaction
+from learning_engine.ai_study_planner import generate_subtopics, get_default_topics
+
+from . import jobs
+from .models import PlannerSubject, StudyPlanItem
+
+logger = logging.getLogger(__name__)
+
+SUBTOPIC_WORKERS = 4
+SUBTOPIC_TIMEOUT = 20        # seconds per Gemini call
+SUBTOPIC_DEADLINE = 8        # seconds the create-planner request waits for all subjects
+SUBTOPIC_CACHE_TTL = 7 * 24 * 3600
+FALLBACK_CACHE_TTL = 300     # generic topics (LLM failed): retry soon
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=SUBTOPIC_WORKERS, thread_name_prefix='subtopics')
+    return _pool
+
+
+def cache_key(subject: str, goal: str, num_topics: int) -> str:
+    return f"subtopics:{' '.join(subject.lower().split())}:{goal}:{num_topics}"
+
+
+def subtopics(subject: str, goal: str, num_topics: int = 8) -> List[str]:
+    """generate_subtopics through the shared cache."""
+    key = cache_key(subject, goal, num_topics)
+    topics = cache.get(key)
+    if topics is None:
+        topics = generate_subtopics(subject=subject, goal=goal, num_topics=num_topics, timeout=SUBTOPIC_TIMEOUT)
+        fallback = topics == get_default_topics(subject)
+        cache.set(key, topics, FALLBACK_CACHE_TTL if fallback else SUBTOPIC_CACHE_TTL)
+    return topics
+
+
+def fan_out(subjects: Sequence[str], goal: str, num_topics: int = 8,
+            deadline: float = None) -> Tuple[Dict[str, List[str]], Dict[str, Future]]:
+    """
+    Generate topics for every subject concurrently. Returns (ready, late):
+    topics of the subjects done within `deadline` (default SUBTOPIC_DEADLINE),
+    futures of the others.
+    """
+    deadline = SUBTOPIC_DEADLINE if deadline is None else deadline
+    ready, futures = {}, {}
+    for subject in dict.fromkeys(subjects):
+        topics = cache.get(cache_key(subject, goal, num_topics))
+        if topics is not None:
+            ready[subject] = topics
+        else:
+            futures[subject] = _executor().submit(subtopics, subject, goal, num_topics)
+    if futures:
+        wait(futures.values(), timeout=deadline, return_when=ALL_COMPLETED)
+    late = {}
+    for subject, future in futures.items():
+        if future.done() and future.exception() is None:
+            ready[subject] = future.result()
+        elif future.done():
+            logger.warning('Subtopic generation failed for %s: %s', subject, future.exception())
+            ready[subject] = placeholder_topics(subject, num_topics)
+        else:
+            late[subject] = future
+    return ready, late
+
+
+def placeholder_topics(subject: str, num_topics: int = 8) -> List[str]:
+    return get_default_topics(subject)[:num_topics]
+
+
+def fill_subject(planner_subject_id: int, topics: List[str]) -> int:
+    """Late topics arrived: store them and rewrite the subject's study items in order."""
+    subject = PlannerSubject.objects.get(id=planner_subject_id)
+    items = list(StudyPlanItem.objects.filter(planner_id=subject.planner_id, subject=subject.subject_name,
+                                              kind='study').order_by('date', 'position'))
+    for i, item in enumerate(items):
+        item.topic = topics[i % len(topics)] if topics else f'Study {subject.subject_name}'
+    with write_transaction():
+        StudyPlanItem.objects.bulk_update(items, ['topic'], batch_size=500)
+        PlannerSubject.objects.filter(id=planner_subject_id).update(topics=topics, topics_pending=False)
+    return len(items)
+
+
+@jobs.handler('planner.subtopics')
+def fill_late_subject(planner_subject_id: int, num_topics: int = 8) -> Dict:
+    """Job: fill a subject still pending once its in-process callback should have run."""
+    subject = PlannerSubject.objects.select_related('planner').filter(id=planner_subject_id).first()
+    if subject is None or not subject.topics_pending:
+        return {'items': 0}
+    topics = subtopics(subject.subject_name, subject.planner.goal_type, num_topics)
+    return {'items': fill_subject(planner_subject_id, topics)}
+
+
+def fill_when_done(planner_subject_id: int, subject_name: str, future: Future, num_topics: int = 8) -> None:
+    """Register the late-subject callback (runs on the pool thread, or here if already done) and its job."""
+    jobs.enqueue('planner.subtopics', {'planner_subject_id': planner_subject_id, 'num_topics': num_topics},
+                 key=f'planner.subtopics:{planner_subject_id}', delay=SUBTOPIC_TIMEOUT)
+    on_request_thread = threading.current_thread()
+
+    def done(f):
+        try:
+            topics = f.result() if f.exception() is None else placeholder_topics(subject_name, num_topics)
+            fill_subject(planner_subject_id, topics)
+        except Exception:
+            logger.exception('Filling late subtopics for planner subject %s failed', planner_subject_id)
+        finally:
+            if threading.current_thread() is not on_request_thread:
+                connection.close()   # pool threads are reused; don't leak their connection
+
+    future.add_done_callback(done)
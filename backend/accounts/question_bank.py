@@ -0,0 +1,122 @@
+# backend/accounts/question_bank.py
+# Serve practice questions from the stored Question bank before calling the LLM.
+# Only teacher-approved questions (approved / edited) that the student has not
+# answered yet are served; the LLM is asked only for what the bank can't cover,
+# so generation cost scales with content rather than with the number of students.
+# Which questions are served is adaptive: the most informative ones at the
+# student's ability (learning_engine/item_selection.py).
+
+import random
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from learning_engine.item_selection import ItemPool, select_items
+from learning_engine.knowledge_tracing import ITEM_DIFFICULTY_PRIORS, item_parameters
+
+from .models import Question, QuestionResponse
+
+SERVABLE_STATUSES = ('approved', 'edited')
+DIFFICULTY_ORDER = {'easy': 0, 'medium': 1, 'hard': 2}
+BANK_TTL = 60              # seconds an atom's cached pool is trusted (other processes' edits)
+MAX_BANKS = 512
+
+
+def question_payload(question: Question) -> Dict:
+    """Session-ready question dict (with 'id'), teacher edits applied."""
+    data = question.to_dict()
+    data['irt_a'], data['irt_b'] = question.irt_a, question.irt_b
+    approval = question.approval
+    if approval.status == 'edited':
+        if approval.edited_question_text:
+            data['question'] = approval.edited_question_text
+        if approval.edited_options:
+            data['options'] = approval.edited_options
+        if approval.edited_correct_index is not None:
+            data['correct_index'] = approval.edited_correct_index
+    return data
+
+
+# ════════════════════════════════════════════════════════════════
+#  PER-ATOM ITEM POOLS (cached)
+# ════════════════════════════════════════════════════════════════
+
+class AtomBank:
+    """An atom's servable questions: payloads plus max-information pools by difficulty."""
+
+    def __init__(self, questions: List[Question]):
+        self.payloads = {q.id: question_payload(q) for q in questions}
+        self.params = {qid: item_parameters(payload) for qid, payload in self.payloads.items()}
+        items = defaultdict(list)
+        for qid, payload in self.payloads.items():
+            a, b = self.params[qid]
+            items[payload['difficulty']].append((qid, a, b, payload['cognitive_operation']))
+        self.pools = {difficulty: ItemPool(group) for difficulty, group in items.items()}
+        self.pools['all'] = ItemPool(item for group in items.values() for item in group)
+        self.built_at = time.time()
+
+
+_banks: 'OrderedDict[int, AtomBank]' = OrderedDict()
+_banks_lock = threading.Lock()
+
+
+def atom_bank(atom_id: int) -> AtomBank:
+    """Cached AtomBank; rebuilt after BANK_TTL or when a question / approval of the atom changes."""
+    with _banks_lock:
+        bank = _banks.pop(atom_id, None)
+        if bank is None or time.time() - bank.built_at >= BANK_TTL:
+            questions = (Question.objects.filter(atom_id=atom_id, approval__status__in=SERVABLE_STATUSES)
+                         .select_related('approval'))
+            bank = AtomBank(list(questions))
+        _banks[atom_id] = bank
+        while len(_banks) > MAX_BANKS:
+            _banks.popitem(last=False)
+        return bank
+
+
+def on_question_changed(sender, instance, **kwargs):
+    """post_save / post_delete hook for Question and QuestionApproval."""
+    with _banks_lock:
+        if isinstance(instance, Question):
+            _banks.pop(instance.atom_id, None)
+        else:
+            # approvals don't carry the atom; reviews are rare enough to drop everything
+            _banks.clear()
+
+
+def answered_question_ids(user, atom) -> set:
+    return set(QuestionResponse.objects.filter(user=user, question__atom=atom).values_list('question_id', flat=True))
+
+
+def select_from_bank(user, atom, need: Dict[str, int], theta: Optional[float] = None,
+                     rng=random) -> Tuple[List[Dict], Dict[str, int]]:
+    """
+    Pick unseen approved questions for `need` ({'easy': 2, 'medium': 1, ...}).
+
+    Within each difficulty the questions are the most informative ones at the
+    student's theta (max Fisher information, exposure-controlled and balanced
+    across cognitive operations — see learning_engine/item_selection.py).
+
+    Returns (questions, deficit): the question dicts served from the bank and the
+    per-difficulty count still missing, which is what the LLM should generate.
+    """
+    wanted = {d: int(n or 0) for d, n in need.items() if int(n or 0) > 0}
+    if not wanted:
+        return [], {}
+
+    bank = atom_bank(atom.id)
+    answered = answered_question_ids(user, atom)
+    picked, deficit = [], {}
+    for difficulty, n in wanted.items():
+        pool = bank.pools.get(difficulty)
+        if pool is None:
+            chosen = []
+        else:
+            target = theta if theta is not None else ITEM_DIFFICULTY_PRIORS.get(difficulty, 0.0)
+            chosen = select_items(target, pool, n, exclude=answered, rng=rng)
+        picked.extend(dict(bank.payloads[qid]) for qid, _ in chosen)
+        if len(chosen) < n:
+            deficit[difficulty] = n - len(chosen)
+
+    return picked, deficit
@@ -0,0 +1,120 @@
+# backend/accounts/resource_cache.py
+# External teaching resources (videos, images) kept per (subject, concept, atom)
+# in ExternalResource rows, so a search runs once per atom per RESOURCE_TTL and
+# not on every teaching-content request.
+#   - keys are case- and whitespace-normalized
+#   - a lookup that found nothing real (no videos, only placeholder images, or
+#     every search missed the deadline) is kept for EMPTY_RESOURCE_TTL only, so
+#     it is retried soon
+#   - the search itself is ExternalResourceFetcher (parallel, deadline-bounded)
+# Teaching views never wait for a search: request() returns a handle (the row
+# id, its status and whatever resources the row already holds) and, when the
+# row is missing or expired, enqueues a 'resources.refresh' job (accounts/jobs.py).
+# Only the request that claims the row (one UPDATE on requested_at) enqueues
+# it, so concurrent students trigger one search. Clients poll
+# ResourceStatusView until status is 'ready'.
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
+
+from django.db.models import Q
+from django.utils import timezone
+
+from core.sqlite import write_transaction
+from learning_engine.external_resources import ExternalResourceFetcher
+
+from . import jobs
+from .models import ExternalResource
+
+RESOURCE_TTL = timedelta(days=7)
+EMPTY_RESOURCE_TTL = timedelta(minutes=10)
+CLAIM_TIMEOUT = timedelta(minutes=2)   # a claimed search not stored by then (job failed) is claimable again
+
+
+def resource_key(subject: str, concept: str, atom_name: Optional[str] = None) -> Tuple[str, str, str]:
+    return tuple(' '.join((part or '').lower().split()) for part in (subject, concept, atom_name))
+
+
+def _payload(row: ExternalResource) -> Dict:
+    return {'videos': row.videos, 'images': row.images}
+
+
+def handle(row: ExternalResource) -> Dict:
+    return {'id': row.id, 'status': row.status, **_payload(row)}
+
+
+def empty_handle() -> Dict:
+    """What teaching views serve when request() failed: nothing to show, nothing to poll."""
+    return {'id': None, 'status': 'ready', 'videos': [], 'images': []}
+
+
+def _found_anything(resources: Dict) -> bool:
+    return bool(resources.get('videos')) or any(
+        img.get('source') != 'placeholder' for img in resources.get('images') or ())
+
+
+def cached(subject: str, concept: str, atom_name: Optional[str] = None) -> Optional[Dict]:
+    """Stored resources if still fresh, else None."""
+    subject, concept, atom_name = resource_key(subject, concept, atom_name)
+    row = ExternalResource.objects.filter(subject=subject, concept=concept, atom_name=atom_name,
+                                          expires_at__gt=timezone.now()).first()
+    return _payload(row) if row else None
+
+
+def store(subject: str, concept: str, atom_name: Optional[str], resources: Dict) -> Dict:
+    subject, concept, atom_name = resource_key(subject, concept, atom_name)
+    ttl = RESOURCE_TTL if _found_anything(resources) else EMPTY_RESOURCE_TTL
+    now = timezone.now()
+    fields = {'videos': resources.get('videos') or [], 'images': resources.get('images') or [],
+              'status': 'ready', 'requested_at': None, 'fetched_at': now, 'expires_at': now + ttl}
+    # write first: a SELECT before the write would need a lock upgrade, which SQLite refuses under contention
+    with write_transaction():
+        if not ExternalResource.objects.filter(subject=subject, concept=concept, atom_name=atom_name).update(**fields):
+            ExternalResource.objects.create(subject=subject, concept=concept, atom_name=atom_name, **fields)
+    return resources
+
+
+def get_resources(subject: str, concept: str, atom_name: Optional[str] = None) -> Dict:
+    """{'videos', 'images'} for the atom: stored ones, or searched now and stored."""
+    resources = cached(subject, concept, atom_name)
+    if resources is None:
+        resources = ExternalResourceFetcher().get_resources_for_concept(subject, concept, atom_name)
+        store(subject, concept, atom_name, resources)
+    return resources
+
+
+# ════════════════════════════════════════════════════════════════
+#  DEFERRED LOADING
+# ════════════════════════════════════════════════════════════════
+
+def _claim(row_id: int, now) -> bool:
+    """Take the row's background search, unless it's fresh or another request already has it."""
+    stale_claim = Q(requested_at__isnull=True) | Q(requested_at__lt=now - CLAIM_TIMEOUT)
+    with write_transaction():
+        return bool(ExternalResource.objects.filter(stale_claim, id=row_id, expires_at__lte=now)
+                    .update(status='pending', requested_at=now))
+
+
+def request(subject: str, concept: str, atom_name: Optional[str] = None) -> Dict:
+    """Handle for the atom's resources, without waiting for a search (queued if missing or expired)."""
+    subject, concept, atom_name = resource_key(subject, concept, atom_name)
+    now = timezone.now()
+    row = ExternalResource.objects.filter(subject=subject, concept=concept, atom_name=atom_name).first()
+    if row is None:
+        # INSERT OR IGNORE: students opening a new atom together all get the same row
+        ExternalResource.objects.bulk_create([ExternalResource(
+            subject=subject, concept=concept, atom_name=atom_name, status='pending', expires_at=now,
+        )], ignore_conflicts=True)
+        row = ExternalResource.objects.get(subject=subject, concept=concept, atom_name=atom_name)
+    if row.expires_at <= now and _claim(row.id, now):
+        row.status = 'pending'
+        jobs.enqueue('resources.refresh', {'row_id': row.id}, key=f'resources.refresh:{row.id}')
+    return handle(row)
+
+
+@jobs.handler('resources.refresh')
+def refresh(row_id: int) -> Dict:
+    """Search the row's resources now and store them."""
+    row = ExternalResource.objects.get(id=row_id)
+    resources = ExternalResourceFetcher().get_resources_for_concept(row.subject, row.concept, row.atom_name or None)
+    store(row.subject, row.concept, row.atom_name, resources)
+    return {'videos': len(resources.get('videos') or ()), 'images': len(resources.get('images') or ())}
@@ -1,3 +1,1826 @@
-from django.test import TestCase
+import contextlib
+import gzip
+import io
+import json
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from datetime import date, timedelta, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import renderers
+from core.sqlite import sqlite_production_options, write_transaction
+
+from learning_engine.adaptive_flow import AdaptiveLearningEngine
+from learning_engine.external_resources import PRIORITY_SITES, ExternalResourceFetcher
+from learning_engine.fake_llm import FakeLLMConfig, start_in_thread
+from learning_engine.item_selection import ItemPool, fisher_information, select_items
+from learning_engine.knowledge_tracing import item_parameters
+from learning_engine.llm_clients import make_genai_client, make_groq_client
+from learning_engine import timeseries
+from learning_engine.models import TeachingAtomState
+from learning_engine.timeseries import VelocitySeries
+
+from . import (
+    autocomplete, goals, item_params, jobs, mastery_cache, near_duplicates, planner_topics, question_bank,
+    resource_cache,
+)
+from . import urls as accounts_urls, views
+from .item_params import with_item_parameters
+from .planner_engine import SubjectDemand, TimetableSolver, schedule_days
+from .views import _persist_generated_questions, _serve_generated
+from .models import (
+    Concept, TeachingAtom, Question, StudentProgress, LearningSession,
+    LearningProfile, UserXP, QuestionApproval, QuestionResponse, TeacherGoal, TeacherOverride, TeacherProfile,
+    ParentProfile, ParentChild, PlannerSubject, StudyPlanItem, StudyPlanner, ExternalResource, Job,
+)
+from .question_bank import select_from_bank
+
+
+# ════════════════════════════════════════════════════════════════
+#  FIXTURES
+# ════════════════════════════════════════════════════════════════
+
+PHASES = ['not_started', 'teaching', 'practice', 'complete', 'fragile']
+APPROVAL_STATUSES = ['pending', 'approved', 'rejected']
+
+
+def seed_dataset(students=20, concepts=3, atoms_per_concept=5, sessions_per_student=4, questions_per_atom=4):
+    """
+    Bulk-seed a class: students with progress on every atom, a mix of open and
+    closed sessions, questions with approvals, one teacher and one parent.
+    """
+    now = timezone.now()
+    teacher = User.objects.create(username='teacher')
+    TeacherProfile.objects.create(user=teacher, is_active=True)
+    parent = User.objects.create(username='parent')
+    ParentProfile.objects.create(user=parent)
+
+    users = User.objects.bulk_create([User(username=f'student_{i}') for i in range(students)])
+    LearningProfile.objects.bulk_create([LearningProfile(user=u) for u in users])
+    UserXP.objects.bulk_create([UserXP(user=u, total_xp=i * 10) for i, u in enumerate(users)])
+    ParentChild.objects.create(parent=parent, child=users[0], linked_at=now)
+
+    concept_objs = Concept.objects.bulk_create([
+        Concept(name=f'Concept {c}', subject='Testing', created_by=teacher, order=c) for c in range(concepts)
+    ])
+    atoms = TeachingAtom.objects.bulk_create([
+        TeachingAtom(concept=c, name=f'{c.name} atom {a}', order=a)
+        for c in concept_objs for a in range(atoms_per_concept)
+    ])
+    questions = Question.objects.bulk_create([
+        Question(atom=a, difficulty='medium', cognitive_operation='recall',
+                 question_text=f'{a.name} question {q}', options=['a', 'b', 'c', 'd'], correct_index=0)
+        for a in atoms for q in range(questions_per_atom)
+    ])
+    QuestionApproval.objects.bulk_create([
+        QuestionApproval(question=q, status=APPROVAL_STATUSES[i % len(APPROVAL_STATUSES)])
+        for i, q in enumerate(questions)
+    ])
+    StudentProgress.objects.bulk_create([
+        StudentProgress(
+            user=u, atom=a,
+            mastery_score=((i * 7 + j * 13) % 100) / 100.0,
+            phase=PHASES[(i + j) % len(PHASES)],
+            next_review_at=now + timedelta(days=(i + j) % 10) if (i + j) % 3 == 0 else None,
+        )
+        for i, u in enumerate(users) for j, a in enumerate(atoms)
+    ])
+    sessions = LearningSession.objects.bulk_create([
+        LearningSession(
+            user=u, concept=concept_objs[s % concepts],
+            end_time=None if s == 0 else now - timedelta(days=s),
+            questions_answered=10, correct_answers=7,
+            # the open session has just finished its concept final challenge
+            session_data={'concept_final_answers': [{'correct': True}, {'correct': False}]} if s == 0 else {},
+        )
+        for u in users for s in range(sessions_per_student)
+    ])
+    # start_time is auto_now_add; spread it out so date-range filters have work to do
+    for i, session in enumerate(sessions):
+        session.start_time = now - timedelta(days=i % 30, hours=1)
+    LearningSession.objects.bulk_update(sessions, ['start_time'])
+
+    return {
+        'teacher': teacher,
+        'parent': parent,
+        'students': users,
+        'concepts': concept_objs,
+        'atoms': atoms,
+        'student': users[0],
+        'concept': concept_objs[0],
+        'session': next(s for s in sessions if s.user_id == users[0].id and s.end_time is None),
+    }
+
+
+def endpoint_calls(data):
+    """(name, user, method, path, payload) for the main student/teacher/parent views."""
+    student, teacher, parent = data['student'], data['teacher'], data['parent']
+    session, concept = data['session'], data['concept']
+    return [
+        ('progress', student, 'get', '/auth/api/progress/', None),
+        ('concepts', student, 'get', '/auth/api/concepts/', None),
+        ('dashboard', student, 'get', '/auth/api/dashboard/', None),
+        ('my-xp', student, 'get', '/auth/api/my-xp/', None),
+        ('velocity-graph', student, 'get', '/auth/api/velocity-graph/', {'session_id': session.id}),
+        ('all-atoms-mastery', student, 'post', '/auth/api/all-atoms-mastery/',
+         {'session_id': session.id, 'concept_id': concept.id}),
+        ('start-teaching-session', student, 'post', '/auth/api/start-teaching-session/',
+         {'concept_id': concept.id, 'knowledge_level': 'intermediate'}),
+        ('teacher/dashboard', teacher, 'get', '/auth/api/teacher/dashboard/', None),
+        ('teacher/students', teacher, 'get', '/auth/api/teacher/students/', None),
+        ('teacher/student-detail', teacher, 'get', '/auth/api/teacher/student-detail/', {'student_id': student.id}),
+        ('teacher/questions', teacher, 'get', '/auth/api/teacher/questions/', {'status': 'pending'}),
+        ('parent/children', parent, 'get', '/auth/api/parent/children/', None),
+        ('parent/child/<id>/insights', parent, 'get', f'/auth/api/parent/child/{student.id}/insights/', None),
+        ('leaderboard', student, 'get', '/auth/api/leaderboard/', None),
+        ('learning-calendar', student, 'get', '/auth/api/learning-calendar/', None),
+        ('fatigue-status', student, 'get', '/auth/api/fatigue-status/', {'session_id': session.id}),
+        ('teacher/class-analytics', teacher, 'get', '/auth/api/teacher/class-analytics/', None),
+        ('teacher/concepts', teacher, 'get', '/auth/api/teacher/concepts/', None),
+        ('teacher/goals', teacher, 'get', '/auth/api/teacher/goals/', None),
+        ('teacher/overrides', teacher, 'get', '/auth/api/teacher/overrides/', None),
+        ('teacher/content', teacher, 'get', '/auth/api/teacher/content/', None),
+        ('teacher/check', teacher, 'get', '/auth/api/teacher/check/', None),
+        ('parent/check', parent, 'get', '/auth/api/parent/check/', None),
+        ('parent/invite-code', parent, 'get', '/auth/api/parent/invite-code/', None),
+        # last: ends the open session
+        ('complete-concept-final-challenge', student, 'post', '/auth/api/complete-concept-final-challenge/',
+         {'session_id': session.id, 'concept_id': concept.id}),
+    ]
+
+
+def call_endpoint(client, user, method, path, payload):
+    client.force_authenticate(user=user)
+    if method == 'get':
+        return client.get(path, payload or {})
+    return client.post(path, payload or {}, format='json')
+
+
+# ════════════════════════════════════════════════════════════════
+#  FAKE LLM PROVIDER
+# ════════════════════════════════════════════════════════════════
+
+QUESTIONS_PROMPT = 'Generate 2 questions. Return JSON: {"questions": [...]}'
+
+
+class FakeLLMProviderTests(TestCase):
+    def setUp(self):
+        server, url = start_in_thread(FakeLLMConfig(latency='constant:0', token_delay_ms=0))
+        self.addCleanup(server.shutdown)
+        settings_override = override_settings(FAKE_LLM_URL=url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def assertQuestionsJSON(self, text):
+        questions = json.loads(text)['questions']
+        self.assertTrue(questions)
+        for q in questions:
+            self.assertTrue(0 <= q['correct_index'] < len(q['options']))
+
+    def test_groq_chat_completions_plain_and_streamed(self):
+        client = make_groq_client(None)
+        messages = [{'role': 'user', 'content': QUESTIONS_PROMPT}]
+        response = client.chat.completions.create(model='llama-3.3-70b-versatile', messages=messages)
+        self.assertQuestionsJSON(response.choices[0].message.content)
+
+        stream = client.chat.completions.create(model='llama-3.3-70b-versatile', messages=messages, stream=True)
+        self.assertQuestionsJSON(''.join(chunk.choices[0].delta.content or '' for chunk in stream))
+
+    def test_gemini_generate_content_plain_and_streamed(self):
+        client = make_genai_client(None)
+        response = client.models.generate_content(model='gemini-2.0-flash', contents=QUESTIONS_PROMPT)
+        self.assertQuestionsJSON(response.text)
+
+        stream = client.models.generate_content_stream(model='gemini-2.0-flash', contents=QUESTIONS_PROMPT)
+        self.assertQuestionsJSON(''.join(chunk.text or '' for chunk in stream))
+
+
+# ════════════════════════════════════════════════════════════════
+#  LOAD TEST
+# ════════════════════════════════════════════════════════════════
+
+class LoadTestCommandTests(TransactionTestCase):
+    """The in-process server answers on its own threads, so the data has to be committed."""
+
+    def setUp(self):
+        # process-wide caches may still hold ids rolled back by earlier tests
+        cache.clear()
+        mastery_cache.reset()
+        question_bank._banks.clear()
+        near_duplicates._indexes.clear()
+
+    # load_test points settings.FAKE_LLM_URL at its fake provider: the override restores it
+    @override_settings(FAKE_LLM_URL='', JOB_RUNNER='none')
+    def test_one_student_runs_the_learning_loop_against_the_fake_provider(self):
+        with tempfile.NamedTemporaryFile(suffix='.json') as output:
+            call_command('load_test', '--students', '1', '--teachers', '0', '--parents', '0',
+                         '--fake-llm', '--fake-llm-latency', 'constant:0', '--output', output.name,
+                         stdout=io.StringIO())
+            results = json.load(output)
+
+        self.assertEqual(results['meta']['llm'], 'fake')
+        self.assertEqual(results['summary']['errors'], 0, results['endpoints'])
+        self.assertEqual(results['db']['lock_errors'], 0)
+        for endpoint in ('start-teaching-session', 'initial-quiz', 'complete-initial-quiz', 'teaching-content',
+                         'generate-questions-from-teaching', 'submit-atom-answer', 'complete-atom', 'progress'):
+            self.assertIn(endpoint, results['endpoints'])
+        self.assertTrue(QuestionResponse.objects.filter(user__username='loadtest_student_0').exists())
+
+
+# ════════════════════════════════════════════════════════════════
+#  SQLITE WRITES
+# ════════════════════════════════════════════════════════════════
+
+class SqliteProductionProfileTests(TestCase):
+
+    def test_options_apply_the_pragmas_on_every_new_connection(self):
+        from django.db.backends.sqlite3.base import DatabaseWrapper
+
+        options = sqlite_production_options(busy_timeout_ms=1500, mmap_size=8 * 1024 * 1024, cache_size_kib=2048)
+        self.assertEqual(options['transaction_mode'], 'IMMEDIATE')
+        with tempfile.TemporaryDirectory() as tmp:
+            db = DatabaseWrapper({**connection.settings_dict, 'NAME': f'{tmp}/prod.sqlite3', 'OPTIONS': options},
+                                 alias='sqlite_production')
+            try:
+                with db.cursor() as cursor:
+                    pragmas = {}
+                    for name in ('journal_mode', 'synchronous', 'busy_timeout', 'mmap_size', 'cache_size',
+                                 'temp_store'):
+                        cursor.execute(f'PRAGMA {name}')
+                        pragmas[name] = cursor.fetchone()[0]
+                self.assertEqual(db.transaction_mode, 'IMMEDIATE')
+            finally:
+                db.close()
+        self.assertEqual(pragmas, {'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 1500,
+                                   'mmap_size': 8 * 1024 * 1024, 'cache_size': -2048, 'temp_store': 2})
+
+    def start_second_writer(self, order):
+        def write():
+            try:
+                with write_transaction():
+                    order.append('second')
+            finally:
+                connection.close()
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        return writer
+
+    @override_settings(SQLITE_SINGLE_WRITER=True)
+    def test_single_writer_nests_and_serializes_threads(self):
+        order = []
+        with write_transaction():
+            with write_transaction():   # re-entered by the thread holding it
+                self.assertTrue(connection.in_atomic_block)
+                writer = self.start_second_writer(order)
+                writer.join(0.2)
+                self.assertTrue(writer.is_alive())
+                order.append('first')
+        writer.join(5)
+        self.assertFalse(writer.is_alive())
+        self.assertEqual(order, ['first', 'second'])
+
+    @override_settings(SQLITE_SINGLE_WRITER=False)
+    def test_without_single_writer_threads_do_not_wait_in_python(self):
+        order = []
+        with write_transaction():
+            writer = self.start_second_writer(order)
+            writer.join(5)
+            self.assertFalse(writer.is_alive())
+            order.append('first')
+        self.assertEqual(order, ['second', 'first'])
+
+
+class AnswerWriteTransactionTests(TestCase):
+
+    def test_only_the_saves_run_in_the_write_transaction(self):
+        data = seed_dataset(students=1, concepts=1, atoms_per_concept=2)
+        student, atom, session = data['student'], data['atoms'][0], data['session']
+        StudentProgress.objects.filter(user=student, atom=atom).update(phase='complete', mastery_score=0.95)
+        session.session_data = {'questions': [{'question': 'q', 'options': ['a', 'b'], 'correct_index': 0,
+                                               'difficulty': 'medium', 'cognitive_operation': 'recall'}]}
+        session.save()
+
+        writing = []
+        real_write_transaction = views.write_transaction
+
+        @contextlib.contextmanager
+        def tracked_write_transaction(*args, **kwargs):
+            with real_write_transaction(*args, **kwargs):
+                writing.append(True)
+                try:
+                    yield
+                finally:
+                    writing.pop()
+
+        real_next_step = AdaptiveLearningEngine.get_next_learning_step
+        next_step_in_transaction = []
+
+        def next_step(engine, *args, **kwargs):
+            next_step_in_transaction.append(bool(writing))
+            return real_next_step(engine, *args, **kwargs)
+
+        client = APIClient()
+        client.force_authenticate(user=student)
+        with mock.patch.object(views, 'write_transaction', tracked_write_transaction), \
+                mock.patch.object(AdaptiveLearningEngine, 'get_next_learning_step', autospec=True,
+                                  side_effect=next_step):
+            response = client.post('/auth/api/submit-atom-answer/', {
+                'session_id': session.id, 'atom_id': atom.id, 'question_index': 0, 'selected': 0,
+            }, format='json')
+        self.assertEqual(response.status_code, 200, response.content[:300])
+        self.assertEqual(next_step_in_transaction, [False])
+        session.refresh_from_db()
+        self.assertEqual(session.questions_answered, 11)
+        self.assertEqual(len(session.session_data['answers']), 1)
+
+
+# ════════════════════════════════════════════════════════════════
+#  QUERY PLANS
+# ════════════════════════════════════════════════════════════════
+
+# Tables that grow with the number of students; a full scan of these is a regression
+LARGE_TABLES = {'accounts_studentprogress', 'accounts_learningsession', 'question_approval'}
+_ALIAS_RE = re.compile(r'"(\w+)" (?:AS )?"?([A-Z]\d+)"?')
+_SCAN_RE = re.compile(r'^SCAN (\w+)(?: USING (?:COVERING )?INDEX \w+)?')
+# Totals over every row of a table, by design (one aggregate whatever the size)
+INTENDED_SCANS = {'teacher/class-analytics': {'accounts_learningsession'}}
+
+
+def full_scans(sql):
+    """Large tables that SQLite's EXPLAIN QUERY PLAN says it will scan for `sql`."""
+    aliases = dict((alias, table) for table, alias in _ALIAS_RE.findall(sql))
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+        plan = [row[-1] for row in cursor.fetchall()]
+    scanned = []
+    for detail in plan:
+        match = _SCAN_RE.match(detail)
+        if match:
+            table = aliases.get(match.group(1), match.group(1))
+            if table in LARGE_TABLES:
+                scanned.append((table, detail))
+    return scanned
+
+
+class QueryPlanTests(TestCase):
+    """Every query the main views issue must use an index on the large tables."""
+
+    @classmethod
+    def setUpTestData(cls):
+        # No ANALYZE: the app never runs it, so plans must hold without sqlite_stat1
+        cls.data = seed_dataset(students=150, concepts=10, atoms_per_concept=4, sessions_per_student=6)
+
+    def test_no_full_table_scans(self):
+        client = APIClient()
+        for name, user, method, path, payload in endpoint_calls(self.data):
+            with self.subTest(endpoint=name):
+                with CaptureQueriesContext(connection) as ctx:
+                    response = call_endpoint(client, user, method, path, payload)
+                self.assertLess(response.status_code, 400, response.content[:300])
+                for query in ctx.captured_queries:
+                    sql = query['sql']
+                    if not sql.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+                        continue
+                    scans = [scan for scan in full_scans(sql) if scan[0] not in INTENDED_SCANS.get(name, ())]
+                    self.assertEqual(scans, [], f'{name}: {sql}')
+
+    def test_hot_patterns_use_new_indexes(self):
+        student, concept = self.data['student'], self.data['concept']
+        now = timezone.now()
+        cases = [
+            (LearningSession.objects.filter(user=student, concept=concept, end_time__isnull=True),
+             'session_user_open_idx'),
+            (LearningSession.objects.filter(user=student, start_time__gte=now - timedelta(days=7)),
+             'session_user_start_idx'),
+            (StudentProgress.objects.filter(user=student, mastery_score__lt=0.4).order_by('mastery_score'),
+             'progress_user_mastery_idx'),
+            (StudentProgress.objects.filter(user=student, phase='complete'), 'progress_user_phase_idx'),
+            (StudentProgress.objects.filter(user=student, next_review_at__isnull=False, next_review_at__lte=now),
+             'progress_user_review_idx'),
+            (QuestionApproval.objects.filter(status='pending'), 'qapproval_status_idx'),
+        ]
+        for queryset, index in cases:
+            with self.subTest(index=index):
+                sql, params = queryset.query.sql_with_params()
+                with connection.cursor() as cursor:
+                    cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+                    plan = ' | '.join(row[-1] for row in cursor.fetchall())
+                self.assertIn(index, plan)
+
+
+# ════════════════════════════════════════════════════════════════
+#  QUERY COUNTS
+# ════════════════════════════════════════════════════════════════
+
+# Data sizes every endpoint is exercised at; the second grows every dimension
+QUERY_COUNT_SIZES = [
+    dict(students=3, concepts=2, atoms_per_concept=2, sessions_per_student=2, questions_per_atom=2),
+    dict(students=12, concepts=5, atoms_per_concept=6, sessions_per_student=5, questions_per_atom=5),
+]
+
+# Queries per call, identical at every size in QUERY_COUNT_SIZES
+EXPECTED_QUERIES = {
+    'progress': 7,
+    'concepts': 1,
+    'dashboard': 1,
+    'my-xp': 4,
+    'velocity-graph': 4,
+    'all-atoms-mastery': 6,
+    'start-teaching-session': 6,        # includes the phase write for the pinned fragile atom
+    'teacher/dashboard': 11,
+    'teacher/students': 4,
+    'teacher/student-detail': 7,
+    'teacher/questions': 2,
+    'parent/children': 8,
+    'parent/child/<id>/insights': 12,
+    'leaderboard': 3,
+    'learning-calendar': 8,
+    'fatigue-status': 1,
+    'teacher/class-analytics': 5,
+    'teacher/concepts': 4,
+    'teacher/goals': 2,
+    'teacher/overrides': 2,
+    'teacher/content': 2,
+    'teacher/check': 1,
+    'parent/check': 1,
+    'parent/invite-code': 2,
+    'complete-concept-final-challenge': 5,  # mastery snapshot warm from all-atoms-mastery
+}
+
+# Routes in accounts/urls.py that are not measured, and why
+NOT_MEASURED = {
+    **dict.fromkeys(['register', 'login', 'teacher/register', 'teacher/login', 'parent/register', 'parent/login'],
+                    'authentication'),
+    **dict.fromkeys(['generate-concept', 'initial-quiz', 'teaching-content', 'generate-questions-from-teaching',
+                     'final-challenge', 'concept-overview', 'atom-summary', 'adaptive-reteach',
+                     'concept-final-challenge', 'ai-assistant', 'create-planner', 'planner-topics'],
+                    'calls the LLM'),
+    **dict.fromkeys(['concept-resources', 'resource-status/<id>', 'jobs/<id>'], 'external resources / jobs'),
+    **dict.fromkeys(['suggest-subjects', 'suggest-concepts'], 'served from the in-memory autocomplete index'),
+    **dict.fromkeys(['next-learning-step', 'next-adaptive-question', 'submit-initial-quiz-answer',
+                     'submit-initial-quiz', 'complete-initial-quiz', 'submit-atom-answer', 'complete-atom',
+                     'complete-final-challenge', 'record-break', 'retention-check', 'record-hint',
+                     'submit-concept-final-answer'],
+                    'one student\'s session step; count follows that session\'s state, not the data size'),
+    **dict.fromkeys(['my-planner', 'today-study', 'planner-week', 'planner-item-complete', 'planner-replan'],
+                    'needs a generated study plan'),
+    **dict.fromkeys(['teacher/content-detail', 'teacher/question-approve', 'teacher/question-add',
+                     'teacher/overrides/bulk', 'teacher/override-deactivate', 'teacher/goal-update',
+                     'teacher/atoms', 'parent/link-child', 'link-parent'],
+                    'single-object write'),
+}
+
+
+def route_names():
+    """EXPECTED_QUERIES / NOT_MEASURED names for every route in accounts/urls.py."""
+    return [re.sub(r'<\w+:\w+>', '<id>', str(pattern.pattern)).removeprefix('api/').rstrip('/')
+            for pattern in accounts_urls.urlpatterns]
+
+
+class QueryCountTests(TestCase):
+    """Query count per endpoint must not depend on how much data there is."""
+
+    def measure(self, size):
+        counts = {}
+        cache.clear()  # measure the uncached path; seeding doesn't bump DataVersion
+        mastery_cache.reset()
+        with transaction.atomic():
+            data = seed_dataset(**size)
+            # the same next step at every size: start-teaching-session picks this
+            # fragile atom first and moves it back to practice (a phase write)
+            StudentProgress.objects.filter(user=data['student'], atom=data['atoms'][0]).update(
+                phase='fragile', mastery_score=0.45)
+            client = APIClient()
+            for name, user, method, path, payload in endpoint_calls(data):
+                user = User.objects.get(pk=user.pk)  # no relations cached from seeding
+                with CaptureQueriesContext(connection) as ctx:
+                    response = call_endpoint(client, user, method, path, payload)
+                self.assertLess(response.status_code, 400, f'{name}: {response.content[:300]}')
+                counts[name] = len(ctx)
+            transaction.set_rollback(True)
+        return counts
+
+    def test_every_endpoint_has_an_expectation(self):
+        routes = route_names()
+        self.assertEqual(sorted(set(EXPECTED_QUERIES) | set(NOT_MEASURED)), sorted(routes))
+        self.assertEqual(set(EXPECTED_QUERIES) & set(NOT_MEASURED), set())
+        names = [call[0] for call in endpoint_calls(seed_dataset(students=1, concepts=1, atoms_per_concept=1))]
+        self.assertEqual(sorted(names), sorted(EXPECTED_QUERIES))
+
+    def test_query_counts_are_constant(self):
+        measured = [self.measure(size) for size in QUERY_COUNT_SIZES]
+        for name, expected in EXPECTED_QUERIES.items():
+            with self.subTest(endpoint=name):
+                self.assertEqual([counts[name] for counts in measured], [expected] * len(measured))
+
+
+# ════════════════════════════════════════════════════════════════
+#  AUTOCOMPLETE
+# ════════════════════════════════════════════════════════════════
+
+class AutocompleteIndexTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username='typist')
+        Concept.objects.create(name='Heaps', subject='Zoology Basics', created_by=self.user)
+        self.index = autocomplete.build_index(
+            ['Computer Science', 'Data Structures', 'Algorithms', 'Data Science', 'Zoology'],
+            {'data structures': ['Arrays', 'Binary Search Trees', 'Heaps', 'Hash Tables']},
+        )
+
+    def test_prefix_word_prefix_and_fuzzy_matches(self):
+        self.assertEqual(self.index.suggest_subjects('data s')[:2], ['Data Science', 'Data Structures'])
+        self.assertEqual(self.index.suggest_subjects('science'), ['Computer Science', 'Data Science'])
+        self.assertEqual(self.index.suggest_subjects('algoritms'), ['Algorithms'])
+        self.assertEqual(self.index.suggest_concepts('Data Structures', 'search'), ['Binary Search Trees'])
+
+    def test_users_own_subjects_rank_first(self):
+        self.assertEqual(self.index.suggest_subjects('zoo', self.user.id), ['Zoology Basics', 'Zoology'])
+        self.assertEqual(self.index.suggest_subjects('', self.user.id)[0], 'Zoology Basics')
+        self.assertEqual(self.index.suggest_subjects('zoo'), ['Zoology', 'Zoology Basics'])
+
+    def test_new_concepts_are_indexed_on_commit(self):
+        with mock.patch.object(autocomplete, '_index', self.index):
+            with self.captureOnCommitCallbacks(execute=True):
+                Concept.objects.create(name='Tries', subject='Data Structures', created_by=self.user)
+                self.assertEqual(self.index.suggest_concepts('data structures', 'tri', self.user.id), [])
+            # a concept whose transaction rolls back is never suggested
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                with transaction.atomic():
+                    Concept.objects.create(name='Treaps', subject='Data Structures', created_by=self.user)
+                    transaction.set_rollback(True)
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.index.suggest_concepts('data structures', 'tri', self.user.id), ['Tries'])
+        self.assertNotIn('Treaps', self.index.suggest_concepts('data structures', 'treap', self.user.id))
+
+
+# ════════════════════════════════════════════════════════════════
+#  GENERATED QUESTION PERSISTENCE
+# ════════════════════════════════════════════════════════════════
+
+class PersistGeneratedQuestionsTests(TestCase):
+
+    def setUp(self):
+        # per-atom near-duplicate indexes are process-wide; don't let rolled-back rows linger
+        near_duplicates._indexes.clear()
+        concept = Concept.objects.create(name='Stacks', subject='Data Structures')
+        self.atom = TeachingAtom.objects.create(concept=concept, name='Push and pop')
+
+    def generated(self, *texts):
+        return [{'difficulty': 'easy', 'cognitive_operation': 'recall', 'estimated_time': 30,
+                 'question': text, 'options': ['a', 'b', 'c', 'd'], 'correct_index': 1} for text in texts]
+
+    def test_bulk_insert_with_pending_approvals(self):
+        # hash lookup, near-duplicate index catch-up, savepoint, 2 inserts, release
+        with self.assertNumQueries(6):
+            ids = _persist_generated_questions(self.atom, self.generated('What does push do?', 'What does pop do?'))
+        self.assertEqual(len(set(ids)), 2)
+        self.assertEqual(
+            list(QuestionApproval.objects.filter(question_id__in=ids).values_list('status', flat=True)),
+            ['pending', 'pending'],
+        )
+
+    def test_near_duplicates_are_not_stored_again(self):
+        first = _persist_generated_questions(self.atom, self.generated('What does push do?'))
+        again = _persist_generated_questions(
+            self.atom, self.generated('what does PUSH do', 'What  does push do?!', 'What is the top?'),
+        )
+        self.assertEqual(again[:2], first * 2)
+        self.assertEqual(Question.objects.filter(atom=self.atom).count(), 2)
+
+
+    def test_failed_inserts_are_logged(self):
+        with mock.patch.object(Question.objects, 'bulk_create', side_effect=RuntimeError('disk full')), \
+                self.assertLogs('accounts.views', 'ERROR') as logs:
+            ids = _persist_generated_questions(self.atom, self.generated('What does push do?'))
+        self.assertEqual(ids, [None])
+        self.assertIn('disk full', logs.output[0])
+
+    def test_duplicates_are_served_as_the_stored_question(self):
+        stored, = _persist_generated_questions(self.atom, self.generated('What does push do?'))
+        QuestionApproval.objects.filter(question_id=stored).update(status='approved')
+        regenerated = dict(self.generated('what does PUSH do')[0], options=['w', 'x', 'y', 'z'], correct_index=3)
+        served = _serve_generated(self.atom, [regenerated] + self.generated('What is the top?'))
+        self.assertEqual(served[0]['id'], stored)
+        self.assertEqual((served[0]['question'], served[0]['options'], served[0]['correct_index']),
+                         ('What does push do?', ['a', 'b', 'c', 'd'], 1))
+        self.assertNotIn(served[1]['id'], (None, stored))
+
+        # already in the session (served from the bank): dropped, not repeated
+        again = _serve_generated(self.atom, [regenerated, regenerated], served_ids={stored})
+        self.assertEqual(again, [])
+
+    def test_duplicates_of_rejected_questions_get_no_id(self):
+        stored, = _persist_generated_questions(self.atom, self.generated('What does push do?'))
+        QuestionApproval.objects.filter(question_id=stored).update(status='rejected')
+        regenerated = dict(self.generated('What does push do')[0], correct_index=2)
+        served, = _serve_generated(self.atom, [regenerated])
+        self.assertEqual((served['id'], served['correct_index']), (None, 2))
+
+
+# ════════════════════════════════════════════════════════════════
+#  QUESTION BANK
+# ════════════════════════════════════════════════════════════════
+
+class QuestionBankTests(TestCase):
+
+    def setUp(self):
+        self.student = User.objects.create(username='learner')
+        LearningProfile.objects.create(user=self.student)
+        concept = Concept.objects.create(name='Queues', subject='Data Structures')
+        self.atom = TeachingAtom.objects.create(concept=concept, name='FIFO', explanation='First in, first out.')
+        self.session = LearningSession.objects.create(user=self.student, concept=concept, knowledge_level='intermediate')
+        self.bank = {}
+        for difficulty in ('easy', 'medium'):
+            for i, status in enumerate(['approved', 'approved', 'edited', 'pending', 'rejected']):
+                q = Question.objects.create(
+                    atom=self.atom, difficulty=difficulty, cognitive_operation=['recall', 'apply'][i % 2],
+                    question_text=f'{difficulty} {i}', options=['a', 'b', 'c', 'd'], correct_index=0,
+                )
+                QuestionApproval.objects.create(question=q, status=status, edited_question_text=f'{difficulty} {i} (edited)'
+                                                if status == 'edited' else '')
+                self.bank.setdefault(difficulty, []).append(q)
+
+    def test_serves_only_unseen_approved_questions(self):
+        answered = self.bank['easy'][0]
+        QuestionResponse.objects.create(user=self.student, question=answered, correct=True)
+        questions, deficit = select_from_bank(self.student, self.atom, {'easy': 3, 'medium': 2, 'hard': 1})
+        served = {q['id'] for q in questions}
+        self.assertEqual(deficit, {'easy': 1, 'hard': 1})
+        servable = {q.id for d in ('easy', 'medium') for q in self.bank[d][:3]} - {answered.id}
+        self.assertEqual(len(served), 4)
+        self.assertTrue(served <= servable)
+        self.assertTrue({self.bank['easy'][1].id, self.bank['easy'][2].id} <= served)
+        self.assertIn('easy 2 (edited)', [q['question'] for q in questions])
+        self.assertNotIn(answered.id, served)
+
+    def test_full_bank_skips_the_llm(self):
+        client = APIClient()
+        client.force_authenticate(user=self.student)
+        with mock.patch('accounts.views.QuestionGenerator') as generator:
+            response = client.post('/auth/api/generate-questions-from-teaching/',
+                                   {'session_id': self.session.id, 'atom_id': self.atom.id}, format='json')
+        self.assertEqual(response.status_code, 200)
+        generator.assert_not_called()
+        self.assertEqual(response.data['from_bank'], 4)
+        self.assertEqual([q['difficulty'] for q in response.data['questions']], ['easy', 'easy', 'medium', 'medium'])
+        self.session.refresh_from_db()
+        self.assertTrue(all(q['id'] for q in self.session.session_data['questions']))
+
+
+# ════════════════════════════════════════════════════════════════
+#  NEAR-DUPLICATE DETECTION
+# ════════════════════════════════════════════════════════════════
+
+FIFO_QUESTION = {
+    'difficulty': 'easy', 'cognitive_operation': 'recall', 'correct_index': 1,
+    'question': 'Which data structure processes elements in first-in, first-out order?',
+    'options': ['Stack', 'Queue', 'Heap', 'Tree'],
+}
+FIFO_PARAPHRASE = dict(FIFO_QUESTION, correct_index=0, options=['Queue', 'Tree', 'Stack', 'Heap'],
+                       question='Which data structure processes its elements in first in first out order?')
+SEARCH_QUESTION = {
+    'difficulty': 'medium', 'cognitive_operation': 'apply', 'correct_index': 1,
+    'question': 'What is the time complexity of binary search on a sorted array?',
+    'options': ['O(n)', 'O(log n)', 'O(1)', 'O(n log n)'],
+}
+
+
+class NearDuplicateTests(TestCase):
+
+    def setUp(self):
+        near_duplicates._indexes.clear()
+        concept = Concept.objects.create(name='Queues', subject='Data Structures')
+        self.atom = TeachingAtom.objects.create(concept=concept, name='FIFO')
+
+    def test_paraphrases_are_reused_not_stored(self):
+        first, = _persist_generated_questions(self.atom, [dict(FIFO_QUESTION)])
+        ids = _persist_generated_questions(self.atom, [dict(FIFO_PARAPHRASE), dict(SEARCH_QUESTION)])
+        self.assertEqual(ids[0], first)
+        self.assertNotIn(ids[1], (None, first))
+        self.assertEqual(Question.objects.filter(atom=self.atom).count(), 2)
+
+    def test_paraphrases_within_one_batch(self):
+        ids = _persist_generated_questions(self.atom, [dict(FIFO_QUESTION), dict(FIFO_PARAPHRASE)])
+        self.assertEqual(ids[0], ids[1])
+        self.assertEqual(Question.objects.filter(atom=self.atom).count(), 1)
+
+    def test_paraphrases_are_served_as_the_stored_question(self):
+        first, = _persist_generated_questions(self.atom, [dict(FIFO_QUESTION)])
+        QuestionApproval.objects.filter(question_id=first).update(status='approved')
+        paraphrase, search = _serve_generated(self.atom, [dict(FIFO_PARAPHRASE), dict(SEARCH_QUESTION)])
+        # graded on the stored wording, options and answer its responses are recorded against
+        self.assertEqual(paraphrase['id'], first)
+        self.assertEqual((paraphrase['question'], paraphrase['options'], paraphrase['correct_index']),
+                         (FIFO_QUESTION['question'], FIFO_QUESTION['options'], FIFO_QUESTION['correct_index']))
+        self.assertEqual(search['question'], SEARCH_QUESTION['question'])
+
+    def test_paraphrase_twins_in_one_batch_are_served_once(self):
+        served = _serve_generated(self.atom, [dict(FIFO_QUESTION), dict(FIFO_PARAPHRASE), dict(SEARCH_QUESTION)])
+        self.assertEqual([q['question'] for q in served], [FIFO_QUESTION['question'], SEARCH_QUESTION['question']])
+        self.assertEqual(len({q['id'] for q in served}), 2)
+
+    def _store(self, q, status='pending'):
+        question = Question.objects.create(atom=self.atom, difficulty=q['difficulty'], question_text=q['question'],
+                                           cognitive_operation=q['cognitive_operation'], options=q['options'],
+                                           correct_index=q['correct_index'])
+        QuestionApproval.objects.create(question=question, status=status)
+        return question
+
+    def test_index_follows_edits_and_catches_up_in_one_query(self):
+        question = self._store(FIFO_QUESTION)
+        index = near_duplicates.index_for_atom(self.atom.id)
+        fifo = near_duplicates.signature(FIFO_PARAPHRASE['question'], FIFO_PARAPHRASE['options'])
+        self.assertEqual(index.find(fifo), question.id)
+
+        question.question_text, question.options = SEARCH_QUESTION['question'], SEARCH_QUESTION['options']
+        question.save()
+        self.assertIsNone(index.find(fifo))
+        with self.assertNumQueries(1):
+            near_duplicates.index_for_atom(self.atom.id)
+
+    def test_matches_deleted_by_another_process_get_no_id(self):
+        first, = _persist_generated_questions(self.atom, [dict(FIFO_QUESTION)])
+        Question.objects.filter(id=first).delete()
+        # as if another process deleted it: this process's index still has it
+        near_duplicates.index_for_atom(self.atom.id).add(
+            first, near_duplicates.signature(FIFO_QUESTION['question'], FIFO_QUESTION['options']))
+        served, = _serve_generated(self.atom, [dict(FIFO_PARAPHRASE)])
+        self.assertIsNone(served['id'])
+        self.assertEqual(served['question'], FIFO_PARAPHRASE['question'])
+
+    def test_teacher_list_clusters_and_dedupe_command(self):
+        original = self._store(FIFO_QUESTION)
+        paraphrase = self._store(FIFO_PARAPHRASE, status='approved')
+        other = self._store(SEARCH_QUESTION)
+        student = User.objects.create(username='learner')
+        QuestionResponse.objects.create(user=student, question=original, correct=True)
+
+        teacher = User.objects.create(username='teacher')
+        TeacherProfile.objects.create(user=teacher, is_active=True)
+        client = APIClient()
+        client.force_authenticate(user=teacher)
+        listed = {q['id']: q['duplicate_cluster'] for q in client.get('/auth/api/teacher/questions/').data}
+        self.assertEqual(listed, {original.id: original.id, paraphrase.id: original.id, other.id: None})
+
+        call_command('dedupe_questions', '--apply', stdout=io.StringIO())
+        # the approved paraphrase is kept and inherits the answer history
+        self.assertEqual(set(Question.objects.values_list('id', flat=True)), {paraphrase.id, other.id})
+        self.assertEqual(QuestionResponse.objects.get().question_id, paraphrase.id)
+
+
+# ════════════════════════════════════════════════════════════════
+#  ITEM CALIBRATION
+# ════════════════════════════════════════════════════════════════
+
+class ItemCalibrationTests(TestCase):
+
+    def test_fitted_parameters_are_stored_and_used(self):
+        rng = np.random.default_rng(7)
+        concept = Concept.objects.create(name='Queues', subject='Data Structures')
+        atom = TeachingAtom.objects.create(concept=concept, name='FIFO')
+        # All labelled 'medium', but the true difficulties differ
+        true_b = [-1.5, 0.0, 1.5]
+        questions = [Question.objects.create(atom=atom, difficulty='medium', cognitive_operation='apply',
+                                             question_text=f'q{i}', options=['a', 'b'], correct_index=0)
+                     for i in range(len(true_b))]
+        students = User.objects.bulk_create([User(username=f's{i}') for i in range(150)])
+        thetas = rng.normal(0, 1, len(students))
+        QuestionResponse.objects.bulk_create([
+            QuestionResponse(user=student, question=q, theta=theta,
+                             correct=bool(rng.random() < 1 / (1 + np.exp(-1.2 * (theta - b)))))
+            for student, theta in zip(students, thetas) for q, b in zip(questions, true_b)
+        ])
+
+        item_params._table = None
+        self.addCleanup(setattr, item_params, '_table', None)
+        totals = item_params.calibrate()
+        self.assertEqual((totals['items'], totals['calibrated']), (3, 3))
+        fitted = [Question.objects.get(id=q.id).irt_b for q in questions]
+        self.assertEqual(fitted, sorted(fitted))
+        self.assertLess(fitted[0], -0.5)
+        self.assertGreater(fitted[2], 0.5)
+
+        hard = with_item_parameters({'id': questions[2].id, 'difficulty': 'medium'})
+        self.assertEqual(item_parameters(hard)[1], fitted[2])
+        # Uncalibrated questions keep their label priors
+        self.assertEqual(item_parameters({'difficulty': 'hard', 'cognitive_operation': 'recall'}), (0.8, 1.0))
+
+
+# ════════════════════════════════════════════════════════════════
+#  ADAPTIVE SELECTION
+# ════════════════════════════════════════════════════════════════
+
+class AdaptiveSelectionTests(TestCase):
+
+    def test_pool_prefers_informative_balanced_items(self):
+        rng = random.Random(3)
+        items = [(i, 1.0, -3 + i * 0.1, ['recall', 'apply'][i % 2]) for i in range(61)]
+        pool = ItemPool(items)
+        key, info = pool.select(1.0, rng=rng)
+        self.assertLessEqual(abs(items[key][2] - 1.0), 0.15)
+        self.assertAlmostEqual(info, fisher_information(1.0, 1.0, items[key][2]))
+        # a sitting alternates cognitive operations and never repeats an item
+        chosen = select_items(1.0, pool, 4, rng=rng)
+        self.assertEqual(len({k for k, _ in chosen}), 4)
+        self.assertEqual(sorted(items[k][3] for k, _ in chosen), ['apply', 'apply', 'recall', 'recall'])
+
+    def test_shared_pool_counts_every_exposure_across_threads(self):
+        pool = ItemPool([(i, 1.0, -3 + i * 0.1, 'apply') for i in range(61)])
+        per_thread, threads = 500, 8
+
+        def serve():
+            rng = random.Random()
+            for _ in range(per_thread):
+                pool.select(0.0, rng=rng)
+
+        workers = [threading.Thread(target=serve) for _ in range(threads)]
+        previous = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)   # switch threads as often as possible
+        try:
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        finally:
+            sys.setswitchinterval(previous)
+        self.assertEqual(pool.selections, per_thread * threads)
+        self.assertEqual(sum(pool.exposures.values()), per_thread * threads)
+
+    def test_next_adaptive_question_endpoint(self):
+        question_bank._banks.clear()
+        student = User.objects.create(username='learner')
+        LearningProfile.objects.create(user=student, overall_theta=1.2)
+        concept = Concept.objects.create(name='Queues', subject='Data Structures')
+        atom = TeachingAtom.objects.create(concept=concept, name='FIFO')
+        session = LearningSession.objects.create(user=student, concept=concept, knowledge_level='intermediate',
+                                                 session_data={'questions': []})
+        for b in (-1.0, 0.0, 1.0, 2.5):
+            q = Question.objects.create(atom=atom, difficulty='medium', cognitive_operation='apply',
+                                        question_text=f'b={b}', options=['a', 'b'], correct_index=0,
+                                        irt_a=2.0, irt_b=b)
+            QuestionApproval.objects.create(question=q, status='approved')
+
+        client = APIClient()
+        client.force_authenticate(user=student)
+        payload = {'session_id': session.id, 'atom_id': atom.id}
+        served = []
+        for _ in range(4):
+            with mock.patch('learning_engine.item_selection.RANDOMESQUE', 1):
+                data = client.post('/auth/api/next-adaptive-question/', payload, format='json').data
+            self.assertEqual(data['question_index'], len(served))
+            served.append(data['question']['question'])
+        # most informative first: b closest to theta
+        self.assertEqual(served[:3], ['b=1.0', 'b=0.0', 'b=2.5'])
+        self.assertEqual(len(set(served)), 4)
+        self.assertTrue(client.post('/auth/api/next-adaptive-question/', payload, format='json').data['exhausted'])
+        session.refresh_from_db()
+        self.assertEqual(len(session.session_data['questions']), 4)
+
+
+# ════════════════════════════════════════════════════════════════
+#  PACING STATE OBJECTS
+# ════════════════════════════════════════════════════════════════
+
+class LeanPacingTests(TestCase):
+
+    def test_lean_mode_keeps_the_decision(self):
+        engine = AdaptiveLearningEngine()
+        history = [{'correct': i % 3 != 0, 'time_taken': 20 + i} for i in range(8)]
+
+        def answer(explain):
+            state = TeachingAtomState(id=1, name='FIFO', mastery_score=0.5, phase='practice',
+                                      error_history=['factual'])
+            return engine.process_answer(atom_state=state, theta=0.2, question={'difficulty': 'medium',
+                                         'estimated_time': 45, 'correct_index': 1, 'options': ['a', 'b']},
+                                         selected_answer=0, time_taken=70.0, knowledge_level='beginner',
+                                         questions_history=history, explain=explain)
+
+        full, lean = answer(True), answer(False)
+        self.assertIn('learning_speed', full['reasoning'])
+        self.assertEqual(set(lean['reasoning']), {'primary_factors', 'severity'})
+        for key in ('pacing_decision', 'next_action', 'next_difficulty', 'updated_mastery', 'velocity_snapshot'):
+            self.assertEqual(full[key], lean[key])
+        self.assertFalse(hasattr(TeachingAtomState(id=1, name='x'), '__dict__'))
+
+
+# ════════════════════════════════════════════════════════════════
+#  RESPONSE RENDERING / COMPRESSION
+# ════════════════════════════════════════════════════════════════
+
+class ResponseRenderingTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_backends_render_identically(self):
+        now = timezone.now()
+        payload = {'at': now, 'day': now.date(), 'none': None, 7: np.float64(0.25), 'ids': np.arange(3),
+                   'nested': [{'at': now.replace(microsecond=0), 'tags': {'x'}}]}
+        self.assertEqual(renderers.stdlib_dumps(payload), renderers.dumps(payload))
+
+    def test_datetimes_render_as_rest_framework_renders_them(self):
+        from rest_framework.renderers import JSONRenderer
+
+        now = timezone.now()
+        payload = {'utc': now, 'whole_second': now.replace(microsecond=0), 'day': now.date(),
+                   'offset': now.astimezone(timezone.get_fixed_timezone(330)),
+                   'naive': timezone.make_naive(now, dt_timezone.utc), 'nested': [{'at': now}]}
+        expected = JSONRenderer().render(payload)
+        self.assertIn(b'Z"', expected)
+        self.assertEqual(renderers.dumps(payload), expected)
+        self.assertEqual(renderers.stdlib_dumps(payload), expected)
+
+    def test_views_return_isoformat_timestamps_compressed(self):
+        data = seed_dataset(students=2, concepts=3, atoms_per_concept=5)
+        student = data['students'][0]
+        client = APIClient()
+        client.force_authenticate(user=student)
+
+        response = client.get('/auth/api/progress/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        body = json.loads(gzip.decompress(response.content))
+        latest = LearningSession.objects.filter(user=student).order_by('-start_time').first()
+        self.assertEqual(body['recent_sessions'][0]['start_time'], latest.start_time.isoformat())
+
+        plain = client.get('/auth/api/progress/')
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertEqual(plain.json(), body)
+
+        small = client.get('/auth/api/my-xp/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertLess(len(small.content), settings.RESPONSE_COMPRESSION_MIN_BYTES)
+        self.assertFalse(small.has_header('Content-Encoding'))
+
+
+# ════════════════════════════════════════════════════════════════
+#  CONDITIONAL GET
+# ════════════════════════════════════════════════════════════════
+
+class ConditionalGetTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.data = seed_dataset(students=3, concepts=2, atoms_per_concept=2)
+        self.student, self.other = self.data['students'][:2]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.student)
+
+    def test_unchanged_dashboard_is_a_304_until_the_user_writes(self):
+        first = self.client.get('/auth/api/progress/')
+        etag = first['ETag']
+        self.assertEqual(first['Cache-Control'], 'private, no-cache')
+
+        with self.assertNumQueries(1):
+            revalidated = self.client.get('/auth/api/progress/', HTTP_IF_NONE_MATCH=f'W/{etag}')
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.content, b'')
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/auth/api/progress/').json(), first.json())
+
+        # Another student's progress doesn't touch this dashboard
+        StudentProgress.objects.filter(user=self.other).first().save()
+        self.assertEqual(self.client.get('/auth/api/progress/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        progress = StudentProgress.objects.filter(user=self.student).first()
+        progress.mastery_score = 0.99
+        progress.save()
+        changed = self.client.get('/auth/api/progress/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+
+    def test_ranks_follow_any_users_xp(self):
+        etag = self.client.get('/auth/api/my-xp/')['ETag']
+        self.assertEqual(self.client.get('/auth/api/my-xp/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        UserXP.objects.get(user=self.other).award_xp(500)
+        changed = self.client.get('/auth/api/my-xp/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+
+    def test_ranks_ignore_saves_that_change_nothing_shown(self):
+        etag = self.client.get('/auth/api/my-xp/')['ETag']
+        other = User.objects.get(pk=self.other.pk)
+        other.last_login = timezone.now()
+        other.save(update_fields=['last_login'])
+        other.set_password('new secret')
+        other.save()
+        xp = UserXP.objects.get(user=self.other)
+        xp.save()                                   # same total
+        xp.award_xp(0)
+        self.assertEqual(self.client.get('/auth/api/my-xp/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        other.first_name = 'Renamed'
+        other.save()
+        self.assertEqual(self.client.get('/auth/api/my-xp/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_access_is_checked_before_the_cache(self):
+        parent = self.data['parent']
+        self.client.force_authenticate(user=parent)
+        path = f'/auth/api/parent/child/{self.student.id}/insights/'
+        self.assertEqual(self.client.get(path).status_code, 200)
+        ParentChild.objects.filter(parent=parent).delete()
+        self.assertEqual(self.client.get(path).status_code, 404)
+
+
+# ════════════════════════════════════════════════════════════════
+#  MASTERY SNAPSHOTS
+# ════════════════════════════════════════════════════════════════
+
+class MasterySnapshotTests(TestCase):
+
+    def setUp(self):
+        mastery_cache.reset()
+        self.data = seed_dataset(students=2, concepts=1, atoms_per_concept=3)
+        self.student, self.concept = self.data['student'], self.data['concept']
+
+    def test_warm_reads_skip_the_database_and_see_writes(self):
+        cold = mastery_cache.snapshot(self.student.id, self.concept.id)
+        self.assertEqual([a.id for a in cold.atoms], [a.id for a in self.data['atoms'][:3]])
+        with self.assertNumQueries(0):
+            mastery_cache.snapshot(self.student.id, self.concept.id)
+
+        progress = StudentProgress.objects.get(user=self.student, atom=cold.atoms[0])
+        progress.mastery_score = 0.91
+        with self.captureOnCommitCallbacks(execute=True):
+            progress.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(mastery_cache.snapshot(self.student.id, self.concept.id).mastery(progress.atom_id), 0.91)
+
+    def test_uncommitted_writes_are_private_to_the_transaction(self):
+        atom = mastery_cache.snapshot(self.student.id, self.concept.id).atoms[1]
+        progress = StudentProgress.objects.get(user=self.student, atom=atom)
+        before = progress.phase
+        with transaction.atomic():
+            progress.phase = 'fragile'
+            progress.save()
+            # the writer sees its own write ...
+            self.assertEqual(mastery_cache.snapshot(self.student.id, self.concept.id).get(atom.id).phase, 'fragile')
+            transaction.set_rollback(True)
+        # ... and nothing of it survives the rollback
+        self.assertEqual(mastery_cache.snapshot(self.student.id, self.concept.id).get(atom.id).phase, before)
+
+    def test_next_step_reads_the_snapshot(self):
+        engine = AdaptiveLearningEngine()
+        engine.get_next_learning_step(self.student, self.concept)
+        with self.assertNumQueries(0):
+            mastery_cache.snapshot(self.student.id, self.concept.id)
+        step = engine.get_next_learning_step(self.student, self.concept)
+        stored = StudentProgress.objects.get(user=self.student, atom=step['atom'])
+        self.assertEqual(step['phase'], stored.phase)
+
+    def use_shared_backend(self):
+        previous = mastery_cache._backend
+        mastery_cache._backend = mastery_cache.SharedBackend('default')
+        self.addCleanup(setattr, mastery_cache, '_backend', previous)
+        cache.clear()
+
+    def test_shared_writes_reach_snapshots_other_workers_built(self):
+        self.use_shared_backend()
+        first, second = mastery_cache.snapshot(self.student.id, self.concept.id).atoms[:2]
+        mastery_cache._atom_concepts.clear()   # as in a worker that never built the snapshot
+
+        progress = StudentProgress.objects.get(user=self.student, atom=first)
+        progress.mastery_score = 0.77
+        with self.captureOnCommitCallbacks(execute=True):
+            progress.save()
+        self.assertEqual(mastery_cache.snapshot(self.student.id, self.concept.id).mastery(first.id), 0.77)
+
+        mastery_cache._atom_concepts.clear()
+        StudentProgress.objects.filter(user=self.student, atom=second).update(mastery_score=0.55)
+        with self.captureOnCommitCallbacks(execute=True):
+            mastery_cache.forget([(self.student.id, second.id)])
+        self.assertEqual(mastery_cache.snapshot(self.student.id, self.concept.id).mastery(second.id), 0.55)
+
+    def test_shared_builds_are_fenced_by_writes_in_other_workers(self):
+        self.use_shared_backend()
+        other_worker = mastery_cache.SharedBackend('default')
+        build = mastery_cache._build
+
+        def build_racing_a_write(user_id, concept_id):
+            built = build(user_id, concept_id)
+            other_worker.bump(user_id)   # a write lands in another worker meanwhile
+            return built
+
+        key = (self.student.id, self.concept.id)
+        with mock.patch.object(mastery_cache, '_build', side_effect=build_racing_a_write):
+            mastery_cache.snapshot(*key)
+        self.assertIsNone(mastery_cache.get_backend().get(key))
+        mastery_cache.snapshot(*key)
+        self.assertIsNotNone(mastery_cache.get_backend().get(key))
+
+
+# ════════════════════════════════════════════════════════════════
+#  VELOCITY TIME SERIES
+# ════════════════════════════════════════════════════════════════
+
+class VelocitySeriesTests(TestCase):
+
+    def test_series_stays_bounded_and_downsamples(self):
+        series = VelocitySeries()
+        start = 1_700_000_040.0   # on a minute boundary
+        for i in range(5000):   # 10 answers a minute, 50 per session
+            series.append(start + i * 6, {'mastery': i / 5000, 'time_taken': 6}, session_id=i // 50)
+        blob = series.encode()
+        series.append(start + 30000, {'mastery': 1.0}, session_id=999)
+        self.assertEqual(len(series.encode()), len(blob))   # every tier full: size no longer grows
+
+        self.assertEqual(len(series.points('raw')), timeseries.RAW_POINTS)
+        self.assertEqual(len(series.points('minute')), timeseries.MINUTE_POINTS + 1)   # + open minute
+        sessions = series.points('session', ['mastery'])
+        self.assertEqual(len(sessions), timeseries.SESSION_POINTS + 1)
+        self.assertAlmostEqual(sessions[0]['mastery'], np.mean(np.arange(2500, 2550)) / 5000, places=3)
+        self.assertEqual(sessions[-1], {'mastery': 1.0, 'timestamp': start + 30000})
+
+        restored = VelocitySeries.decode(series.encode())
+        for tier in timeseries.TIERS:
+            self.assertEqual(restored.points(tier), series.points(tier))
+        self.assertEqual(VelocitySeries.decode(None).points(), [])
+
+    def test_velocity_graph_reads_the_requested_zoom(self):
+        data = seed_dataset(students=1, concepts=1, atoms_per_concept=2)
+        session, atom = data['session'], data['atoms'][0]
+        blob = None
+        for i in range(90):
+            blob = timeseries.append_point(blob, 1_700_000_040.0 + i * 20, {'mastery': 0.01 * i, 'accuracy': 0.5})
+        session.velocity_series = blob
+        session.save()
+        StudentProgress.objects.filter(user=data['student'], atom=atom).update(velocity_series=blob)
+
+        client = APIClient()
+        client.force_authenticate(user=data['student'])
+        raw = client.get('/auth/api/velocity-graph/', {'session_id': session.id}).json()
+        self.assertEqual(len(raw['session_velocity']), timeseries.RAW_POINTS)
+        self.assertEqual(raw['graph']['trend'], 'steady')
+        self.assertEqual(list(raw['atom_velocities']), [atom.name])
+
+        minute = client.get('/auth/api/velocity-graph/', {'session_id': session.id, 'zoom': 'minute'}).json()
+        self.assertEqual(len(minute['session_velocity']), 30)
+        self.assertEqual(minute['session_velocity'][0]['accuracy'], 0.5)
+        bad = client.get('/auth/api/velocity-graph/', {'session_id': session.id, 'zoom': 'hour'})
+        self.assertEqual(bad.status_code, 400)
+
+
+# ════════════════════════════════════════════════════════════════
+#  BULK TEACHER OVERRIDES
+# ════════════════════════════════════════════════════════════════
+
+class BulkOverrideTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        mastery_cache.reset()
+        self.data = seed_dataset(students=12, concepts=2, atoms_per_concept=3)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.data['teacher'])
+
+    def test_force_review_below_threshold_in_constant_queries(self):
+        atom, student = self.data['atoms'][1], self.data['student']
+        weak = StudentProgress.objects.filter(atom=atom, mastery_score__lt=0.5)
+        expected = set(weak.values_list('user_id', flat=True))
+        self.assertTrue(1 < len(expected) < 12)
+        self.assertIn(student.id, expected)
+        mastery_cache.snapshot(student.id, atom.concept_id)
+
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/auth/api/teacher/overrides/bulk/', {
+                'action': 'force_review', 'reason': 'class remediation',
+                'selector': {'atoms': [atom.id], 'mastery_max': 0.5},
+            }, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json(), {'action': 'force_review', 'rows_updated': len(expected),
+                                           'students': len(expected), 'atoms': 1,
+                                           'overrides_created': len(expected)})
+        self.assertLessEqual(len(queries), 8)
+
+        self.assertEqual(set(StudentProgress.objects.filter(atom=atom, phase='reinforcement')
+                             .values_list('user_id', flat=True)), expected)
+        self.assertEqual(set(TeacherOverride.objects.filter(action='force_review', atom=atom)
+                             .values_list('student_id', flat=True)), expected)
+        self.assertEqual(mastery_cache.snapshot(student.id, atom.concept_id).get(atom.id).phase, 'reinforcement')
+
+    def test_set_mastery_for_chosen_students_busts_their_dashboards(self):
+        student = self.data['student']
+        client = APIClient()
+        client.force_authenticate(user=student)
+        etag = client.get('/auth/api/progress/')['ETag']
+
+        response = self.client.post('/auth/api/teacher/overrides/bulk/', {
+            'action': 'set_mastery', 'parameters': {'mastery': 0.9},
+            'selector': {'concept': self.data['concept'].id, 'students': [student.id]},
+        }, format='json')
+        self.assertEqual(response.json()['rows_updated'], 3)
+        self.assertEqual(set(StudentProgress.objects.filter(user=student, atom__concept=self.data['concept'])
+                             .values_list('mastery_score', flat=True)), {0.9})
+        self.assertEqual(client.get('/auth/api/progress/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_rejects_unbounded_or_invalid_requests(self):
+        url = '/auth/api/teacher/overrides/bulk/'
+        self.assertEqual(self.client.post(url, {'action': 'skip_atom', 'selector': {}}, format='json').status_code, 400)
+        self.assertEqual(self.client.post(url, {'action': 'assign_atom', 'selector': {'concept': 1}},
+                                          format='json').status_code, 400)
+        self.assertEqual(self.client.post(url, {'action': 'set_mastery', 'parameters': {'mastery': 3},
+                                                'selector': {'concept': 1}}, format='json').status_code, 400)
+        self.client.force_authenticate(user=self.data['student'])
+        self.assertEqual(self.client.post(url, {'action': 'skip_atom', 'selector': {'concept': 1}},
+                                          format='json').status_code, 403)
+
+
+# ════════════════════════════════════════════════════════════════
+#  TEACHER GOALS
+# ════════════════════════════════════════════════════════════════
+
+class GoalEvaluationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.data = seed_dataset(students=4, concepts=2, atoms_per_concept=2)
+        self.teacher, self.concept = self.data['teacher'], self.data['concept']
+        self.first, self.second = self.data['students'][:2]
+        StudentProgress.objects.filter(atom__concept=self.concept, user=self.first).update(mastery_score=0.9)
+        StudentProgress.objects.filter(atom__concept=self.concept, user=self.second).update(mastery_score=0.6)
+
+    def goal(self, **kwargs):
+        return TeacherGoal.objects.create(teacher=self.teacher, concept=self.concept, title='Goal',
+                                          target_mastery=0.8, **kwargs)
+
+    def test_attainment_uses_a_fixed_number_of_queries(self):
+        class_wide = self.goal(is_class_wide=True)
+        reached = self.goal(student=self.first)
+        with self.assertNumQueries(3):
+            results = goals.evaluate([class_wide, reached])
+        self.assertEqual(results[class_wide.id], {'targeted': 4, 'reached': 1, 'attainment': 0.25})
+        self.assertEqual(results[reached.id]['attainment'], 1.0)
+
+        many = [self.goal(student=s) for s in self.data['students']] + [self.goal(is_class_wide=True)]
+        with self.assertNumQueries(3):
+            goals.evaluate(many)
+
+    def test_batch_transitions_and_cached_summary(self):
+        reached = self.goal(student=self.first)
+        late = self.goal(student=self.second, deadline=timezone.now() - timedelta(days=1))
+        open_goal = self.goal(is_class_wide=True, deadline=timezone.now() + timedelta(days=7))
+
+        client = APIClient()
+        client.force_authenticate(user=self.teacher)
+        before = client.get('/auth/api/teacher/dashboard/').json()['goal_summary']
+        self.assertEqual(before['status_counts'], {'active': 3})
+
+        out = io.StringIO()
+        call_command('evaluate_goals', stdout=out)
+        self.assertIn('1 completed, 1 overdue', out.getvalue())
+        statuses = dict(TeacherGoal.objects.values_list('id', 'status'))
+        self.assertEqual(statuses, {reached.id: 'completed', late.id: 'overdue', open_goal.id: 'active'})
+
+        with self.assertNumQueries(0):
+            summary = goals.teacher_summary(self.teacher.id)
+        self.assertEqual(summary['status_counts'], {'completed': 1, 'overdue': 1, 'active': 1})
+        self.assertEqual([(g['id'], g['attainment']) for g in summary['goals']], [(open_goal.id, 0.25)])
+
+        # editing a goal drops the cached summary
+        open_goal.status = 'cancelled'
+        open_goal.save()
+        self.assertEqual(goals.teacher_summary(self.teacher.id)['goals'], [])
+
+    def test_class_goal_with_one_student_short_stays_active(self):
+        users = User.objects.bulk_create([User(username=f'roster-{i}') for i in range(1996)])
+        atoms = list(TeachingAtom.objects.filter(concept=self.concept))
+        StudentProgress.objects.bulk_create([
+            StudentProgress(user=user, atom=atom, mastery_score=0.9) for user in users for atom in atoms
+        ] + [StudentProgress(user=user, atom=atom, mastery_score=0.9)
+             for user in self.data['students'] for atom in atoms], ignore_conflicts=True)
+        StudentProgress.objects.filter(atom__concept=self.concept).update(mastery_score=0.9)
+        StudentProgress.objects.filter(atom__concept=self.concept, user=self.second).update(mastery_score=0.6)
+        class_wide = self.goal(is_class_wide=True)
+
+        result = goals.evaluate([class_wide])[class_wide.id]
+        self.assertEqual((result['targeted'], result['reached'], result['attainment']), (2000, 1999, 1.0))
+        self.assertEqual(goals.run_transitions()['completed'], 0)
+        class_wide.refresh_from_db()
+        self.assertEqual(class_wide.status, 'active')
+
+
+# ════════════════════════════════════════════════════════════════
+#  STUDY PLANNER
+# ════════════════════════════════════════════════════════════════
+
+class StudyPlannerTests(TestCase):
+    start = date(2026, 9, 7)   # a Monday
+
+    def setUp(self):
+        cache.clear()
+
+    def hours(self, solver, subject, days=None):
+        return sum(s['hours'] for i, day in enumerate(solver.sessions) if days is None or i in days
+                   for s in day if s['subject'] == subject)
+
+    def test_hours_follow_priority_mastery_and_exams(self):
+        days = schedule_days(self.start, 28, 'mon_sun')
+        solver = TimetableSolver([SubjectDemand('Maths', priority=1), SubjectDemand('Art', priority=3)], days, 4)
+        self.assertAlmostEqual(self.hours(solver, 'Maths') / self.hours(solver, 'Art'), 3.0, delta=0.2)
+
+        strong = TimetableSolver([SubjectDemand('Maths', mastery=0.9), SubjectDemand('Physics', mastery=0.2)],
+                                 days, 4)
+        self.assertGreater(self.hours(strong, 'Physics'), 3 * self.hours(strong, 'Maths'))
+
+        exam = self.start + timedelta(days=9)
+        solver = TimetableSolver([SubjectDemand('Maths'), SubjectDemand('History', exam_date=exam)], days, 4)
+        self.assertGreater(self.hours(solver, 'History', range(5, 10)), self.hours(solver, 'Maths', range(5, 10)))
+        self.assertEqual(self.hours(solver, 'History', range(10, 28)), 0)
+
+    def test_due_reviews_come_first_and_carry_over(self):
+        days = schedule_days(self.start, 7, 'mon_fri')
+        self.assertEqual(len(days), 5)
+        subject = SubjectDemand('Maths', topics=['Sets', 'Logic'], reviews={days[0]: 15})
+        solver = TimetableSolver([subject, SubjectDemand('Art')], days, 2)
+        first, second = solver.sessions[:2]
+        self.assertEqual(first[0], {'subject': 'Maths', 'topic': 'Review Maths (6 due)', 'hours': 1, 'kind': 'review'})
+        self.assertEqual(second[0]['topic'], 'Review Maths (6 due)')
+        self.assertEqual(solver.sessions[2][0]['topic'], 'Review Maths (3 due)')
+        self.assertEqual(sum(day['total_hours'] for day in solver.schedule()), 10)
+
+        # at most half of a day goes to reviews: none on a 1-hour day, they wait for the next
+        solver = TimetableSolver([subject], days, 2, day_hours={days[0]: 1})
+        self.assertEqual(solver.sessions[0], [{'subject': 'Maths', 'topic': 'Sets', 'hours': 1, 'kind': 'study'}])
+        self.assertEqual(solver.sessions[1][0]['topic'], 'Review Maths (6 due)')
+
+    def test_replan_only_touches_the_changed_day_onwards(self):
+        days = schedule_days(self.start, 120, 'mon_sun')
+        subjects = [SubjectDemand(f'S{i}', priority=1 + i % 3, mastery=i / 10, topics=[f't{j}' for j in range(5)])
+                    for i in range(6)]
+        solver = TimetableSolver(subjects, days, 5)
+        before = [list(day) for day in solver.sessions]
+        changed = solver.replan(days[30], 1)
+        self.assertEqual(changed, days[30:])
+        self.assertEqual(solver.sessions[:30], before[:30])
+        self.assertEqual(len(solver.sessions[30]), 1)
+        fresh = TimetableSolver(subjects, days, 5, day_hours={days[30]: 1})
+        self.assertEqual(solver.sessions, fresh.sessions)
+        with self.assertRaisesMessage(ValueError, 'is not a scheduled day of this plan'):
+            solver.replan(days[-1] + timedelta(days=1), 3)
+
+    def test_create_planner_uses_mastery_and_reviews(self):
+        data = seed_dataset(students=1, concepts=1, atoms_per_concept=4)
+        student = data['student']
+        StudentProgress.objects.filter(user=student).update(mastery_score=0.95, next_review_at=None)
+        StudentProgress.objects.filter(user=student, atom=data['atoms'][0]).update(next_review_at=timezone.now())
+        client = APIClient()
+        client.force_authenticate(user=student)
+        with mock.patch('accounts.planner_topics.generate_subtopics', return_value=['Intro', 'Basics']):
+            response = client.post('/auth/create-planner/', {
+                'day_option': 'mon_sun', 'free_hours_per_day': 4,
+                'subjects': [{'subject_name': 'testing', 'priority': 1},
+                             {'subject_name': 'Geography', 'priority': 1, 'exam_date': '2099-01-01'}],
+            }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        today = response.json()['timetable'][date.today().strftime('%A')]
+        self.assertEqual(today[0]['kind'], 'review')
+        week = [s for day in response.json()['timetable'].values() for s in day if s['kind'] == 'study']
+        self.assertGreater(sum(s['subject'] == 'Geography' for s in week), 3 * sum(s['subject'] == 'testing' for s in week))
+        self.assertEqual(str(PlannerSubject.objects.get(subject_name='Geography').exam_date), '2099-01-01')
+
+    def test_plan_rows_back_today_week_and_completion(self):
+        student = User.objects.create(username='planner_student')
+        client = APIClient()
+        client.force_authenticate(user=student)
+        with mock.patch('accounts.planner_topics.generate_subtopics', return_value=['Intro', 'Basics']):
+            created = client.post('/auth/create-planner/', {
+                'day_option': 'mon_sun', 'free_hours_per_day': 3, 'horizon_days': 70,
+                'subjects': [{'subject_name': 'Maths', 'priority': 1}, {'subject_name': 'Art', 'priority': 3}],
+            }, format='json').json()
+        planner = StudyPlanner.objects.get(id=created['id'])
+        self.assertEqual(created['items_created'], 70 * 3)
+        self.assertEqual(planner.items.count(), 210)
+        self.assertEqual(planner.timetable, {})
+        self.assertEqual(len(created['timetable']), 7)
+        self.assertEqual(client.get('/auth/my-planner/').json()['timetable'], created['timetable'])
+
+        with self.assertNumQueries(2):
+            today = client.get('/auth/today-study/', {'planner_id': planner.id}).json()
+        self.assertEqual((today['total_topics'], today['completed_topics']), (3, 0))
+        item_id = today['schedule'][0]['id']
+
+        with self.assertNumQueries(1):
+            done = client.post('/auth/planner-item-complete/', {'item_id': item_id}, format='json')
+        self.assertEqual(done.status_code, 200)
+        self.assertEqual(client.get('/auth/today-study/', {'planner_id': planner.id}).json()['completed_topics'], 1)
+
+        week = client.get('/auth/planner-week/', {'planner_id': planner.id,
+                                                  'start': str(date.today() + timedelta(days=14))}).json()
+        self.assertEqual([d['date'] for d in week['days']],
+                         [str(date.today() + timedelta(days=14 + i)) for i in range(7)])
+        self.assertEqual(week['total_items'], 21)
+
+        client.force_authenticate(user=User.objects.create(username='someone_else'))
+        other = client.post('/auth/planner-item-complete/', {'item_id': item_id}, format='json')
+        self.assertEqual(other.status_code, 404)
+        for bad in ({}, {'item_id': None}, {'item_id': 'abc'}):
+            with self.assertNumQueries(0):
+                response = client.post('/auth/planner-item-complete/', bad, format='json')
+            self.assertEqual(response.status_code, 400, bad)
+
+    def test_replan_endpoint_rewrites_the_day_and_the_days_after(self):
+        student = User.objects.create(username='planner_student')
+        client = APIClient()
+        client.force_authenticate(user=student)
+        with mock.patch('accounts.planner_topics.generate_subtopics', return_value=['Intro', 'Basics', 'Proofs']):
+            created = client.post('/auth/create-planner/', {
+                'day_option': 'mon_sun', 'free_hours_per_day': 3, 'horizon_days': 14,
+                'subjects': [{'subject_name': 'Maths', 'priority': 1}, {'subject_name': 'Art', 'priority': 3}],
+            }, format='json').json()
+        planner = StudyPlanner.objects.get(id=created['id'])
+        today, tomorrow = date.today(), date.today() + timedelta(days=1)
+        first = planner.items.filter(date=today).order_by('position').first()
+        client.post('/auth/planner-item-complete/', {'item_id': first.id}, format='json')
+        kept_today = list(planner.items.filter(date=today).values_list('subject', 'topic', 'completed'))
+
+        replanned = client.post('/auth/planner-replan/', {'planner_id': planner.id, 'date': str(tomorrow),
+                                                          'hours': 1}, format='json')
+        self.assertEqual(replanned.status_code, 200, replanned.content)
+        self.assertEqual(replanned.json()['days_replanned'], 13)
+        self.assertEqual(list(planner.items.filter(date=today).values_list('subject', 'topic', 'completed')),
+                         kept_today)
+        self.assertEqual(planner.items.filter(date=tomorrow).count(), 1)
+        self.assertEqual(planner.items.count(), 13 * 3 + 1)
+
+        # re-planning a day with the same hours keeps what was planned and completed
+        same = client.post('/auth/planner-replan/', {'planner_id': planner.id, 'date': str(today), 'hours': 3},
+                           format='json')
+        self.assertEqual(same.status_code, 200, same.content)
+        self.assertEqual(list(planner.items.filter(date=today).values_list('subject', 'topic', 'completed')),
+                         kept_today)
+
+        for bad in ({'date': str(today + timedelta(days=30)), 'hours': 2},
+                    {'date': str(today - timedelta(days=1)), 'hours': 2},
+                    {'date': str(tomorrow), 'hours': 'x'}, {'hours': 2}):
+            response = client.post('/auth/planner-replan/', {'planner_id': planner.id, **bad}, format='json')
+            self.assertEqual(response.status_code, 400, bad)
+
+    def test_subtopics_generate_concurrently_once_per_subject(self):
+        subjects = ['Maths', 'Physics', 'Chemistry']
+        barrier = threading.Barrier(len(subjects), timeout=5)   # only passes if all three calls overlap
+        calls = []
+
+        def generate(subject, goal, num_topics, timeout):
+            calls.append(subject)
+            barrier.wait()
+            return [f'{subject} {i}' for i in range(num_topics)]
+
+        with mock.patch('accounts.planner_topics.generate_subtopics', side_effect=generate):
+            ready, late = planner_topics.fan_out(subjects, 'exam')
+            self.assertEqual((sorted(ready), late), (sorted(subjects), {}))
+            again, _ = planner_topics.fan_out(['maths ', 'Physics'], 'exam')
+        self.assertEqual(sorted(calls), sorted(subjects))
+        self.assertEqual(again['maths '], ready['Maths'])
+
+    def test_late_subjects_are_filled_in_after_the_response(self):
+        student = User.objects.create(username='planner_student')
+        client = APIClient()
+        client.force_authenticate(user=student)
+        release = threading.Event()
+
+        def generate(subject, goal, num_topics, timeout):
+            if subject == 'History':
+                release.wait(5)
+            return [f'{subject} {i}' for i in range(num_topics)]
+
+        registered = []
+        with mock.patch('accounts.planner_topics.generate_subtopics', side_effect=generate), \
+                mock.patch('accounts.planner_topics.SUBTOPIC_DEADLINE', 0.2), \
+                mock.patch('accounts.views.fill_when_done', side_effect=lambda *args: registered.append(args)):
+            created = client.post('/auth/create-planner/', {
+                'day_option': 'mon_sun', 'free_hours_per_day': 2,
+                'subjects': [{'subject_name': 'Maths'}, {'subject_name': 'History'}],
+            }, format='json').json()
+        release.set()
+        self.assertEqual(created['pending_subjects'], ['History'])
+        polled = client.get('/auth/planner-topics/', {'planner_id': created['id']}).json()
+        self.assertEqual(polled['pending'], 1)
+        self.assertEqual(polled['subjects'][0]['topics'][0], 'Maths 0')
+
+        # the done callback, run here instead of on the pool thread
+        planner_subject_id, name, future = registered[0]
+        planner_topics.fill_subject(planner_subject_id, future.result(timeout=5))
+        polled = client.get('/auth/planner-topics/', {'planner_id': created['id']}).json()
+        self.assertEqual(polled['pending'], 0)
+        history = StudyPlanItem.objects.filter(planner_id=created['id'], subject='History').order_by('date', 'position')
+        self.assertEqual([item.topic for item in history[:2]], ['History 0', 'History 1'])
+
+    def test_late_subject_is_filled_by_its_job_when_the_callback_is_lost(self):
+        student = User.objects.create(username='planner_student')
+        planner = StudyPlanner.objects.create(user=student, goal_type='exam', day_option='mon_sun')
+        history = PlannerSubject.objects.create(planner=planner, subject_name='History',
+                                                topics=['Placeholder'], topics_pending=True)
+        StudyPlanItem.objects.create(planner=planner, subject='History', topic='Placeholder',
+                                     date=date.today(), position=0, kind='study')
+
+        # the process restarts before the call finishes: the callback never runs
+        planner_topics.fill_when_done(history.id, 'History', Future())
+        job = Job.objects.get(key=f'planner.subtopics:{history.id}')
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertEqual(jobs.drain(), 0)
+
+        Job.objects.update(run_at=timezone.now())
+        with mock.patch('accounts.planner_topics.generate_subtopics', return_value=['Empires', 'Revolutions']):
+            self.assertEqual(jobs.drain(), 1)
+        history.refresh_from_db()
+        self.assertEqual((history.topics, history.topics_pending), (['Empires', 'Revolutions'], False))
+        self.assertEqual(StudyPlanItem.objects.get(planner=planner).topic, 'Empires')
+
+        # a subject the callback already filled costs no LLM call
+        planner_topics.fill_when_done(history.id, 'History', Future())
+        Job.objects.update(run_at=timezone.now())
+        with mock.patch('accounts.planner_topics.generate_subtopics') as generate:
+            self.assertEqual(jobs.drain(), 1)
+        generate.assert_not_called()
+
+
+# ════════════════════════════════════════════════════════════════
+#  EXTERNAL RESOURCES
+# ════════════════════════════════════════════════════════════════
+
+class ExternalResourceTests(TestCase):
+    video = {'title': 'Loops explained', 'url': 'https://youtube.com/watch?v=1'}
+
+    def test_resources_are_searched_once_per_atom(self):
+        found = {'videos': [self.video], 'images': []}
+        with mock.patch.object(ExternalResourceFetcher, 'get_resources_for_concept', return_value=found) as search:
+            first = resource_cache.get_resources('Python', 'Loops', 'For loops')
+            again = resource_cache.get_resources(' python', 'loops ', 'For  Loops')
+        self.assertEqual(search.call_count, 1)
+        self.assertEqual(first, again)
+
+        ExternalResource.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        with mock.patch.object(ExternalResourceFetcher, 'get_resources_for_concept', return_value=found) as search:
+            resource_cache.get_resources('Python', 'Loops', 'For loops')
+        self.assertEqual(search.call_count, 1)
+        self.assertEqual(ExternalResource.objects.count(), 1)
+
+    def test_empty_lookups_expire_soon(self):
+        placeholders = ExternalResourceFetcher.__new__(ExternalResourceFetcher).get_fallback_images('Loops')
+        resource_cache.store('Python', 'Loops', None, {'videos': [], 'images': placeholders})
+        resource_cache.store('Python', 'Loops', 'While', {'videos': [self.video], 'images': []})
+        empty, found = ExternalResource.objects.order_by('atom_name')
+        self.assertLessEqual(empty.expires_at, timezone.now() + resource_cache.EMPTY_RESOURCE_TTL)
+        self.assertGreater(found.expires_at, timezone.now() + resource_cache.EMPTY_RESOURCE_TTL)
+
+    def test_image_searches_run_concurrently_within_the_deadline(self):
+        stuck = threading.Event()
+
+        def search(fetcher, params):
+            if 'site:medium.com' in params['q']:
+                stuck.wait(5)           # never answers in time
+            return [{'original': params['q'], 'title': 't', 'source': 'web'}]
+
+        fetcher = ExternalResourceFetcher()
+        fetcher.serpapi_key = 'test'
+        try:
+            with mock.patch.object(ExternalResourceFetcher, '_search_images', autospec=True, side_effect=search):
+                started = time.monotonic()
+                images = fetcher.get_images('loops', max_images=3, deadline=0.3)
+                elapsed = time.monotonic() - started
+        finally:
+            stuck.set()
+        self.assertLess(elapsed, 2)
+        self.assertEqual([img['source'] for img in images], ['geeksforgeeks.org', 'tutorialspoint.com', 'web'])
+
+    def test_general_image_search_runs_only_when_the_sites_fall_short(self):
+        queries = []
+
+        def search(fetcher, params):
+            queries.append(params['q'])
+            if 'site:medium.com' in params['q'] and empty_site:
+                return []
+            return [{'original': params['q'], 'title': 't', 'source': 'web'}]
+
+        fetcher = ExternalResourceFetcher()
+        fetcher.serpapi_key = 'test'
+        with mock.patch.object(ExternalResourceFetcher, '_search_images', autospec=True, side_effect=search):
+            empty_site = False
+            images = fetcher.get_images('loops', max_images=3, deadline=2)
+            self.assertEqual([img['source'] for img in images], PRIORITY_SITES[:3])
+            self.assertEqual(len(queries), 3)
+
+            queries.clear()
+            empty_site = True
+            images = fetcher.get_images('loops', max_images=3, deadline=2)
+        self.assertEqual([img['source'] for img in images], ['geeksforgeeks.org', 'tutorialspoint.com', 'web'])
+        self.assertIn('loops educational diagram', queries)
+
+    def test_teaching_content_hands_out_resources_without_searching(self):
+        data = seed_dataset()
+        atom = data['atoms'][0]
+        TeachingAtom.objects.filter(id=atom.id).update(explanation='Loops repeat things.', analogy='A wheel.')
+        client = APIClient()
+        client.force_authenticate(user=data['student'])
+        teach = lambda: client.post('/auth/api/teaching-content/', {
+            'session_id': data['session'].id, 'atom_id': atom.id}, format='json').json()
+
+        no_search = mock.patch.object(ExternalResourceFetcher, 'get_resources_for_concept',
+                                      side_effect=AssertionError('searched inside the request'))
+        with no_search:
+            first = teach()
+            second = teach()
+        self.assertEqual(first['resources']['status'], 'pending')
+        self.assertEqual(first['videos'], [])
+        self.assertEqual(second['resources'], first['resources'])
+        # one background search however many students ask
+        queued = Job.objects.get(name='resources.refresh')
+        self.assertEqual(queued.payload, {'row_id': first['resources']['id']})
+
+        handle = first['resources']['id']
+        with mock.patch.object(ExternalResourceFetcher, 'get_resources_for_concept',
+                               return_value={'videos': [self.video], 'images': []}):
+            resource_cache.refresh(handle)
+        polled = client.get(f'/auth/api/resource-status/{handle}/').json()
+        self.assertEqual((polled['status'], polled['videos']), ('ready', [self.video]))
+
+        with no_search:
+            third = teach()
+        self.assertEqual((third['resources']['status'], third['videos']), ('ready', [self.video]))
+        self.assertEqual(Job.objects.count(), 1)
+
+
+    def test_teaching_content_survives_a_failed_resource_lookup(self):
+        data = seed_dataset()
+        client = APIClient()
+        client.force_authenticate(user=data['student'])
+        with mock.patch.object(resource_cache, 'request', side_effect=DatabaseError('database is locked')):
+            response = client.post('/auth/api/teaching-content/', {
+                'session_id': data['session'].id, 'atom_id': data['atoms'][0].id}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['resources'], {'id': None, 'status': 'ready'})
+        self.assertEqual(response.json()['videos'], [])
+
+# ════════════════════════════════════════════════════════════════
+#  BACKGROUND JOBS
+# ════════════════════════════════════════════════════════════════
+
+job_calls = []
+
+
+@jobs.handler('tests.flaky')
+def flaky_job(fail_times=0, value=None):
+    job_calls.append(value)
+    if len(job_calls) <= fail_times:
+        raise RuntimeError(f'attempt {len(job_calls)} failed')
+    return {'value': value}
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        job_calls.clear()
+
+    def make_due(self):
+        Job.objects.update(run_at=timezone.now())
+
+    def test_idempotency_key_returns_the_active_job(self):
+        first = jobs.enqueue('tests.flaky', {'value': 1}, key='k')
+        again = jobs.enqueue('tests.flaky', {'value': 2}, key='k')
+        self.assertEqual(again.id, first.id)
+        self.assertEqual(jobs.drain(), 1)
+        self.assertEqual(job_calls, [1])
+        later = jobs.enqueue('tests.flaky', {'value': 3}, key='k')   # the first one is done
+        self.assertNotEqual(later.id, first.id)
+        with self.assertRaises(ValueError):
+            jobs.enqueue('tests.unknown')
+
+    def test_failures_retry_with_backoff_then_fail(self):
+        retried = jobs.enqueue('tests.flaky', {'fail_times': 1, 'value': 'x'})
+        self.assertEqual(jobs.drain(), 1)
+        retried.refresh_from_db()
+        self.assertEqual((retried.status, retried.attempts), ('queued', 1))
+        self.assertIn('attempt 1 failed', retried.last_error)
+        self.assertGreater(retried.run_at, timezone.now() + timedelta(seconds=jobs.JOB_BACKOFF_BASE - 1))
+        self.assertEqual(jobs.drain(), 0)   # not due yet
+        self.make_due()
+        jobs.drain()
+        retried.refresh_from_db()
+        self.assertEqual((retried.status, retried.attempts, retried.result), ('done', 2, {'value': 'x'}))
+
+        job_calls.clear()
+        doomed = jobs.enqueue('tests.flaky', {'fail_times': 5}, max_attempts=2)
+        jobs.drain()
+        self.make_due()
+        jobs.drain()
+        doomed.refresh_from_db()
+        self.assertEqual((doomed.status, doomed.attempts), ('failed', 2))
+        self.assertEqual(jobs.backoff(1), jobs.JOB_BACKOFF_BASE)
+        self.assertEqual(jobs.backoff(50), jobs.JOB_BACKOFF_MAX)
+
+    def test_a_job_is_claimed_once_until_its_lease_expires(self):
+        job = jobs.enqueue('tests.flaky', {'value': 1})
+        self.assertEqual(jobs.claim('w1').id, job.id)
+        self.assertIsNone(jobs.claim('w2'))
+
+        Job.objects.update(locked_at=timezone.now() - jobs.JOB_LEASE - timedelta(seconds=1))   # w1 died
+        stolen = jobs.claim('w2')
+        self.assertEqual((stolen.id, stolen.locked_by, stolen.attempts), (job.id, 'w2', 2))
+        jobs.run(Job.objects.get(id=job.id), 'w1')    # w1 wakes up: its result is dropped
+        self.assertEqual(Job.objects.get(id=job.id).status, 'running')
+        jobs.run(stolen, 'w2')
+        self.assertEqual(Job.objects.get(id=job.id).status, 'done')
+
+    def test_status_endpoint_shows_own_jobs_only(self):
+        owner, other = User.objects.create(username='owner'), User.objects.create(username='other')
+        job = jobs.enqueue('tests.flaky', {'value': 7}, user=owner)
+        jobs.drain()
+        client = APIClient()
+        client.force_authenticate(user=owner)
+        body = client.get(f'/auth/api/jobs/{job.id}/').json()
+        self.assertEqual((body['status'], body['result']), ('done', {'value': 7}))
+        client.force_authenticate(user=other)
+        self.assertEqual(client.get(f'/auth/api/jobs/{job.id}/').status_code, 404)
+
+    def test_run_workers_once_drains_the_queue(self):
+        jobs.enqueue('tests.flaky', {'value': 1})
+        jobs.enqueue('tests.flaky', {'value': 2})
+        out = io.StringIO()
+        call_command('run_workers', once=True, stdout=out)
+        self.assertIn('ran 2 job(s)', out.getvalue())
+        self.assertEqual(sorted(job_calls), [1, 2])
+
+
+# ════════════════════════════════════════════════════════════════
+#  DIAGNOSTIC QUIZ
+# ════════════════════════════════════════════════════════════════
+
+class DiagnosticBatchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        mastery_cache.reset()
+        self.data = seed_dataset(students=2, concepts=1)
+        self.session = self.data['session']
+        self.session.session_data = {'initial_quiz_questions': [
+            {'difficulty': 'medium', 'cognitive_operation': 'recall', 'estimated_time': 30,
+             'question': f'q{i}', 'options': ['a', 'b', 'c', 'd'], 'correct_index': i % 4}
+            for i in range(5)
+        ]}
+        self.session.save()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.data['student'])
+
+    def submit(self, answers):
+        return self.client.post('/auth/api/submit-initial-quiz/',
+                                {'session_id': self.session.id, 'answers': answers}, format='json')
+
+    def test_whole_quiz_is_graded_and_stored_in_one_request(self):
+        student, atoms = self.data['student'], self.data['atoms']
+        StudentProgress.objects.filter(user=student, atom=atoms[4]).delete()
+        answers = [{'question_index': i, 'selected': i % 4 if i < 3 else (i + 1) % 4, 'time_taken': 20}
+                   for i in range(5)]
+        with CaptureQueriesContext(connection) as queries:
+            body = self.submit(answers).json()
+        self.assertLess(len(queries), 25)   # no per-atom round trips
+
+        self.assertEqual([r['correct'] for r in body['results']], [True, True, True, False, False])
+        self.assertEqual(body['results'][3]['correct_index'], 3)
+        self.assertEqual(body['accuracy'], 0.6)
+
+        session = LearningSession.objects.get(id=self.session.id)
+        stored = session.session_data['initial_quiz_answers']
+        self.assertEqual([a['mastery_after'] for a in stored], [r['mastery_after'] for r in body['results']])
+        self.assertEqual(session.session_data['current_phase'], 'teaching')
+        self.assertEqual(LearningProfile.objects.get(user=student).overall_theta, body['theta'])
+
+        progress = {p.atom_id: p for p in StudentProgress.objects.filter(user=student, atom__in=atoms)}
+        self.assertEqual(len(progress), len(atoms))
+        self.assertEqual(progress[atoms[0].id].phase, 'teaching')
+        self.assertEqual(progress[atoms[0].id].mastery_score, min(body['mastery'], 0.3))
+        self.assertEqual((progress[atoms[1].id].phase, progress[atoms[1].id].mastery_score), ('teaching', 0.13))
+        self.assertEqual((progress[atoms[4].id].phase, progress[atoms[4].id].mastery_score), ('not_started', 0.0))
+        error_types = session.session_data['initial_quiz_evaluation']['error_types']
+        self.assertEqual({tuple(p.error_history) for p in progress.values()}, {tuple(error_types)})
+
+    def test_batch_matches_answer_by_answer_evaluation(self):
+        answers = [{'question_index': i, 'selected': (i * 3) % 4, 'time_taken': 25 + i} for i in range(5)]
+        batch = self.submit(answers).json()
+        engine = AdaptiveLearningEngine()
+        graded = [{**a, 'correct': a['selected'] == i % 4} for i, a in enumerate(answers)]
+        expected = engine.evaluate_initial_quiz(
+            self.session.session_data['initial_quiz_questions'], graded, self.session.knowledge_level, 0.0)
+        self.assertEqual((batch['mastery'], batch['theta'], batch['initial_pacing']),
+                         (expected['mastery'], expected['theta'], expected['pacing']))
+
+    def test_rejects_bad_answer_lists(self):
+        self.assertEqual(self.submit([]).status_code, 400)
+        self.assertEqual(self.submit([{'question_index': 0, 'selected': 0}] * 2).status_code, 400)
+        self.assertEqual(self.submit([{'question_index': 9, 'selected': 0}]).status_code, 400)
+        self.assertEqual(self.submit([{'question_index': 'x', 'selected': 0}]).status_code, 400)
+        self.assertNotIn('initial_quiz_answers', LearningSession.objects.get(id=self.session.id).session_data)
@@ -1,7 +1,7 @@
 from django.urls import path
 from .views import (
     # Auth views
-    AIDoubtAssistantView, GetConceptResourcesView, RegisterView, LoginView, DashboardView,
+    AIDoubtAssistantView, GetConceptResourcesView, ResourceStatusView, JobStatusView, RegisterView, LoginView, DashboardView,
     
     # Concept management
     ConceptListView, GenerateConceptView,
@@ -9,9 +9,9 @@ from .views import (
     
     # Teaching-first flow views
     StartTeachingSessionView, GetTeachingContentView,
-    GenerateQuestionsFromTeachingView, SubmitAtomAnswerView,
-    CompleteAtomView, GetLearningProgressView,
-    GenerateInitialQuizView, SubmitInitialQuizAnswerView, CompleteInitialQuizView,
+    GenerateQuestionsFromTeachingView, NextAdaptiveQuestionView, SubmitAtomAnswerView,
+    CompleteAtomView, GetLearningProgressView, LearningCalendarView,
+    GenerateInitialQuizView, SubmitInitialQuizAnswerView, SubmitInitialQuizBatchView, CompleteInitialQuizView,
     GenerateFinalChallengeView, CompleteFinalChallengeView,
 
     # Adaptive flow views
@@ -35,7 +35,7 @@ from .views import (
     TeacherStudentListView, TeacherStudentDetailView,
     TeacherContentListView, TeacherContentDetailView,
     TeacherQuestionListView, TeacherQuestionApproveView, TeacherAddQuestionView,
-    TeacherOverrideListView, TeacherOverrideDeactivateView,
+    TeacherOverrideListView, TeacherBulkOverrideView, TeacherOverrideDeactivateView,
     TeacherGoalListView, TeacherGoalUpdateView,
     TeacherClassAnalyticsView,
     TeacherConceptManageView, TeacherAtomManageView,
@@ -47,7 +47,8 @@ from .views import (
     LinkParentView,
 
     # AI planner views 
-    CreateStudyPlannerView , GetMyPlannerView, TodayStudyView
+    CreateStudyPlannerView , GetMyPlannerView, TodayStudyView, PlannerWeekView, PlannerTopicsView,
+    PlannerItemCompleteView, PlannerReplanView,
 )
 
 urlpatterns = [
@@ -66,9 +67,11 @@ urlpatterns = [
     path('api/start-teaching-session/', StartTeachingSessionView.as_view(), name='start_teaching_session'),
     path('api/initial-quiz/', GenerateInitialQuizView.as_view(), name='generate_initial_quiz'),
     path('api/submit-initial-quiz-answer/', SubmitInitialQuizAnswerView.as_view(), name='submit_initial_quiz_answer'),
+    path('api/submit-initial-quiz/', SubmitInitialQuizBatchView.as_view(), name='submit_initial_quiz'),
     path('api/complete-initial-quiz/', CompleteInitialQuizView.as_view(), name='complete_initial_quiz'),
     path('api/teaching-content/', GetTeachingContentView.as_view(), name='teaching_content'),
     path('api/generate-questions-from-teaching/', GenerateQuestionsFromTeachingView.as_view(), name='generate_questions_from_teaching'),
+    path('api/next-adaptive-question/', NextAdaptiveQuestionView.as_view(), name='next_adaptive_question'),
     path('api/submit-atom-answer/', SubmitAtomAnswerView.as_view(), name='submit_atom_answer'),
     path('api/complete-atom/', CompleteAtomView.as_view(), name='complete_atom'),
     path('api/final-challenge/', GenerateFinalChallengeView.as_view(), name='generate_final_challenge'),
@@ -83,8 +86,11 @@ urlpatterns = [
 
     # Progress
     path('api/progress/', GetLearningProgressView.as_view(), name='learning_progress'),
+    path('api/learning-calendar/', LearningCalendarView.as_view(), name='learning_calendar'),
     
     path('api/concept-resources/', GetConceptResourcesView.as_view(), name='concept_resources'),
+    path('api/resource-status/<int:resource_id>/', ResourceStatusView.as_view(), name='resource_status'),
+    path('api/jobs/<int:job_id>/', JobStatusView.as_view(), name='job_status'),
 
     # Enhanced pacing engine endpoints
     path('api/velocity-graph/', GetVelocityGraphView.as_view(), name='velocity_graph'),
@@ -124,6 +130,7 @@ urlpatterns = [
 
     # Student intervention
     path('api/teacher/overrides/', TeacherOverrideListView.as_view(), name='teacher_overrides'),
+    path('api/teacher/overrides/bulk/', TeacherBulkOverrideView.as_view(), name='teacher_bulk_override'),
     path('api/teacher/override-deactivate/', TeacherOverrideDeactivateView.as_view(), name='teacher_override_deactivate'),
 
     # Goals & deadlines
@@ -153,5 +160,9 @@ urlpatterns = [
     path('create-planner/', CreateStudyPlannerView.as_view(), name='create_planner'),
     path('my-planner/', GetMyPlannerView.as_view(), name='my_planner'),
     path("today-study/", TodayStudyView.as_view(), name="today_study"),
+    path("planner-week/", PlannerWeekView.as_view(), name="planner_week"),
+    path("planner-topics/", PlannerTopicsView.as_view(), name="planner_topics"),
+    path("planner-item-complete/", PlannerItemCompleteView.as_view(), name="planner_item_complete"),
+    path("planner-replan/", PlannerReplanView.as_view(), name="planner_replan"),
 
 ]
\ No newline at end of file
@@ -1,6 +1,7 @@
 import calendar as cal_module
 import json
 import secrets
+from collections import Counter, defaultdict
 from datetime import date, timedelta
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
@@ -8,7 +9,9 @@ from learning_engine.ai_assistant import generate_ai_response
 import logging
 from django.db import models
 from django.db.models import Max
+from django.db.models.functions import RowNumber
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
 from rest_framework import status
@@ -17,10 +20,13 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from .models import StudyPlanner, PlannerSubject
-from .planner_engine import generate_timetable
-from learning_engine.ai_study_planner import generate_subtopics, distribute_topics
+from .planner_engine import (
+    MAX_PLAN_DAYS, TimetableSolver, item_entry, materialize, rematerialize_from, schedule_days, stored_solver,
+    subject_demands, timetable_from_items, week_items,
+)
+from .planner_topics import fan_out, fill_when_done, placeholder_topics
 from .models import StudyPlanItem
-from datetime import datetime
+from datetime import datetime, timezone as dt_timezone
 
 
 
@@ -29,7 +35,7 @@ from .models import (
     LearningSession, LearningProfile, KnowledgeLevel, UserXP,
     TeacherProfile, TeacherContent, QuestionApproval,
     TeacherOverride, TeacherGoal,
-    ParentProfile, ParentChild,
+    ParentProfile, ParentChild, QuestionResponse, ExternalResource, Job,
 )
 from .serializers import (
     RegisterSerializer, UserSerializer, ConceptSerializer,
@@ -42,14 +48,26 @@ from .serializers import (
 )
 from learning_engine.question_generator import QuestionGenerator
 from learning_engine.adaptive_flow import AdaptiveLearningEngine, MASTERY_THRESHOLD
+from learning_engine.llm_clients import fake_llm_url, make_genai_client
+from core.sqlite import write_transaction
+from .autocomplete import get_index as get_autocomplete_index
+from .question_bank import DIFFICULTY_ORDER, atom_bank, question_payload, select_from_bank
+from .item_params import with_item_parameters
+from .http_cache import CLOCK_WINDOW, conditional_response, user_key
+from .mastery_cache import ensure_progress, snapshot as mastery_snapshot
+from .overrides import apply_bulk_override
+from .goals import teacher_summary as teacher_goal_summary
+from . import diagnostic, jobs, near_duplicates, resource_cache
 from django.conf import settings
+from learning_engine.item_selection import TARGET_SE, theta_standard_error
 from learning_engine.knowledge_tracing import (
     bkt_update, update_theta, classify_behavior, 
-    update_mastery_from_behavior, classify_error_type
+    update_mastery_from_behavior, classify_error_type, item_parameters
 )
 
 
 from learning_engine.pacing_engine import PacingEngine, PacingContext
+from learning_engine.timeseries import TIERS as VELOCITY_TIERS, VelocitySeries, append_point
 from learning_engine.models import TeachingAtomState
 
 logger = logging.getLogger(__name__)
@@ -100,6 +118,106 @@ def _friendly_wrong_explanation(question, teaching_content=None, error_type=None
         return f"Correct answer: {correct_option}. {base}"
     return base
 
+
+def _persist_generated_questions(atom, questions):
+    """
+    Save LLM-generated questions for teacher review: one bulk insert of Question rows
+    plus their pending QuestionApproval rows, in one transaction.
+
+    Questions whose normalized text already exists for the atom, that paraphrase an
+    existing question (MinHash/LSH near duplicate, see near_duplicates.py) or that
+    repeat within the batch are not stored again. Returns the Question id for each
+    input question, reusing the existing row's id for duplicates; serve them through
+    _serve_generated, which swaps such duplicates for the stored question.
+    """
+    hashes = [Question.hash_text(q['question']) for q in questions]
+    existing = dict(
+        Question.objects.filter(atom=atom, text_hash__in=set(hashes))
+        .order_by('id').values_list('text_hash', 'id')
+    )
+    index = near_duplicates.index_for_atom(atom.id)
+    batch = near_duplicates.NearDuplicateIndex()
+
+    new_rows, near = {}, {}
+    for q, text_hash in zip(questions, hashes):
+        if text_hash in existing or text_hash in new_rows or text_hash in near:
+            continue
+        sig = near_duplicates.signature(q['question'], q['options'])
+        match = index.find(sig)
+        if match is None:
+            # a paraphrase of a question earlier in this batch
+            match = batch.find(sig)
+        if match is not None:
+            near[text_hash] = match
+            continue
+        batch.add(text_hash, sig)
+        new_rows[text_hash] = Question(
+            atom=atom,
+            difficulty=q['difficulty'],
+            cognitive_operation=q.get('cognitive_operation', 'apply'),
+            estimated_time=q.get('estimated_time', 60),
+            question_text=q['question'],
+            options=q['options'],
+            correct_index=q['correct_index'],
+            text_hash=text_hash,
+        )
+
+    if new_rows:
+        try:
+            with write_transaction():
+                created = Question.objects.bulk_create(list(new_rows.values()))
+                QuestionApproval.objects.bulk_create(
+                    [QuestionApproval(question=q, status='pending') for q in created]
+                )
+            existing.update((q.text_hash, q.id) for q in created)
+            for q in created:
+                index.add_question(q)
+        except Exception:
+            logger.exception('Failed to persist %d generated question(s) for atom %s', len(new_rows), atom.id)
+
+    # Near-duplicate matches are question ids, or text hashes for in-batch twins
+    for text_hash, match in near.items():
+        existing[text_hash] = match if isinstance(match, int) else existing.get(match)
+
+    return [existing.get(text_hash) for text_hash in hashes]
+
+
+def _serve_generated(atom, generated, served_ids=()):
+    """
+    Persist generated questions and return them ready for a session.
+
+    A generated question whose id belongs to a different stored question (it
+    repeats one already in the bank) is replaced by that stored question, so the
+    student is graded on the same options and answer the QuestionResponse is
+    recorded against. If a teacher rejected that stored question, the generated
+    one is served without an id instead (no response is recorded), as it is when
+    the matched row has been deleted meanwhile. Questions the
+    session already has (served_ids, or earlier in the list) are dropped.
+    """
+    ids = _persist_generated_questions(atom, generated)
+    stored = Question.objects.select_related('approval').in_bulk({i for i in ids if i is not None})
+    seen = set(served_ids)
+    questions = []
+    for q, question_id in zip(generated, ids):
+        row = stored.get(question_id)
+        if row is None:
+            question_id = None   # matched a row another process has since deleted
+        elif (row.question_text, row.options, row.correct_index) != \
+                (q['question'], q['options'], q['correct_index']):
+            approval = getattr(row, 'approval', None)
+            if approval is not None and approval.status == 'rejected':
+                question_id = None
+            elif approval is not None:
+                q = question_payload(row)
+            else:
+                q = {**row.to_dict(), 'irt_a': row.irt_a, 'irt_b': row.irt_b}
+        if question_id is not None:
+            if question_id in seen:
+                continue
+            seen.add(question_id)
+        questions.append({**q, 'id': question_id})
+    return questions
+
 # ==================== AUTH VIEWS ====================
 
 class RegisterView(APIView):
@@ -173,14 +291,14 @@ _CONCEPT_CACHE_TTL = 900  # 15 minutes for full subject concepts
 def _get_gemini_client():
     """Lazy singleton for Gemini client. Uses GEMINI_API_KEY only to avoid conflict warnings."""
     gemini_key = getattr(settings, 'GEMINI_API_KEY', '') or getattr(settings, 'GOOGLE_API_KEY', '')
-    if not gemini_key:
+    if not gemini_key and not fake_llm_url():
         return None
     # Temporarily unset GOOGLE_API_KEY env var to avoid the SDK warning
     # "Both GOOGLE_API_KEY and GEMINI_API_KEY are set. Using GOOGLE_API_KEY."
     import os as _os
     saved = _os.environ.pop('GOOGLE_API_KEY', None)
     try:
-        return _genai.Client(api_key=gemini_key)
+        return make_genai_client(gemini_key)
     finally:
         if saved is not None:
             _os.environ['GOOGLE_API_KEY'] = saved
@@ -229,6 +347,10 @@ def _is_stale(entry, ttl):
     return entry is None or (_time.time() - entry.get('ts', 0)) > ttl
 
 
+def _get_autocomplete():
+    return get_autocomplete_index(POPULAR_SUBJECTS, FALLBACK_CONCEPTS)
+
+
 POPULAR_SUBJECTS = [
     # ── Computer Science & IT ──
     "Computer Science", "Data Structures", "Algorithms", "Operating Systems",
@@ -567,33 +689,10 @@ class SuggestSubjectsView(APIView):
     def get(self, request):
         q = (request.query_params.get('q', '') or '').strip().lower()
 
-        # 1. Subjects the user already studied (DB)
-        db_subjects = list(
-            Concept.objects.filter(created_by=request.user)
-            .values_list('subject', flat=True).distinct()
-        )
-        all_subjects = list(
-            Concept.objects.values_list('subject', flat=True).distinct()
-        )
-
-        # 2. Merge with curated list (deduplicated, case-insensitive)
-        seen = set()
-        combined = []
-        for s in db_subjects + all_subjects + POPULAR_SUBJECTS:
-            key = s.strip().lower()
-            if key and key not in seen:
-                seen.add(key)
-                combined.append(s.strip())
-
-        # 3. Filter by query
-        if q:
-            combined = [s for s in combined if q in s.lower()]
-
-        # 4. Sort: user's own subjects first, then alphabetical
-        db_lower = {s.lower() for s in db_subjects}
-        combined.sort(key=lambda s: (0 if s.lower() in db_lower else 1, s.lower()))
-
-        return Response({'suggestions': combined[:20]})
+        # Trie + trigram index over DB subjects and the curated list; the user's
+        # own subjects rank first (accounts/autocomplete.py)
+        suggestions = _get_autocomplete().suggest_subjects(q, request.user.id, limit=20)
+        return Response({'suggestions': suggestions})
 
 
 class SuggestConceptsView(APIView):
@@ -608,48 +707,29 @@ class SuggestConceptsView(APIView):
             return Response({'suggestions': []})
 
         subject_key = subject.lower()
+        index = _get_autocomplete()
 
-        # 1. DB concepts for this subject
-        db_concepts = list(
-            Concept.objects.filter(subject__iexact=subject)
-            .values_list('name', flat=True).distinct()
-        )
-
-        # 2. Get or generate the base concept list for the subject (cached)
+        # 1. Make sure the base concept list for the subject is indexed (cached)
         base_entry = _concept_cache.get(subject_key)
         if _is_stale(base_entry, _CONCEPT_CACHE_TTL):
             base_concepts = self._generate_base_concepts(subject)
             _concept_cache[subject_key] = {'concepts': base_concepts, 'ts': _time.time()}
-        else:
-            base_concepts = base_entry['concepts']
-
-        # 3. Merge DB + base AI concepts
-        seen = set()
-        combined = []
-        for c in db_concepts + base_concepts:
-            key = c.strip().lower()
-            if key and key not in seen:
-                seen.add(key)
-                combined.append(c.strip())
-
-        # 4. If user is typing (q ≥ 2 chars), do a targeted dynamic query
-        if q and len(q) >= 2:
-            # First filter locally
-            local_matches = [c for c in combined if q in c.lower()]
-
-            # If few local matches, ask Gemini for query-specific suggestions (cached)
-            if len(local_matches) < 4:
-                dynamic = self._query_specific_concepts(subject, q)
-                for c in dynamic:
-                    key = c.strip().lower()
-                    if key not in seen:
-                        seen.add(key)
-                        local_matches.append(c.strip())
-
-            combined = local_matches
-        elif q:
-            # Single char — just filter locally
-            combined = [c for c in combined if q in c.lower()]
+            index.add_concepts(subject, base_concepts)
+
+        # 2. DB + base concepts from the index (prefix, then infix / fuzzy matches)
+        combined = index.suggest_concepts(subject, q, request.user.id, limit=15)
+
+        # 3. If user is typing (q ≥ 2 chars) and few concepts match, ask Gemini for
+        #    query-specific suggestions (cached) and index them for next time
+        if q and len(q) >= 2 and len(combined) < 4:
+            dynamic = self._query_specific_concepts(subject, q)
+            index.add_concepts(subject, dynamic)
+            seen = {c.lower() for c in combined}
+            for c in dynamic:
+                key = c.strip().lower()
+                if key not in seen:
+                    seen.add(key)
+                    combined.append(c.strip())
 
         return Response({'suggestions': combined[:15]})
 
@@ -827,20 +907,11 @@ class StartTeachingSessionView(APIView):
 
         # Get or create progress records for this concept's atoms
         # Each atom starts at 0.0 mastery and 'not_started' phase
-        atoms = TeachingAtom.objects.filter(concept=concept).order_by('order')
-        
+        mastery = ensure_progress(user, concept.id)
+
         atom_states = []
-        for atom in atoms:
-            progress, created = StudentProgress.objects.get_or_create(
-                user=user,
-                atom=atom,
-                defaults={
-                    'mastery_score': 0.0,
-                    'phase': 'not_started',
-                    'error_history': []
-                }
-            )
-            
+        for atom in mastery.atoms:
+            progress = mastery.get(atom.id)
             atom_states.append(TeachingAtomState(
                 id=atom.id,
                 name=atom.name,
@@ -848,7 +919,7 @@ class StartTeachingSessionView(APIView):
                 phase=progress.phase,
                 streak=progress.streak,
                 hint_usage=progress.hint_usage,
-                error_history=progress.error_history or [],
+                error_history=list(progress.error_history),
                 retention_verified=progress.retention_verified
             ))
 
@@ -991,17 +1062,7 @@ class SubmitInitialQuizAnswerView(APIView):
         question = questions[question_index]
 
         # Type-safe comparison: ensure both are ints
-        try:
-            selected_int = int(selected) if selected is not None else None
-        except (TypeError, ValueError):
-            selected_int = None
-        stored_correct = question.get('correct_index')
-        try:
-            correct_index_int = int(stored_correct) if stored_correct is not None else None
-        except (TypeError, ValueError):
-            correct_index_int = None
-
-        correct = (selected_int is not None and selected_int == correct_index_int)
+        correct, selected_int, correct_index_int = diagnostic.grade(question, selected)
 
         # ── Real-time mastery update per question ──
         # Retrieve running mastery & theta from session data (or defaults)
@@ -1074,11 +1135,7 @@ class SubmitInitialQuizAnswerView(APIView):
         session.session_data['initial_quiz_answers'] = answers
         session.save()
 
-        explanation = ''
-        if not correct:
-            correct_index = correct_index_int
-            correct_option = question.get('options', [None])[correct_index] if correct_index is not None and 0 <= correct_index < len(question.get('options', [])) else None
-            explanation = f"Correct answer: {correct_option}. It best matches the question focus." if correct_option else "Review the concept and try again."
+        explanation = '' if correct else diagnostic.explanation(question, correct_index_int)
 
         return Response({
             'correct': correct,
@@ -1093,121 +1150,81 @@ class SubmitInitialQuizAnswerView(APIView):
         })
 
 
-class CompleteInitialQuizView(APIView):
-    """Finalize initial quiz with full adaptive flow — mastery seeding, theta update, error analysis."""
+class SubmitInitialQuizBatchView(APIView):
+    """Submit every diagnostic answer at once: graded, evaluated and stored in one request."""
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
         session_id = request.data.get('session_id')
+        submitted = request.data.get('answers')
 
         try:
             session = LearningSession.objects.get(id=session_id, user=request.user)
         except LearningSession.DoesNotExist:
             return Response({'error': 'Session not found'}, status=404)
 
-        answers = session.session_data.get('initial_quiz_answers', [])
         questions = session.session_data.get('initial_quiz_questions', [])
-        if not answers:
-            return Response({'error': 'No initial quiz answers'}, status=400)
+        if not isinstance(submitted, list) or not submitted:
+            return Response({'error': 'answers must be a non-empty list'}, status=400)
 
-        # ── Get or create learning profile ──
-        try:
-            profile = request.user.learning_profile
-        except LearningProfile.DoesNotExist:
-            profile = LearningProfile.objects.create(user=request.user)
+        answers, correct_indexes = [], {}
+        for item in submitted:
+            item = item if isinstance(item, dict) else {}
+            try:
+                question_index = int(item.get('question_index'))
+                time_taken = float(item.get('time_taken', 30))
+            except (TypeError, ValueError):
+                return Response({'error': 'Invalid question index or time'}, status=400)
+            if question_index < 0 or question_index >= len(questions) or question_index in correct_indexes:
+                return Response({'error': f'Invalid question index {question_index}'}, status=400)
+            correct, selected_int, correct_indexes[question_index] = diagnostic.grade(
+                questions[question_index], item.get('selected'))
+            answers.append({
+                'question_index': question_index,
+                'correct': correct,
+                'time_taken': time_taken,
+                'selected': selected_int,
+            })
 
-        # ── Run full adaptive evaluation ──
-        engine = AdaptiveLearningEngine()
-        evaluation = engine.evaluate_initial_quiz(
-            quiz_questions=questions,
-            quiz_answers=answers,
-            knowledge_level=session.knowledge_level,
-            current_theta=profile.overall_theta,
-        )
+        # One evaluation pass over all answers, one transaction for every write
+        result = diagnostic.finish(request.user, session, answers)
+
+        results = []
+        for answer in answers:
+            question = questions[answer['question_index']]
+            correct_index = correct_indexes[answer['question_index']]
+            results.append({
+                'question_index': answer['question_index'],
+                'correct': answer['correct'],
+                'correct_index': None if answer['correct'] else question.get('correct_index'),
+                'explanation': '' if answer['correct'] else diagnostic.explanation(question, correct_index),
+                'error_type': answer['error_type'],
+                'mastery_after': answer['mastery_after'],
+                'theta_after': answer['theta_after'],
+            })
 
-        seeded_mastery = evaluation['mastery']
-        updated_theta = evaluation['theta']
-        pacing = evaluation['pacing']
-        next_step = evaluation['next_step']
-        adjusted_level = evaluation['adjusted_knowledge_level']
-
-        # ── Update LearningProfile theta ──
-        profile.overall_theta = updated_theta
-        profile.save()
-
-        # ────────────────────────────────────────────────────────
-        # FIX: Do NOT seed diagnostic mastery to ALL atoms!
-        # The diagnostic quiz assesses overall concept readiness,
-        # NOT per-atom mastery. Each atom must EARN its mastery
-        # through actual learning interaction.
-        #
-        # Instead: Only the FIRST atom gets a small head-start
-        # (capped at 30%). All other atoms stay at 0.0.
-        # ────────────────────────────────────────────────────────
-        concept = session.concept
-        atoms = TeachingAtom.objects.filter(concept=concept).order_by('order')
-        for i, atom in enumerate(atoms):
-            progress, _ = StudentProgress.objects.get_or_create(
-                user=request.user,
-                atom=atom,
-                defaults={'phase': 'not_started', 'mastery_score': 0.0}
-            )
-            if i == 0:
-                # First atom: cap initial mastery at 30% from diagnostic
-                capped_mastery = min(float(seeded_mastery), 0.30)
-                progress.mastery_score = capped_mastery
-                progress.phase = 'teaching'
-            else:
-                # Other atoms: start fresh at 0.0
-                if progress.phase in ('diagnostic', 'not_started'):
-                    progress.mastery_score = 0.0
-                    progress.phase = 'not_started'
-            progress.error_history = evaluation.get('error_types', [])
-            progress.save()
+        return Response({'results': results, **result})
 
-        # ── Update session knowledge level if adjusted ──
-        if adjusted_level != session.knowledge_level:
-            session.knowledge_level = adjusted_level
 
-        # ── Store pacing + evaluation in session data ──
-        session_data = session.session_data or {}
-        session_data['pacing_history'] = session_data.get('pacing_history', []) + [{
-            'phase': 'initial_quiz',
-            'pacing': pacing,
-            'accuracy': evaluation['accuracy'],
-            'mastery': seeded_mastery,
-            'theta': updated_theta,
-            'next_step': next_step,
-            'timestamp': str(timezone.now()),
-        }]
-        session_data['initial_quiz_evaluation'] = evaluation
-        session_data['current_phase'] = 'teaching'
-        session.session_data = session_data
-        session.save()
+class CompleteInitialQuizView(APIView):
+    """Finalize initial quiz with full adaptive flow — mastery seeding, theta update, error analysis."""
+    permission_classes = [IsAuthenticated]
 
-        # ── Friendly recommendation ──
-        friendly = {
-            'speed_up': 'Great start! You can move faster.',
-            'stay': 'Good start. Keep a steady pace.',
-            'slow_down': 'Take it slowly and build confidence.',
-            'sharp_slowdown': 'Focus on basics first; go step by step.',
-        }
+    def post(self, request):
+        session_id = request.data.get('session_id')
+
+        try:
+            session = LearningSession.objects.get(id=session_id, user=request.user)
+        except LearningSession.DoesNotExist:
+            return Response({'error': 'Session not found'}, status=404)
+
+        answers = session.session_data.get('initial_quiz_answers', [])
+        if not answers:
+            return Response({'error': 'No initial quiz answers'}, status=400)
+
+        # Evaluation, theta, per-atom mastery seeds and session state (accounts/diagnostic.py)
+        return Response(diagnostic.finish(request.user, session, answers))
 
-        return Response({
-            'accuracy': evaluation['accuracy'],
-            'mastery': seeded_mastery,
-            'theta': updated_theta,
-            'initial_pacing': pacing,
-            'next_step': next_step,
-            'next_step_message': evaluation['next_step_message'],
-            'adjusted_knowledge_level': adjusted_level,
-            'error_analysis': evaluation['error_analysis'],
-            'mastery_verdict': evaluation.get('mastery_verdict', ''),
-            'recommended_difficulty': evaluation.get('recommended_difficulty', 'medium'),
-            'reasoning': evaluation.get('reasoning', ''),
-            'recommendation': friendly.get(pacing, 'Learn at your own pace'),
-        })
-    
     def _get_pacing_message(self, pacing):
         messages = {
             'sharp_slowdown': 'Take it very slow - focus on fundamentals',
@@ -1281,17 +1298,16 @@ class GetTeachingContentView(APIView):
             }
         
         # Fetch external resources (videos + images) for the atom
-        from learning_engine.external_resources import ExternalResourceFetcher
+        # Resources are searched in the background; the client polls resource-status/<id>/
         try:
-            fetcher = ExternalResourceFetcher()
-            resources = fetcher.get_resources_for_concept(
+            resources = resource_cache.request(
                 subject=atom.concept.subject,
                 concept=atom.concept.name,
                 atom_name=atom.name
             )
         except Exception as e:
-            logger.warning(f"External resource fetch failed: {e}")
-            resources = {'videos': [], 'images': []}
+            logger.warning(f"External resource lookup failed: {e}")
+            resources = resource_cache.empty_handle()
 
         # Update session data
         session_data['current_atom_index'] = atom.order
@@ -1308,8 +1324,9 @@ class GetTeachingContentView(APIView):
             'atom_id': atom.id,
             'atom_name': atom.name,
             'teaching_content': teaching_content,
-            'videos': resources.get('videos', []),
-            'images': resources.get('images', []),
+            'videos': resources['videos'],
+            'images': resources['images'],
+            'resources': {'id': resources['id'], 'status': resources['status']},
             'phase': progress.phase,
             'mastery_score': float(progress.mastery_score),
             'current_pacing': current_pacing
@@ -1371,59 +1388,76 @@ class GenerateQuestionsFromTeachingView(APIView):
         pacing_history = session_data.get('pacing_history', [])
         current_pacing = _normalize_pacing_value(pacing_history[-1], 'stay') if pacing_history else 'stay'
         
-        # Always generate questions FROM teaching content for this flow
-        generator = QuestionGenerator()
-
         # Determine question distribution based on knowledge level and pacing
         level_config = self._get_question_distribution(session.knowledge_level, current_pacing)
 
-        # Ensure we have teaching content to ground the questions
-        teaching_content = {
-            'explanation': atom.explanation or '',
-            'analogy': atom.analogy or '',
-            'examples': atom.examples or []
-        }
+        # Serve unseen teacher-approved questions from the bank first; only the
+        # deficit goes to the LLM (force_new skips the bank)
+        need = {d: int(level_config.get(d, 0) or 0) for d in ('easy', 'medium', 'hard')}
+        if force_new:
+            bank_questions, deficit = [], need
+        else:
+            # most informative questions at the student's current ability
+            theta = LearningProfile.objects.filter(user=request.user).values_list('overall_theta', flat=True).first()
+            bank_questions, deficit = select_from_bank(request.user, atom, need, theta=theta)
 
-        if not teaching_content['explanation']:
-            engine = AdaptiveLearningEngine()
-            # Get quiz mastery for depth adaptation
-            session_data = session.session_data or {}
-            quiz_eval = session_data.get('initial_quiz_evaluation', {})
-            quiz_running = session_data.get('quiz_running_state', {})
-            quiz_mastery = float(quiz_eval.get('mastery', quiz_running.get('mastery', 0.0)))
-            generated_teaching = engine.generate_teaching_content(
-                atom_name=atom.name,
+        generated = []
+        if any(deficit.values()):
+            # Always generate questions FROM teaching content for this flow
+            generator = QuestionGenerator()
+
+            # Ensure we have teaching content to ground the questions
+            teaching_content = {
+                'explanation': atom.explanation or '',
+                'analogy': atom.analogy or '',
+                'examples': atom.examples or []
+            }
+
+            if not teaching_content['explanation']:
+                engine = AdaptiveLearningEngine()
+                # Get quiz mastery for depth adaptation
+                session_data = session.session_data or {}
+                quiz_eval = session_data.get('initial_quiz_evaluation', {})
+                quiz_running = session_data.get('quiz_running_state', {})
+                quiz_mastery = float(quiz_eval.get('mastery', quiz_running.get('mastery', 0.0)))
+                generated_teaching = engine.generate_teaching_content(
+                    atom_name=atom.name,
+                    subject=atom.concept.subject,
+                    concept=atom.concept.name,
+                    knowledge_level=session.knowledge_level,
+                    mastery_score=quiz_mastery
+                )
+                teaching_content = {
+                    'explanation': generated_teaching.get('explanation', ''),
+                    'analogy': generated_teaching.get('analogy', ''),
+                    'examples': [
+                        generated_teaching.get('example', ''),
+                        generated_teaching.get('practical_application', ''),
+                        generated_teaching.get('misconception', '')
+                    ]
+                }
+
+            generated = generator.generate_questions_from_teaching(
                 subject=atom.concept.subject,
                 concept=atom.concept.name,
-                knowledge_level=session.knowledge_level,
-                mastery_score=quiz_mastery
+                atom=atom.name,
+                teaching_content=teaching_content,
+                need_easy=deficit.get('easy', 0),
+                need_medium=deficit.get('medium', 0),
+                need_hard=deficit.get('hard', 0),
+                knowledge_level=session.knowledge_level
             )
-            teaching_content = {
-                'explanation': generated_teaching.get('explanation', ''),
-                'analogy': generated_teaching.get('analogy', ''),
-                'examples': [
-                    generated_teaching.get('example', ''),
-                    generated_teaching.get('practical_application', ''),
-                    generated_teaching.get('misconception', '')
-                ]
-            }
 
-        generated = generator.generate_questions_from_teaching(
-            subject=atom.concept.subject,
-            concept=atom.concept.name,
-            atom=atom.name,
-            teaching_content=teaching_content,
-            need_easy=int(level_config.get('easy', 0) or 0),
-            need_medium=int(level_config.get('medium', 0) or 0),
-            need_hard=int(level_config.get('hard', 0) or 0),
-            knowledge_level=session.knowledge_level
-        )
+            # Persist to Question model so teachers can review (known duplicates served as stored)
+            generated = _serve_generated(atom, generated, {q['id'] for q in bank_questions})
+
+        # Bank + generated questions, easy → hard
+        questions = sorted(bank_questions + generated, key=lambda q: DIFFICULTY_ORDER.get(q['difficulty'], 1))
 
         # Prepare response + session grading payload
         questions_data = []
         full_questions = []
-        saved_db_ids = []
-        for q_data in generated:
+        for q_data in questions:
             adj_time = self._adjust_time_for_pacing(
                 q_data['estimated_time'],
                 current_pacing
@@ -1437,6 +1471,7 @@ class GenerateQuestionsFromTeachingView(APIView):
             })
 
             full_questions.append({
+                'id': q_data.get('id'),
                 'difficulty': q_data['difficulty'],
                 'cognitive_operation': q_data['cognitive_operation'],
                 'estimated_time': adj_time,
@@ -1445,21 +1480,6 @@ class GenerateQuestionsFromTeachingView(APIView):
                 'correct_index': q_data['correct_index']
             })
 
-            # Persist to Question model so teachers can review
-            try:
-                db_q = Question.objects.create(
-                    atom=atom,
-                    difficulty=q_data['difficulty'],
-                    cognitive_operation=q_data.get('cognitive_operation', 'apply'),
-                    estimated_time=adj_time,
-                    question_text=q_data['question'],
-                    options=q_data['options'],
-                    correct_index=q_data['correct_index'],
-                )
-                saved_db_ids.append(db_q.id)
-            except Exception as save_err:
-                print(f"Warning: failed to persist question to DB: {save_err}")
-        
         # Update session
         session_data['current_phase'] = 'questions'
         session_data['questions'] = full_questions
@@ -1471,6 +1491,7 @@ class GenerateQuestionsFromTeachingView(APIView):
             'atom_name': atom.name,
             'questions': questions_data,
             'total_questions': len(questions_data),
+            'from_bank': len(bank_questions),
             'current_pacing': current_pacing
         })
     
@@ -1528,6 +1549,86 @@ class GenerateQuestionsFromTeachingView(APIView):
         return int(base_time * multipliers.get(pacing_value, 1.0))
 
 
+class NextAdaptiveQuestionView(APIView):
+    """
+    Adaptive practice: the most informative unseen bank question at the student's
+    current theta. It is appended to the session's questions, so it is answered
+    through submit-atom-answer like the batch from generate-questions-from-teaching.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        session_id = request.data.get('session_id')
+        atom_id = request.data.get('atom_id')
+
+        try:
+            session = LearningSession.objects.get(id=session_id, user=request.user)
+            atom = TeachingAtom.objects.get(id=atom_id)
+        except (LearningSession.DoesNotExist, TeachingAtom.DoesNotExist):
+            return Response({'error': 'Session or atom not found'}, status=404)
+
+        theta = LearningProfile.objects.filter(user=request.user).values_list('overall_theta', flat=True).first()
+        theta = float(theta or 0.0)
+
+        # What this student already answered on the atom: excluded, and the
+        # information it carried gives the precision of the current theta
+        answered = {}
+        for question_id, difficulty, cognitive, irt_a, irt_b in (
+            QuestionResponse.objects.filter(user=request.user, question__atom=atom)
+            .values_list('question_id', 'question__difficulty', 'question__cognitive_operation',
+                         'question__irt_a', 'question__irt_b')
+        ):
+            answered[question_id] = item_parameters({'difficulty': difficulty, 'cognitive_operation': cognitive,
+                                                     'irt_a': irt_a, 'irt_b': irt_b})
+        theta_se = theta_standard_error(theta, answered.values())
+
+        session_data = session.session_data
+        questions = session_data.get('questions', [])
+        exclude = set(answered) | {q.get('id') for q in questions if q.get('id')}
+        served = Counter(q.get('cognitive_operation') for q in questions)
+
+        bank = atom_bank(atom.id)
+        picked = bank.pools['all'].select(theta, exclude, served)
+        summary = {
+            'theta': round(theta, 4),
+            'theta_se': round(theta_se, 4) if theta_se is not None else None,
+            'confident': theta_se is not None and theta_se <= TARGET_SE,
+        }
+        if picked is None:
+            # bank exhausted for this student — fall back to generate-questions-from-teaching
+            return Response({'question': None, 'exhausted': True, **summary})
+
+        question_id, information = picked
+        q_data = bank.payloads[question_id]
+        questions.append({
+            'id': question_id,
+            'difficulty': q_data['difficulty'],
+            'cognitive_operation': q_data['cognitive_operation'],
+            'estimated_time': q_data['estimated_time'],
+            'question': q_data['question'],
+            'options': q_data['options'],
+            'correct_index': q_data['correct_index'],
+        })
+        session_data['current_phase'] = 'questions'
+        session_data['questions'] = questions
+        session.session_data = session_data
+        session.save()
+
+        return Response({
+            'question_index': len(questions) - 1,
+            'question': {
+                'difficulty': q_data['difficulty'],
+                'cognitive_operation': q_data['cognitive_operation'],
+                'estimated_time': q_data['estimated_time'],
+                'question': q_data['question'],
+                'options': q_data['options'],
+            },
+            'information': round(information, 4),
+            'exhausted': False,
+            **summary,
+        })
+
+
 class SubmitAtomAnswerView(APIView):
     """Step 5: Submit answer and update mastery with pacing"""
     permission_classes = [IsAuthenticated]
@@ -1559,6 +1660,8 @@ class SubmitAtomAnswerView(APIView):
             raw_selected = data.get('selected')
             time_taken = data.get('time_taken', 30)
             question_set = data.get('question_set', 'teaching')
+            # Pacing reasoning breakdown is only built when the client asks for it
+            explain = str(data.get('explain', '')).lower() in ('1', 'true')
 
             # Type-safe: ensure selected is an int
             try:
@@ -1590,7 +1693,8 @@ class SubmitAtomAnswerView(APIView):
             if question_index < 0 or question_index >= len(questions):
                 return Response({'error': 'Invalid question index'}, status=400)
             
-            question = questions[question_index]
+            # Calibrated IRT parameters ride along for the theta update (see item_params.py)
+            question = with_item_parameters(questions[question_index])
             
             # Create atom state
             atom_state = TeachingAtomState(
@@ -1623,41 +1727,19 @@ class SubmitAtomAnswerView(APIView):
                 selected_answer=selected,
                 time_taken=time_taken,
                 knowledge_level=session.knowledge_level,
-                questions_history=history
+                questions_history=history,
+                explain=explain
             )
             
-            # Save updated values
             mastery_before = float(progress.mastery_score)
             new_mastery = result['updated_mastery']
             was_already_complete = (progress.phase == 'complete')
+            now = _time.time()
 
-            # ── Update streak + error_history BEFORE state machine ──
-            # (update_atom_state checks streak for completion decisions)
-            progress.streak = result['streak']
-            progress.error_history = atom_state.error_history
-
-            # ── Use adaptive state machine for phase transitions ──
-            AdaptiveLearningEngine.update_atom_state(
-                progress, new_mastery, result['correct']
-            )
-            # update_atom_state already calls progress.save()
-
-            # ── Detect fragile knowledge only on atoms that were ALREADY
-            #    complete before this answer (not ones that just became complete) ──
-            if was_already_complete:
-                AdaptiveLearningEngine.detect_fragile_knowledge(
-                    progress, result['correct'], time_taken,
-                    estimated_time=float(question.get('estimated_time', 60))
-                )
-            
-            # Update learning profile theta
-            profile.overall_theta = result['updated_theta']
-            profile.save()
-            
-            # Update session data
+            # ── Session bookkeeping, in memory (saved with the other writes below) ──
             if 'answers' not in session.session_data:
                 session.session_data['answers'] = []
-            
+
             session.session_data['answers'].append({
                 'question_index': question_index,
                 'correct': result['correct'],
@@ -1692,18 +1774,15 @@ class SubmitAtomAnswerView(APIView):
                 'mastery_after': result['updated_mastery'],
                 'error_type': result['error_type']
             })
-            
+
             session.questions_answered += 1
+            xp_amount = 0
             if result['correct']:
                 session.correct_answers += 1
                 # Award XP for correct answer based on difficulty
                 difficulty = question.get('difficulty', 'medium')
                 xp_map = {'easy': 1, 'medium': 2, 'hard': 3}
                 xp_amount = xp_map.get(difficulty, 2)
-                xp_profile, _ = UserXP.objects.get_or_create(user=request.user)
-                xp_profile.award_xp(xp_amount, category='questions')
-            
-            session.save()
 
             # ── Live cognitive load and session-shape ──
             from learning_engine.cognitive_load import compute_cognitive_load, get_session_shape_message
@@ -1732,8 +1811,7 @@ class SubmitAtomAnswerView(APIView):
                 'action': session_shape_action,
             })
             session_shape_message = get_session_shape_message(session_shape_action)
-            session.save()
-            
+
             # Determine next steps based on pacing
             explanation = ''
             if not result['correct']:
@@ -1775,36 +1853,90 @@ class SubmitAtomAnswerView(APIView):
                 'cognitive_load_action': session_shape_action,
                 'session_shape_message': session_shape_message,
             }
-            
+            if explain:
+                response_data['reasoning'] = result['reasoning']
+
             # Persist enriched data to session-level fatigue/velocity
             session.fatigue_level = result.get('fatigue', 'fresh')
             if result.get('velocity_snapshot'):
-                vel_data = session.velocity_data or []
-                vel_data.append(result['velocity_snapshot'])
-                session.velocity_data = vel_data
+                session.velocity_series = append_point(
+                    session.velocity_series, now,
+                    {**result['velocity_snapshot'], 'time_taken': float(time_taken or 0)}, session.id,
+                )
             if result.get('engagement_adjustment'):
                 session.engagement_score = result['engagement_adjustment'].get('score', session.engagement_score)
-            
-            # If atom complete, use ADAPTIVE ENGINE to find next best atom
-            # atom_complete comes from pacing engine's should_exit_atom.
-            # Only mark 'complete' if mastery genuinely meets the threshold;
-            # otherwise the student just hit max-questions and must move on
-            # without an artificial mastery boost.
-            if result['atom_complete'] and progress.phase != 'complete':
-                if float(progress.mastery_score) >= MASTERY_THRESHOLD:
-                    progress.phase = 'complete'
-                else:
-                    # Max-questions reached but mastery is low — don't fake it
-                    progress.phase = 'practice'
-                progress.save()
 
+            # All writes for this answer go in one short transaction so concurrent
+            # submissions don't interleave partial updates (see core/sqlite.py).
+            # Grading above and the next-atom lookup below stay outside it, so the
+            # writer lock is held for the saves only.
+            with write_transaction():
+                # ── Update streak + error_history BEFORE state machine ──
+                # (update_atom_state checks streak for completion decisions)
+                progress.streak = result['streak']
+                progress.error_history = atom_state.error_history
+                if result.get('velocity_snapshot'):
+                    progress.velocity_series = append_point(
+                        progress.velocity_series, now,
+                        {**result['velocity_snapshot'], 'time_taken': float(time_taken or 0)}, session.id,
+                    )
+
+                # ── Use adaptive state machine for phase transitions ──
+                AdaptiveLearningEngine.update_atom_state(
+                    progress, new_mastery, result['correct']
+                )
+                # update_atom_state already calls progress.save()
+
+                # ── Detect fragile knowledge only on atoms that were ALREADY
+                #    complete before this answer (not ones that just became complete) ──
+                if was_already_complete:
+                    AdaptiveLearningEngine.detect_fragile_knowledge(
+                        progress, result['correct'], time_taken,
+                        estimated_time=float(question.get('estimated_time', 60))
+                    )
+
+                # atom_complete comes from pacing engine's should_exit_atom.
+                # Only mark 'complete' if mastery genuinely meets the threshold;
+                # otherwise the student just hit max-questions and must move on
+                # without an artificial mastery boost.
+                if result['atom_complete'] and progress.phase != 'complete':
+                    if float(progress.mastery_score) >= MASTERY_THRESHOLD:
+                        progress.phase = 'complete'
+                    else:
+                        # Max-questions reached but mastery is low — don't fake it
+                        progress.phase = 'practice'
+                    progress.save()
+
+                # Update learning profile theta
+                profile.overall_theta = result['updated_theta']
+                profile.save()
+
+                # Per-question record for bank reuse and item statistics
+                if question.get('id'):
+                    QuestionResponse.objects.create(
+                        user=request.user,
+                        question_id=question['id'],
+                        session=session,
+                        selected=selected,
+                        correct=result['correct'],
+                        time_taken=float(time_taken or 0),
+                        theta=theta,
+                    )
+
+                if xp_amount:
+                    xp_profile, _ = UserXP.objects.get_or_create(user=request.user)
+                    xp_profile.award_xp(xp_amount, category='questions')
+
+                session.save()
+
+            # If atom complete, use ADAPTIVE ENGINE to find next best atom
             if result['atom_complete'] or progress.phase == 'complete':
-                
+
                 # Use adaptive engine to select next atom (weakest eligible)
                 next_step = engine.get_next_learning_step(
                     request.user, atom.concept, session
                 )
-                
+
                 if next_step.get('all_mastered'):
                     # All atoms complete — signal concept final challenge
                     response_data['concept_complete'] = True
@@ -1820,7 +1952,7 @@ class SubmitAtomAnswerView(APIView):
                         next_mastery = float(next_prog.mastery_score)
                     except StudentProgress.DoesNotExist:
                         next_mastery = 0.0
-                    
+
                     response_data['next_atom'] = {
                         'id': next_atom_obj.id,
                         'name': next_atom_obj.name,
@@ -1832,7 +1964,7 @@ class SubmitAtomAnswerView(APIView):
                 else:
                     response_data['concept_complete'] = True
                     response_data['concept_final_challenge_ready'] = True
-            
+
             # Sync response mastery with actual DB value
             # (may differ due to fragile decay or completion boost)
             response_data['updated_mastery'] = float(progress.mastery_score)
@@ -2285,10 +2417,8 @@ class GetNextLearningStepView(APIView):
                 'atom': None,
             })
 
-        progress, _ = StudentProgress.objects.get_or_create(
-            user=request.user, atom=atom,
-            defaults={'mastery_score': 0.0, 'phase': 'not_started'}
-        )
+        # get_next_learning_step created the row; the snapshot already has it
+        progress = mastery_snapshot(request.user.id, concept.id).get(atom.id)
         return Response({
             'action': step['action'],
             'reason': step.get('reason', ''),
@@ -2439,23 +2569,22 @@ class AdaptiveReteachView(APIView):
         progress.save()
 
         # Fetch external resources
-        from learning_engine.external_resources import ExternalResourceFetcher
         try:
-            fetcher = ExternalResourceFetcher()
-            resources = fetcher.get_resources_for_concept(
+            resources = resource_cache.request(
                 subject=atom.concept.subject,
                 concept=atom.concept.name,
                 atom_name=atom.name
             )
         except Exception:
-            resources = {'videos': [], 'images': []}
+            resources = resource_cache.empty_handle()
 
         return Response({
             'atom_id': atom.id,
             'atom_name': atom.name,
             'teaching_content': teaching_content,
-            'videos': resources.get('videos', []),
-            'images': resources.get('images', []),
+            'videos': resources['videos'],
+            'images': resources['images'],
+            'resources': {'id': resources['id'], 'status': resources['status']},
             'adjusted_level': adjusted_level,
             'mastery_score': mastery,
             'reteach_count': progress.times_practiced,
@@ -2477,18 +2606,20 @@ class GetAllAtomsMasteryView(APIView):
         except (LearningSession.DoesNotExist, Concept.DoesNotExist):
             return Response({'error': 'Not found'}, status=404)
 
-        atoms = TeachingAtom.objects.filter(concept=concept).order_by('order')
+        mastery = mastery_snapshot(request.user.id, concept.id)
+        atoms = mastery.atoms
+        progress_by_atom = mastery.progress
         atom_data = []
         total_mastery = 0.0
 
         for atom in atoms:
-            try:
-                progress = StudentProgress.objects.get(user=request.user, atom=atom)
+            progress = progress_by_atom.get(atom.id)
+            if progress:
                 mastery = float(progress.mastery_score)
                 phase = progress.phase
                 streak = progress.streak
                 errors = len(progress.error_history or [])
-            except StudentProgress.DoesNotExist:
+            else:
                 mastery = 0.0
                 phase = 'not_started'
                 streak = 0
@@ -2584,17 +2715,25 @@ class GenerateFinalChallengeView(APIView):
             'examples': atom.examples or []
         }
 
-        generator = QuestionGenerator()
-        final_questions = generator.generate_questions_from_teaching(
-            subject=atom.concept.subject,
-            concept=atom.concept.name,
-            atom=atom.name,
-            teaching_content=teaching_content,
-            need_easy=0,
-            need_medium=2,
-            need_hard=3,
-            knowledge_level=session.knowledge_level
-        )
+        # Unseen approved questions from the bank first, LLM for the rest
+        theta = LearningProfile.objects.filter(user=request.user).values_list('overall_theta', flat=True).first()
+        bank_questions, deficit = select_from_bank(request.user, atom, {'medium': 2, 'hard': 3}, theta=theta)
+        generated = []
+        if deficit:
+            generator = QuestionGenerator()
+            generated = generator.generate_questions_from_teaching(
+                subject=atom.concept.subject,
+                concept=atom.concept.name,
+                atom=atom.name,
+                teaching_content=teaching_content,
+                need_easy=0,
+                need_medium=deficit.get('medium', 0),
+                need_hard=deficit.get('hard', 0),
+                knowledge_level=session.knowledge_level
+            )
+            # Persist to Question model so teachers can review (known duplicates served as stored)
+            generated = _serve_generated(atom, generated, {q['id'] for q in bank_questions})
+        final_questions = sorted(bank_questions + generated, key=lambda q: DIFFICULTY_ORDER.get(q['difficulty'], 1))
 
         # Store full questions for grading
         session_data = session.session_data
@@ -2604,21 +2743,6 @@ class GenerateFinalChallengeView(APIView):
         session.session_data = session_data
         session.save()
 
-        # Persist to Question model so teachers can review
-        for q in final_questions:
-            try:
-                Question.objects.create(
-                    atom=atom,
-                    difficulty=q['difficulty'],
-                    cognitive_operation=q.get('cognitive_operation', 'apply'),
-                    estimated_time=q.get('estimated_time', 60),
-                    question_text=q['question'],
-                    options=q['options'],
-                    correct_index=q['correct_index'],
-                )
-            except Exception as save_err:
-                print(f"Warning: failed to persist final-challenge question to DB: {save_err}")
-
         # Return without correct_index
         questions_payload = []
         for q in final_questions:
@@ -2761,32 +2885,41 @@ class CompleteFinalChallengeView(APIView):
 class GetLearningProgressView(APIView):
     """Get overall learning progress with pacing history and stats"""
     permission_classes = [IsAuthenticated]
-    
+
     def get(self, request):
+        return conditional_response(request, 'learning_progress', [user_key(request.user.id), 'content'],
+                                    lambda: self._progress(request))
+
+    def _progress(self, request):
         try:
             profile = request.user.learning_profile
         except:
             profile = LearningProfile.objects.create(user=request.user)
         
         # Get all progress records
-        progress_records = StudentProgress.objects.filter(
+        progress_records = list(StudentProgress.objects.filter(
             user=request.user
-        ).select_related('atom__concept')
-        
-        # Get all sessions
-        all_sessions = LearningSession.objects.filter(user=request.user)
+        ).select_related('atom__concept'))
         
-        # Session stats
-        total_sessions = all_sessions.count()
-        total_questions_answered = sum(s.questions_answered for s in all_sessions)
-        total_correct_answers = sum(s.correct_answers for s in all_sessions)
-        total_hints_used = sum(s.hints_used for s in all_sessions)
+        # Session stats, one aggregate over all sessions
+        session_totals = LearningSession.objects.filter(user=request.user).aggregate(
+            sessions=models.Count('id'),
+            questions=models.Sum('questions_answered'),
+            correct=models.Sum('correct_answers'),
+            hints=models.Sum('hints_used'),
+        )
+        total_sessions = session_totals['sessions']
+        total_questions_answered = session_totals['questions'] or 0
+        total_correct_answers = session_totals['correct'] or 0
+        total_hints_used = session_totals['hints'] or 0
+
+        recent_sessions = list(
+            LearningSession.objects.filter(user=request.user).select_related('concept').order_by('-start_time')[:10]
+        )
 
         # Recent sessions for pacing analysis
-        recent_sessions = all_sessions.order_by('-start_time')[:5]
-        
         pacing_trend = []
-        for session in recent_sessions:
+        for session in recent_sessions[:5]:
             session_data = session.session_data
             pacing_history = session_data.get('pacing_history', [])
             if pacing_history:
@@ -2798,7 +2931,7 @@ class GetLearningProgressView(APIView):
 
         # Recent sessions list (for history display)
         recent_sessions_list = []
-        for s in all_sessions.order_by('-start_time')[:10]:
+        for s in recent_sessions:
             duration_mins = None
             if s.end_time and s.start_time:
                 duration_mins = round((s.end_time - s.start_time).total_seconds() / 60, 1)
@@ -2857,16 +2990,19 @@ class GetLearningProgressView(APIView):
             overall_mastery = 0
 
         # Completed atoms / concepts
-        total_atoms = progress_records.count()
-        mastered_atoms = progress_records.filter(phase='complete').count()
+        total_atoms = len(progress_records)
+        mastered_atoms = sum(1 for p in progress_records if p.phase == 'complete')
 
         concept_ids_started = set(p.atom.concept_id for p in progress_records)
-        concepts_completed = 0
-        for cid in concept_ids_started:
-            c_atoms = TeachingAtom.objects.filter(concept_id=cid).count()
-            c_mastered = progress_records.filter(atom__concept_id=cid, phase='complete').count()
-            if c_atoms > 0 and c_mastered >= c_atoms:
-                concepts_completed += 1
+        mastered_per_concept = Counter(p.atom.concept_id for p in progress_records if p.phase == 'complete')
+        atoms_per_concept = dict(
+            TeachingAtom.objects.filter(concept_id__in=concept_ids_started)
+            .values('concept_id').annotate(n=models.Count('id')).values_list('concept_id', 'n')
+        ) if concept_ids_started else {}
+        concepts_completed = sum(
+            1 for cid in concept_ids_started
+            if atoms_per_concept.get(cid, 0) > 0 and mastered_per_concept[cid] >= atoms_per_concept[cid]
+        )
 
         # XP stats
         try:
@@ -2935,28 +3071,39 @@ class GetVelocityGraphView(APIView):
         session_id = request.query_params.get('session_id')
         if not session_id:
             return Response({'error': 'session_id required'}, status=400)
+        return conditional_response(request, 'velocity_graph', [user_key(request.user.id)],
+                                    lambda: self._velocity(request, session_id))
 
+    def _velocity(self, request, session_id):
         try:
             session = LearningSession.objects.get(id=session_id, user=request.user)
         except LearningSession.DoesNotExist:
             return Response({'error': 'Session not found'}, status=404)
 
-        velocity_data = session.velocity_data or []
+        zoom = request.query_params.get('zoom', 'raw')
+        if zoom not in VELOCITY_TIERS:
+            return Response({'error': f"zoom must be one of {', '.join(VELOCITY_TIERS)}"}, status=400)
+
+        series = VelocitySeries.decode(session.velocity_series)
+        session_velocity = series.points(zoom)
 
         # Also gather per-atom velocity snapshots from StudentProgress
         atom_velocities = {}
         progresses = StudentProgress.objects.filter(
             user=request.user,
-            atom__concept=session.concept
-        )
+            atom__concept=session.concept,
+            velocity_series__isnull=False,
+        ).select_related('atom')
         for p in progresses:
-            snaps = p.velocity_snapshots or []
+            snaps = VelocitySeries.decode(p.velocity_series).points(zoom)
             if snaps:
                 atom_velocities[p.atom.name] = snaps
 
         return Response({
-            'session_velocity': velocity_data,
+            'zoom': zoom,
+            'session_velocity': session_velocity,
             'atom_velocities': atom_velocities,
+            'graph': PacingEngine().compute_velocity_graph(series, zoom),
             'engagement_score': session.engagement_score,
         })
 
@@ -3154,9 +3301,27 @@ class RecordHintUsageView(APIView):
         })
 
 
-# Add to backend/accounts/views.py
+class ResourceStatusView(APIView):
+    """Poll the resources handed out by teaching-content until status is 'ready'"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, resource_id):
+        row = ExternalResource.objects.filter(id=resource_id).first()
+        if row is None:
+            return Response({'error': 'Resources not found'}, status=404)
+        return Response(resource_cache.handle(row))
+
+
+class JobStatusView(APIView):
+    """Status of a background job (accounts/jobs.py) the user queued"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        job = Job.objects.filter(id=job_id).first()
+        if job is None or not (request.user.is_staff or job.created_by_id == request.user.id):
+            return Response({'error': 'Job not found'}, status=404)
+        return Response(jobs.status(job))
 
-from learning_engine.external_resources import ExternalResourceFetcher
 
 class GetConceptResourcesView(APIView):
     """Get external resources (videos, images) for a concept"""
@@ -3174,8 +3339,7 @@ class GetConceptResourcesView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            fetcher = ExternalResourceFetcher()
-            resources = fetcher.get_resources_for_concept(subject, concept, atom_name)
+            resources = resource_cache.get_resources(subject, concept, atom_name)
             
             return Response(resources, status=status.HTTP_200_OK)
             
@@ -3196,7 +3360,9 @@ class LeaderboardView(APIView):
     def get(self, request):
         # Ensure current user has an XP profile
         UserXP.objects.get_or_create(user=request.user)
+        return conditional_response(request, 'leaderboard', ['xp'], lambda: self._leaderboard(request))
 
+    def _leaderboard(self, request):
         leaderboard = UserXP.objects.select_related('user').order_by('-total_xp')[:50]
         data = []
         for rank, entry in enumerate(leaderboard, 1):
@@ -3238,6 +3404,9 @@ class MyXPView(APIView):
 
     def get(self, request):
         xp_profile, _ = UserXP.objects.get_or_create(user=request.user)
+        return conditional_response(request, 'my_xp', ['xp'], lambda: self._my_xp(xp_profile))
+
+    def _my_xp(self, xp_profile):
         rank = UserXP.objects.filter(total_xp__gt=xp_profile.total_xp).count() + 1
         total_users = UserXP.objects.count()
         return Response({
@@ -3418,17 +3587,13 @@ class CompleteConceptFinalChallengeView(APIView):
         accuracy = correct_count / total
 
         # Overall concept mastery from atoms
-        concept_atoms = TeachingAtom.objects.filter(concept=concept)
+        snapshot = mastery_snapshot(request.user.id, concept.id)
         atom_masteries = []
         weakest_atom = None
         lowest_mastery = 1.0
 
-        for atom in concept_atoms:
-            try:
-                prog = StudentProgress.objects.get(user=request.user, atom=atom)
-                mastery = float(prog.mastery_score)
-            except StudentProgress.DoesNotExist:
-                mastery = 0.0
+        for atom in snapshot.atoms:
+            mastery = snapshot.mastery(atom.id)
             atom_masteries.append(mastery)
 
             if mastery < lowest_mastery:
@@ -3621,23 +3786,27 @@ class TeacherDashboardView(APIView):
         # Get all concepts (teacher should see full class data)
         teacher_concepts = Concept.objects.all().order_by('subject', 'order')
 
-        # Class-level analytics: average mastery per concept
+        # Class-level analytics: average mastery per concept, one grouped pass over
+        # the progress rows and one over the atoms
+        teacher_concepts = list(teacher_concepts)
+        atom_counts = dict(
+            TeachingAtom.objects.values('concept_id').annotate(n=models.Count('id')).values_list('concept_id', 'n')
+        )
+        concept_stats = {
+            row['atom__concept_id']: row for row in StudentProgress.objects.values('atom__concept_id').annotate(
+                avg=models.Avg('mastery_score'),
+                students=models.Count('user', distinct=True),
+                weak=models.Count('user', distinct=True, filter=models.Q(mastery_score__lt=0.5)),
+            )
+        }
         class_analytics = []
         for concept in teacher_concepts:
-            atoms = TeachingAtom.objects.filter(concept=concept)
-            if not atoms.exists():
+            if not atom_counts.get(concept.id):
                 continue
-            progresses = StudentProgress.objects.filter(atom__in=atoms)
-            if progresses.exists():
-                avg_mastery = progresses.aggregate(
-                    avg=models.Avg('mastery_score')
-                )['avg'] or 0
-                student_count = progresses.values('user').distinct().count()
-                weak_count = progresses.filter(mastery_score__lt=0.5).values('user').distinct().count()
-            else:
-                avg_mastery = 0
-                student_count = 0
-                weak_count = 0
+            stats = concept_stats.get(concept.id, {})
+            avg_mastery = stats.get('avg') or 0
+            student_count = stats.get('students', 0)
+            weak_count = stats.get('weak', 0)
 
             class_analytics.append({
                 'concept_id': concept.id,
@@ -3646,7 +3815,7 @@ class TeacherDashboardView(APIView):
                 'avg_mastery': round(avg_mastery, 3),
                 'student_count': student_count,
                 'weak_students': weak_count,
-                'atom_count': atoms.count(),
+                'atom_count': atom_counts[concept.id],
             })
 
         # Pending question approvals
@@ -3664,13 +3833,20 @@ class TeacherDashboardView(APIView):
             teacher=teacher, status='active'
         ).count()
 
-        # Struggling students (mastery < 0.4 on any atom)
+        # Struggling students (mastery < 0.4 on any atom): each one's three weakest
+        # atoms, ranked in the database
+        sampled = list(all_students[:50])  # Limit for performance
+        weakest = defaultdict(list)
+        for p in (StudentProgress.objects.filter(user__in=sampled, mastery_score__lt=0.4)
+                  .select_related('atom__concept')
+                  .annotate(rank=models.Window(RowNumber(), partition_by='user_id',
+                                               order_by=('mastery_score', 'id')))
+                  .filter(rank__lte=3).order_by('user_id', 'rank')):
+            weakest[p.user_id].append(p)
         struggling_students = []
-        for student in all_students[:50]:  # Limit for performance
-            weak_progress = StudentProgress.objects.filter(
-                user=student, mastery_score__lt=0.4
-            ).select_related('atom__concept').order_by('mastery_score')[:3]
-            if weak_progress.exists():
+        for student in sampled:
+            weak_progress = weakest.get(student.id)
+            if weak_progress:
                 struggling_students.append({
                     'student_id': student.id,
                     'student_name': student.get_full_name() or student.username,
@@ -3686,13 +3862,14 @@ class TeacherDashboardView(APIView):
             'teacher': TeacherProfileSerializer(profile).data,
             'stats': {
                 'total_students': total_students,
-                'total_concepts': teacher_concepts.count(),
+                'total_concepts': len(teacher_concepts),
                 'pending_questions': pending_questions,
                 'active_overrides': active_overrides,
                 'active_goals': active_goals,
             },
             'class_analytics': class_analytics,
             'struggling_students': struggling_students[:20],
+            'goal_summary': teacher_goal_summary(teacher.id),
         })
 
 
@@ -3710,22 +3887,38 @@ class TeacherStudentListView(APIView):
             is_staff=False, is_superuser=False
         ).order_by('username')
 
+        # Per-student totals in one grouped query per table, not four per student
+        progress_stats = {
+            row['user_id']: row for row in StudentProgress.objects.filter(user__in=students).values('user_id').annotate(
+                total=models.Count('id'),
+                avg=models.Avg('mastery_score'),
+                completed=models.Count('id', filter=models.Q(phase='complete')),
+                weak=models.Count('id', filter=models.Q(mastery_score__lt=0.5)),
+            )
+        }
+        session_stats = {
+            row['user_id']: row for row in LearningSession.objects.filter(user__in=students).values('user_id').annotate(
+                questions=models.Sum('questions_answered'),
+                correct=models.Sum('correct_answers'),
+            )
+        }
+
         student_data = []
-        for student in students:
-            progress = StudentProgress.objects.filter(user=student)
-            total_atoms = progress.count()
-            avg_mastery = progress.aggregate(avg=models.Avg('mastery_score'))['avg'] or 0
-            completed_atoms = progress.filter(phase='complete').count()
-            weak_count = progress.filter(mastery_score__lt=0.5).count()
+        for student in students.select_related('xp_profile'):
+            progress = progress_stats.get(student.id, {})
+            total_atoms = progress.get('total', 0)
+            avg_mastery = progress.get('avg') or 0
+            completed_atoms = progress.get('completed', 0)
+            weak_count = progress.get('weak', 0)
 
             try:
                 xp = student.xp_profile.total_xp
             except Exception:
                 xp = 0
 
-            sessions = LearningSession.objects.filter(user=student)
-            total_questions = sessions.aggregate(total=models.Sum('questions_answered'))['total'] or 0
-            total_correct = sessions.aggregate(total=models.Sum('correct_answers'))['total'] or 0
+            sessions = session_stats.get(student.id, {})
+            total_questions = sessions.get('questions') or 0
+            total_correct = sessions.get('correct') or 0
 
             student_data.append({
                 'id': student.id,
@@ -3865,14 +4058,29 @@ class TeacherQuestionListView(APIView):
         filter_status = request.query_params.get('status', 'all')
         concept_id = request.query_params.get('concept_id')
 
-        questions = Question.objects.all().select_related('atom__concept')
+        # Approval rides along on the same query (reverse one-to-one join)
+        questions = Question.objects.all().select_related('atom__concept', 'approval')
 
         if concept_id:
             questions = questions.filter(atom__concept_id=concept_id)
 
+        # Questions without an approval row count as pending
+        if filter_status == 'pending':
+            questions = questions.filter(models.Q(approval__isnull=True) | models.Q(approval__status='pending'))
+        elif filter_status != 'all':
+            questions = questions.filter(approval__status=filter_status)
+
+        # Near-duplicate groups among the listed questions (same atom); teachers
+        # can approve one of each and reject the rest
+        questions = list(questions)
+        clusters = near_duplicates.question_clusters(questions)
+
         question_data = []
         for q in questions:
-            approval = QuestionApproval.objects.filter(question=q).first()
+            try:
+                approval = q.approval
+            except QuestionApproval.DoesNotExist:
+                approval = None
             question_data.append({
                 'id': q.id,
                 'question_text': q.question_text,
@@ -3887,11 +4095,9 @@ class TeacherQuestionListView(APIView):
                 'subject': q.atom.concept.subject,
                 'approval_status': approval.status if approval else 'pending',
                 'approval_feedback': approval.feedback if approval else '',
+                'duplicate_cluster': clusters.get(q.id),
             })
 
-        if filter_status != 'all':
-            question_data = [q for q in question_data if q['approval_status'] == filter_status]
-
         return Response(question_data)
 
 
@@ -4080,6 +4286,33 @@ class TeacherOverrideListView(APIView):
         return Response(TeacherOverrideSerializer(override).data, status=status.HTTP_201_CREATED)
 
 
+class TeacherBulkOverrideView(APIView):
+    """
+    Apply one override to many students / atoms at once.
+
+    Body: {"action": "force_review", "selector": {"concept": 3, "atoms": [..],
+    "students": [..], "mastery_min": 0.0, "mastery_max": 0.5}, "parameters": {..},
+    "reason": ".."}; the selector needs a concept or atoms, the rest narrows it.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if not IsTeacher.check(request.user):
+            return Response({'error': 'Not a teacher'}, status=403)
+
+        selector = request.data.get('selector')
+        parameters = request.data.get('parameters') or {}
+        if not isinstance(selector, dict) or not isinstance(parameters, dict):
+            return Response({'error': 'selector and parameters must be objects'}, status=400)
+        try:
+            result = apply_bulk_override(
+                request.user, selector, request.data.get('action'), parameters, request.data.get('reason', ''),
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        return Response(result)
+
+
 class TeacherOverrideDeactivateView(APIView):
     """Deactivate an override"""
     permission_classes = [IsAuthenticated]
@@ -4170,24 +4403,29 @@ class TeacherClassAnalyticsView(APIView):
         profile = teacher.teacher_profile
 
         # Get all concepts (teacher should see full class analytics)
-        concepts = Concept.objects.all().order_by('subject', 'order')
+        concepts = list(Concept.objects.all().order_by('subject', 'order'))
+
+        # Per-concept breakdown: one grouped pass over the progress rows
+        atoms_by_concept = defaultdict(list)
+        for atom in TeachingAtom.objects.filter(concept__in=concepts):
+            atoms_by_concept[atom.concept_id].append(atom)
+        atom_ids = [atom.id for atoms in atoms_by_concept.values() for atom in atoms]
+        atom_stats = {
+            row['atom_id']: row for row in StudentProgress.objects.filter(atom_id__in=atom_ids).values('atom_id').annotate(
+                rows=Count('id'),
+                avg_mastery=Avg('mastery_score'),
+                total_students=Count('user', distinct=True),
+                completed=Count('id', filter=Q(phase='complete')),
+                struggling=Count('id', filter=Q(mastery_score__lt=0.4)),
+            )
+        }
+        empty = {'avg_mastery': 0, 'total_students': 0, 'completed': 0, 'struggling': 0}
 
-        # Per-concept breakdown
         concept_analytics = []
         for concept in concepts:
-            atoms = TeachingAtom.objects.filter(concept=concept)
             atom_analytics = []
-            for atom in atoms:
-                progresses = StudentProgress.objects.filter(atom=atom)
-                if progresses.exists():
-                    stats = progresses.aggregate(
-                        avg_mastery=Avg('mastery_score'),
-                        total_students=Count('user', distinct=True),
-                        completed=Count('id', filter=Q(phase='complete')),
-                        struggling=Count('id', filter=Q(mastery_score__lt=0.4)),
-                    )
-                else:
-                    stats = {'avg_mastery': 0, 'total_students': 0, 'completed': 0, 'struggling': 0}
+            for atom in atoms_by_concept[concept.id]:
+                stats = atom_stats.get(atom.id, empty)
 
                 atom_analytics.append({
                     'atom_id': atom.id,
@@ -4207,17 +4445,17 @@ class TeacherClassAnalyticsView(APIView):
                 'atoms': atom_analytics,
             })
 
-        # Overall class stats
-        all_progress = StudentProgress.objects.all()
-        overall_stats = all_progress.aggregate(
-            avg_mastery=Avg('mastery_score'),
-            total_completions=Count('id', filter=Q(phase='complete')),
-        )
+        # Overall class stats, from the per-atom groups (every atom belongs to a concept)
+        total_rows = sum(row['rows'] for row in atom_stats.values())
+        overall_stats = {
+            'avg_mastery': sum(row['avg_mastery'] * row['rows'] for row in atom_stats.values()) / total_rows
+            if total_rows else 0,
+            'total_completions': sum(row['completed'] for row in atom_stats.values()),
+        }
 
-        total_sessions = LearningSession.objects.count()
-        total_questions_answered = LearningSession.objects.aggregate(
-            total=Sum('questions_answered')
-        )['total'] or 0
+        session_totals = LearningSession.objects.aggregate(count=Count('id'), total=Sum('questions_answered'))
+        total_sessions = session_totals['count']
+        total_questions_answered = session_totals['total'] or 0
 
         return Response({
             'concepts': concept_analytics,
@@ -4243,11 +4481,15 @@ class TeacherConceptManageView(APIView):
 
         concepts = Concept.objects.filter(
             created_by=request.user
-        ).prefetch_related('atoms')
+        ).prefetch_related(
+            models.Prefetch('atoms', queryset=TeachingAtom.objects.order_by('order')
+                            .annotate(question_count=models.Count('questions'))),
+            'prerequisites',
+        )
 
         data = []
         for concept in concepts:
-            atoms = concept.atoms.all().order_by('order')
+            atoms = concept.atoms.all()
             data.append({
                 'id': concept.id,
                 'name': concept.name,
@@ -4259,9 +4501,9 @@ class TeacherConceptManageView(APIView):
                     'id': a.id, 'name': a.name, 'order': a.order,
                     'explanation': a.explanation, 'analogy': a.analogy,
                     'examples': a.examples,
-                    'question_count': a.questions.count(),
+                    'question_count': a.question_count,
                 } for a in atoms],
-                'prerequisites': list(concept.prerequisites.values_list('id', flat=True)),
+                'prerequisites': [p.id for p in concept.prerequisites.all()],
             })
 
         return Response(data)
@@ -4597,6 +4839,10 @@ class ParentChildInsightsView(APIView):
             return Response({'error': 'Not a parent'}, status=403)
         if not ParentChild.objects.filter(parent=request.user, child_id=child_id).exists():
             return Response({'error': 'Child not found or not linked to you'}, status=404)
+        return conditional_response(request, 'parent_child_insights', [user_key(child_id), 'content'],
+                                    lambda: self._insights(child_id), window=CLOCK_WINDOW)
+
+    def _insights(self, child_id):
         try:
             child = User.objects.get(id=child_id)
         except User.DoesNotExist:
@@ -4683,14 +4929,15 @@ class ParentChildInsightsView(APIView):
         # Insight messages (rule-based)
         insights = []
         if progress_records.exists():
-            concepts_started = set(p.atom.concept.name for p in progress_records)
-            for cname in list(concepts_started)[:3]:
-                crecords = progress_records.filter(atom__concept__name=cname)
-                avg = sum(r.mastery_score for r in crecords) / crecords.count()
-                pct = int(round(avg * 100))
+            # progress_records is already loaded; group in Python instead of re-querying per concept
+            scores_by_concept = {}
+            for p in progress_records:
+                scores_by_concept.setdefault(p.atom.concept.name, []).append(p.mastery_score)
+            for cname, scores in list(scores_by_concept.items())[:3]:
+                pct = int(round(sum(scores) / len(scores) * 100))
                 insights.append(f"Your child is learning {cname} at a steady pace; mastery is about {pct}%.")
-            mastered = progress_records.filter(phase='complete').count()
-            total = progress_records.count()
+            mastered = sum(1 for p in progress_records if p.phase == 'complete')
+            total = len(progress_records)
             if total > 0:
                 insights.append(f"They've mastered {mastered} of {total} topics so far.")
         if recent_sessions:
@@ -4709,13 +4956,12 @@ class ParentChildInsightsView(APIView):
         # Optional: velocity snapshot (simple trend from session or progress)
         velocity_snapshots = []
         for s in sessions[:10]:
-            vd = getattr(s, 'velocity_data', None) or []
-            if vd:
-                for entry in (vd[-3:] if isinstance(vd, list) else []):
-                    if isinstance(entry, dict) and 'timestamp' in entry:
-                        velocity_snapshots.append({'date': entry.get('timestamp'), 'value': entry.get('value')})
-                    elif isinstance(entry, (int, float)):
-                        velocity_snapshots.append({'date': s.start_time.isoformat(), 'value': entry})
+            if s.velocity_series:
+                for point in VelocitySeries.decode(s.velocity_series).points('raw', ['mastery'])[-3:]:
+                    velocity_snapshots.append({
+                        'date': datetime.fromtimestamp(point['timestamp'], tz=dt_timezone.utc).isoformat(),
+                        'value': point['mastery'],
+                    })
         velocity_snapshots = velocity_snapshots[:10]
 
         # Weekly summary (last 7 days)
@@ -4748,6 +4994,10 @@ class LearningCalendarView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
+        return conditional_response(request, 'learning_calendar', [user_key(request.user.id), 'content'],
+                                    lambda: self._calendar(request), window=CLOCK_WINDOW)
+
+    def _calendar(self, request):
         now = timezone.now().date()
         try:
             year = int(request.query_params.get('year', now.year))
@@ -4904,54 +5154,57 @@ class CreateStudyPlannerView(APIView):
                 free_hours_per_day=data.get('free_hours_per_day', 2)
             )
             
-            # Add subjects and generate topics for each
+            # Generate topics for all subjects concurrently (cached per subject/goal);
+            # subjects not ready by the deadline get placeholders, filled in later
             subjects_data = data.get('subjects', [])
+            goal = data.get('goal_type', 'study')
+            ready, late = fan_out([s.get('subject_name') for s in subjects_data if s.get('subject_name')], goal)
             subjects_with_topics = []
+            pending_subjects = []
             
             for subject_data in subjects_data:
                 subject_name = subject_data.get('subject_name')
                 priority = subject_data.get('priority', 1)
+                exam_date = parse_date(subject_data.get('exam_date') or '')
+                topics = ready.get(subject_name) or placeholder_topics(subject_name)
+                pending = subject_name in late
                 
                 # Create the subject
                 planner_subject = PlannerSubject.objects.create(
                     planner=planner,
                     subject_name=subject_name,
-                    priority=priority
-                )
-                
-                # Generate AI topics for this subject
-                topics = generate_subtopics(
-                    subject=subject_name,
-                    goal=data.get('goal_type', 'study'),
-                    num_topics=8  # Generate 8 topics per subject
+                    priority=priority,
+                    exam_date=exam_date,
+                    topics=topics,
+                    topics_pending=pending,
                 )
+                if pending:
+                    pending_subjects.append(planner_subject)
                 
                 subjects_with_topics.append({
                     "subject_name": subject_name,
                     "topics": topics,
-                    "priority": priority
+                    "priority": priority,
+                    "exam_date": exam_date,
+                    "topics_pending": pending,
                 })
             
-            # Distribute topics across days
-            schedule = distribute_topics(planner, subjects_with_topics)
-            
-            # Convert schedule to timetable format for storage
-            timetable = {}
-            for day_schedule in schedule:
-                day_name = day_schedule['day']
-                timetable[day_name] = []
-                for session in day_schedule['sessions']:
-                    timetable[day_name].append({
-                        "hour": len(timetable[day_name]) + 1,
-                        "subject": session['subject'],
-                        "topic": session['topic'],
-                        "hours": session['hours'],
-                        "status": "pending"
-                    })
-            
-            # Save the timetable
-            planner.timetable = timetable
-            planner.save()
+            # Allocate the free hours by priority, mastery, due reviews and exam dates
+            try:
+                horizon = min(max(int(data.get('horizon_days', 7)), 1), MAX_PLAN_DAYS)
+            except (TypeError, ValueError):
+                horizon = 7
+            days = schedule_days(date.today(), horizon, planner.day_option)
+            demands = subject_demands(request.user, subjects_with_topics, days)
+            solver = TimetableSolver(demands, days, planner.free_hours_per_day)
+            with write_transaction():
+                items = materialize(planner, solver)
+            for planner_subject in pending_subjects:
+                fill_when_done(planner_subject.id, planner_subject.subject_name, late[planner_subject.subject_name])
+
+            # First week in the weekly timetable shape the planner page renders
+            week_end = date.today() + timedelta(days=7)
+            timetable = timetable_from_items([item for item in items if item.date < week_end])
             
             # Return the created planner with topics
             response_data = {
@@ -4961,7 +5214,10 @@ class CreateStudyPlannerView(APIView):
                 'free_hours_per_day': planner.free_hours_per_day,
                 'created_at': planner.created_at,
                 'subjects': subjects_with_topics,
-                'timetable': timetable
+                'timetable': timetable,
+                'horizon_days': horizon,
+                'items_created': len(items),
+                'pending_subjects': [ps.subject_name for ps in pending_subjects],
             }
             
             return Response(response_data, status=201)
@@ -4984,12 +5240,14 @@ class TodayStudyView(APIView):
             # Get the planner
             planner = StudyPlanner.objects.get(id=planner_id, user=request.user)
             
-            # Get today's day name
-            today = datetime.now().strftime('%A')
-            
-            # Get today's schedule from planner timetable
-            timetable = planner.timetable or {}
-            today_schedule = timetable.get(today, [])
+            # Today's rows, one (planner, date) index range
+            today = date.today()
+            today_items = list(planner.items.filter(date=today).order_by('position'))
+            if today_items:
+                today_schedule = [item_entry(item) for item in today_items]
+            else:
+                # Plans made before StudyPlanItem rows: weekday-keyed timetable blob
+                today_schedule = (planner.timetable or {}).get(today.strftime('%A'), [])
             
             # Build subjects with topics
             subjects = {}
@@ -5005,11 +5263,10 @@ class TodayStudyView(APIView):
                 if subject_name not in subjects:
                     subjects[subject_name] = []
                 
-                # Check if this topic is completed
-                is_completed = False  # You can track this in a separate model
+                is_completed = session.get('status') == 'completed'
                 
                 subjects[subject_name].append({
-                    'id': hash(f"{subject_name}_{topic_name}") % 10000,  # Temporary ID
+                    'id': session.get('id', hash(f"{subject_name}_{topic_name}") % 10000),
                     'name': topic_name,
                     'description': f"Study {topic_name}",
                     'difficulty': 'medium',  # Default
@@ -5033,7 +5290,7 @@ class TodayStudyView(APIView):
                 'completed_topics': completed_topics,
                 'completed_subjects': completed_subjects,
                 'subjects': subjects,
-                'date': today,
+                'date': today.strftime('%A'),
                 'planner_id': planner.id,
                 'schedule': today_schedule
             }
@@ -5046,6 +5303,107 @@ class TodayStudyView(APIView):
             print(f"Error in TodayStudyView: {str(e)}")
             return Response({'error': str(e)}, status=500)
 
+
+class PlannerWeekView(APIView):
+    """Seven days of plan items from ?start= (default: this Monday)."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            planner = StudyPlanner.objects.get(id=request.query_params.get('planner_id'), user=request.user)
+        except (StudyPlanner.DoesNotExist, ValueError, TypeError):
+            return Response({'error': 'Planner not found'}, status=404)
+        start = parse_date(request.query_params.get('start') or '')
+        if start is None:
+            start = date.today() - timedelta(days=date.today().weekday())
+
+        days = {}
+        for item in week_items(planner, start):
+            days.setdefault(item.date, []).append(item_entry(item))
+        items = [entry for entries in days.values() for entry in entries]
+        return Response({
+            'planner_id': planner.id,
+            'start': start,
+            'days': [{'date': d, 'day': d.strftime('%A'), 'sessions': entries} for d, entries in days.items()],
+            'total_items': len(items),
+            'completed_items': sum(1 for entry in items if entry['status'] == 'completed'),
+        })
+
+
+class PlannerTopicsView(APIView):
+    """Subtopic status per subject; poll while a new planner has pending_subjects."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            planner = StudyPlanner.objects.get(id=request.query_params.get('planner_id'), user=request.user)
+        except (StudyPlanner.DoesNotExist, ValueError, TypeError):
+            return Response({'error': 'Planner not found'}, status=404)
+        subjects = [{
+            'subject_name': subject.subject_name,
+            'topics': subject.topics,
+            'topics_pending': subject.topics_pending,
+        } for subject in planner.subjects.order_by('id')]
+        return Response({
+            'planner_id': planner.id,
+            'subjects': subjects,
+            'pending': sum(1 for subject in subjects if subject['topics_pending']),
+        })
+
+
+class PlannerItemCompleteView(APIView):
+    """Mark one plan item completed (or not): a single-row UPDATE."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            item_id = int(request.data.get('item_id'))
+        except (TypeError, ValueError):
+            return Response({'error': 'item_id must be an integer'}, status=400)
+        completed = str(request.data.get('completed', True)).lower() not in ('0', 'false')
+        updated = StudyPlanItem.objects.filter(
+            id=item_id, planner__user=request.user,
+        ).update(completed=completed, completed_at=timezone.now() if completed else None)
+        if not updated:
+            return Response({'error': 'Plan item not found'}, status=404)
+        return Response({'item_id': item_id, 'completed': completed})
+
+
+class PlannerReplanView(APIView):
+    """Change one day's study hours; that day and the ones after it are planned again."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            planner = StudyPlanner.objects.get(id=request.data.get('planner_id'), user=request.user)
+        except (StudyPlanner.DoesNotExist, ValueError, TypeError):
+            return Response({'error': 'Planner not found'}, status=404)
+        day = parse_date(str(request.data.get('date') or ''))
+        try:
+            hours = int(request.data.get('hours'))
+        except (TypeError, ValueError):
+            hours = -1
+        if day is None or day < date.today() or not 0 <= hours <= 24:
+            return Response({'error': 'date (today or later) and hours (0-24) are required'}, status=400)
+
+        solver = stored_solver(planner)
+        if solver is None:
+            return Response({'error': 'This planner has no plan items'}, status=400)
+        try:
+            days = solver.replan(day, hours)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        with write_transaction():
+            items = rematerialize_from(planner, solver, day)
+        return Response({
+            'planner_id': planner.id,
+            'date': day,
+            'hours': hours,
+            'days_replanned': len(days),
+            'items': len(items),
+            'sessions': [item_entry(item) for item in items if item.date == day],
+        })
+
         
 class GetMyPlannerView(APIView):
     permission_classes = [IsAuthenticated]
@@ -5056,9 +5414,12 @@ class GetMyPlannerView(APIView):
         if not planner:
             return Response({"message": "No planner found"}, status=404)
 
+        # The coming seven days of rows; plans made before rows existed keep their blob
+        timetable = timetable_from_items(week_items(planner, date.today())) or planner.timetable
         return Response({
+            "id": planner.id,
             "goal_type": planner.goal_type,
             "day_option": planner.day_option,
             "free_hours_per_day": planner.free_hours_per_day,
-            "timetable": planner.timetable
+            "timetable": timetable
         })
@@ -0,0 +1,78 @@
+# backend/core/middleware.py
+# Response compression for API payloads.
+#   - brotli when the package is installed and the client sends "br" in
+#     Accept-Encoding, gzip otherwise
+#   - only bodies of at least RESPONSE_COMPRESSION_MIN_BYTES (small responses
+#     cost more to compress than they save on the wire) and only text / JSON
+#   - streaming responses (whitenoise static files, which are pre-compressed)
+#     and anything already encoded pass through untouched
+# Placed near the top of MIDDLEWARE so it sees the final body.
+
+import gzip
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+DEFAULT_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5         # dynamic content: q5 is close to q11's ratio at a fraction of the CPU
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/', 'application/javascript')
+
+_accepts_gzip = _lazy_re_compile(r'\bgzip\b')
+_accepts_br = _lazy_re_compile(r'\bbr\b')
+
+
+def compress(content: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(content, quality=BROTLI_QUALITY)
+    return gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def choose_encoding(accept_encoding: str):
+    if brotli is not None and _accepts_br.search(accept_encoding):
+        return 'br'
+    if _accepts_gzip.search(accept_encoding):
+        return 'gzip'
+    return None
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_bytes = getattr(settings, 'RESPONSE_COMPRESSION_MIN_BYTES', DEFAULT_MIN_BYTES)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES):
+            return response
+
+        # Vary even when this body is too small, so caches don't hand a compressed
+        # variant to a client that can't decode it
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < self.min_bytes:
+            return response
+
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # The body changed, so a strong ETag can no longer describe it (RFC 9110 8.8.1)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
@@ -0,0 +1,87 @@
+# backend/core/renderers.py
+# JSON renderer for API responses.
+#   - orjson when installed: serializes dict/list/str/number trees, datetime, date,
+#     time, UUID, dataclasses and numpy scalars/arrays in Rust, straight to bytes
+#   - stdlib json otherwise, with an encoder that emits the same formats
+# Datetimes are written as rest_framework's encoder writes them: isoformat(),
+# with a UTC offset of +00:00 shortened to Z.
+
+import datetime
+import decimal
+import json
+import uuid
+
+from django.utils.functional import Promise
+from rest_framework.renderers import BaseRenderer
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json fallback
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _default(obj):
+    """Types neither backend serializes natively (lazy translations, Decimal, sets, querysets)."""
+    if isinstance(obj, Promise):
+        return str(obj)
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if np is not None and isinstance(obj, np.generic):
+        return obj.item()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, '__iter__') and not isinstance(obj, (str, bytes, dict)):
+        return list(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+class _Encoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, datetime.datetime):
+            representation = obj.isoformat()
+            return representation[:-6] + 'Z' if representation.endswith('+00:00') else representation
+        if isinstance(obj, (datetime.date, datetime.time)):
+            return obj.isoformat()
+        if isinstance(obj, uuid.UUID):
+            return str(obj)
+        return _default(obj)
+
+
+def stdlib_dumps(data, indent: bool = False) -> bytes:
+    return json.dumps(data, cls=_Encoder, ensure_ascii=False, allow_nan=False,
+                      indent=2 if indent else None,
+                      separators=None if indent else (',', ':')).encode('utf-8')
+
+
+def orjson_dumps(data, indent: bool = False) -> bytes:
+    option = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z
+              | (orjson.OPT_INDENT_2 if indent else 0))
+    return orjson.dumps(data, default=_default, option=option)
+
+
+dumps = orjson_dumps if orjson is not None else stdlib_dumps
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+
+class FastJSONRenderer(BaseRenderer):
+    """Drop-in for rest_framework's JSONRenderer (application/json, UTF-8, ?indent via Accept)."""
+
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = False
+        if accepted_media_type:
+            params = dict(part.strip().split('=', 1) for part in accepted_media_type.split(';')[1:] if '=' in part)
+            indent = params.get('indent', '0').strip() not in ('', '0')
+        return dumps(data, indent)
@@ -45,6 +45,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # Add this
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -86,6 +87,22 @@ DATABASES = {
     }
 }
 
+# SQLite production profile (see core/sqlite.py): WAL, busy timeout, mmap/cache
+# pragmas and BEGIN IMMEDIATE. Benchmark with `manage.py bench_sqlite_writes`.
+SQLITE_PRODUCTION = os.getenv('SQLITE_PRODUCTION', '') == '1'
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KIB = int(os.getenv('SQLITE_CACHE_SIZE_KIB', str(64 * 1024)))
+# Serialize writes within a worker process through one lock
+SQLITE_SINGLE_WRITER = os.getenv('SQLITE_SINGLE_WRITER', '') == '1'
+
+if SQLITE_PRODUCTION:
+    from core.sqlite import sqlite_production_options
+
+    DATABASES['default']['OPTIONS'] = sqlite_production_options(
+        SQLITE_BUSY_TIMEOUT_MS, SQLITE_MMAP_SIZE, SQLITE_CACHE_SIZE_KIB,
+    )
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -145,8 +162,25 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # orjson when installed, stdlib json otherwise (core/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
+# gzip / brotli for response bodies of at least this many bytes (core/middleware.py)
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv('RESPONSE_COMPRESSION_MIN_BYTES', '1024'))
+
+# CACHES alias for per-(user, concept) mastery snapshots shared between workers
+# (accounts/mastery_cache.py); unset keeps them in-process
+MASTERY_CACHE_ALIAS = os.getenv('MASTERY_CACHE_ALIAS') or None
+
+# Background jobs (accounts/jobs.py): 'thread' runs them on JOB_THREADS threads
+# inside each web process; 'worker' leaves them to `manage.py run_workers`
+JOB_RUNNER = os.getenv('JOB_RUNNER', 'thread')
+JOB_THREADS = int(os.getenv('JOB_THREADS', '2'))
+
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 # JWT settings
@@ -192,6 +226,10 @@ GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY', '')
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
 GROQ_API_KEY = os.getenv('GROQ_API_KEY', '')
 
+# Local fake LLM provider for load/latency testing (`manage.py run_fake_llm`).
+# When set, all Groq and Gemini clients talk to this URL instead of the real APIs.
+FAKE_LLM_URL = os.getenv('FAKE_LLM_URL', '')
+
 
 LOGGING = {
     'version': 1,
@@ -14,11 +14,10 @@
 # ─────────────────────────────────────────────────────────────
 
 import json
-import random
 import re
 from typing import Dict, List, Optional, Tuple, Any
 from django.conf import settings
-from groq import Groq
+from .llm_clients import make_groq_client
 from .models import TeachingAtomState, LearningPhase
 from .knowledge_tracing import calculate_updated_mastery, classify_error_type
 from .pacing_engine import (
@@ -51,10 +50,8 @@ class AdaptiveLearningEngine:
     """
     
     def __init__(self):
-        self.groq_client = None
         groq_key = getattr(settings, 'GROQ_API_KEY', '')
-        if groq_key:
-            self.groq_client = Groq(api_key=groq_key)
+        self.groq_client = make_groq_client(groq_key)
         
         self.pacing_engine = PacingEngine()
 
@@ -89,27 +86,25 @@ class AdaptiveLearningEngine:
         Returns:
             Dict with action, atom info, mastery, phase, message
         """
-        from accounts.models import StudentProgress, TeachingAtom
+        from accounts.mastery_cache import ensure_progress
+        from accounts.models import StudentProgress
 
-        atoms = TeachingAtom.objects.filter(concept=concept).order_by('order')
-        if not atoms.exists():
+        # Cached per-(user, concept) snapshot; rows for unstarted atoms are created
+        mastery = ensure_progress(user, concept.id)
+        if not mastery.atoms:
             return {'action': 'NO_ATOMS', 'message': 'No atoms found for this concept.'}
 
         # ── Build progress map for all atoms ──
         atom_progress_list = []
-        for atom in atoms:
-            progress, created = StudentProgress.objects.get_or_create(
-                user=user, atom=atom,
-                defaults={'mastery_score': 0.0, 'phase': 'not_started'}
-            )
+        for atom in mastery.atoms:
+            state = mastery.get(atom.id)
             atom_progress_list.append({
                 'atom': atom,
-                'progress': progress,
-                'mastery': float(progress.mastery_score),
-                'phase': progress.phase,
-                'streak': progress.streak,
-                'error_history': progress.error_history or [],
-                'times_practiced': progress.times_practiced or 0,
+                'mastery': state.mastery_score,
+                'phase': state.phase,
+                'streak': state.streak,
+                'error_history': list(state.error_history),
+                'times_practiced': state.times_practiced,
             })
 
         # ── Check STOP CONDITION: all atoms mastered ──
@@ -181,37 +176,41 @@ class AdaptiveLearningEngine:
 
         target = candidates[0]
         target_atom = target['atom']
-        target_progress = target['progress']
         target_mastery = target['mastery']
         target_phase = target['phase']
 
         # ── Decide LEARNING ACTION (Phase 2) ──
+        new_phase = None
         if target_mastery < TEACH_THRESHOLD:
             action = 'TEACH'
             if target_phase in ('not_started', 'diagnostic', 'fragile'):
-                target_progress.phase = 'teaching'
-                target_progress.save()
+                new_phase = 'teaching'
             message = f"Let's learn about {target_atom.name}."
 
         elif target_mastery < PRACTICE_THRESHOLD:
             action = 'PRACTICE'
             if target_phase not in ('practice', 'mastery_check'):
-                target_progress.phase = 'practice'
-                target_progress.save()
+                new_phase = 'practice'
             message = f"Let's practice {target_atom.name} to strengthen understanding."
 
         else:
             # Mastery >= 80% — mark complete
             action = 'ADVANCE'
-            target_progress.phase = 'complete'
-            target_progress.save()
+            new_phase = 'complete'
             message = f"{target_atom.name} mastered! Moving to next concept."
 
+        if new_phase is not None:
+            # Only a phase transition needs the row (the save writes through to the snapshot)
+            target_progress = StudentProgress.objects.get(user=user, atom=target_atom)
+            target_progress.phase = new_phase
+            target_progress.save()
+            target_phase = new_phase
+
         return {
             'action': action,
             'atom': target_atom,
             'mastery': round(target_mastery, 4),
-            'phase': target_progress.phase,
+            'phase': target_phase,
             'message': message,
             'all_mastered': False,
             'progress_summary': [
@@ -609,7 +608,8 @@ class AdaptiveLearningEngine:
                       selected_answer: int,
                       time_taken: float,
                       knowledge_level: str,
-                      questions_history: List[Dict]) -> Dict[str, Any]:
+                      questions_history: List[Dict],
+                      explain: bool = True) -> Dict[str, Any]:
         """
         Process a single answer with real-time mastery update and pacing decision
         
@@ -621,6 +621,7 @@ class AdaptiveLearningEngine:
             time_taken: Time taken in seconds
             knowledge_level: Self-reported knowledge level
             questions_history: List of previous questions/answers
+            explain: Include the pacing engine's full reasoning breakdown
         
         Returns:
             Dict with updated state and next actions
@@ -706,15 +707,14 @@ class AdaptiveLearningEngine:
         )
 
         # Get full pacing result (10-feature)
-        pacing_result: PacingResult = self.pacing_engine.decide_pacing(pacing_context)
+        pacing_result: PacingResult = self.pacing_engine.decide_pacing(pacing_context, explain=explain)
         pacing_decision = pacing_result.decision
         next_action = pacing_result.next_action
         reasoning = pacing_result.reasoning
         
-        # Determine next difficulty based on ability and pacing
-        next_difficulty = self.pacing_engine.get_next_difficulty(
-            new_theta, pacing_decision, knowledge_level
-        )
+        # Next difficulty from ability and pacing (already computed by the engine
+        # for the same theta / decision / level)
+        next_difficulty = pacing_result.recommended_difficulty
         
         # Check if atom is complete
         atom_complete = self._check_atom_complete(atom_state, pacing_context)
@@ -795,62 +795,6 @@ class AdaptiveLearningEngine:
         should_exit, reason = self.pacing_engine.should_exit_atom(context)
         return should_exit
     
-    def select_next_questions(self, 
-                             atom_state: TeachingAtomState,
-                             theta: float,
-                             pacing_decision: PacingDecision,
-                             knowledge_level: str,
-                             available_questions: Dict[str, List[Dict]]) -> List[Dict]:
-        """
-        Select next questions based on ability, not fixed counts
-        """
-        selected = []
-        
-        # Determine target difficulty based on theta
-        if theta < -0.3:
-            target_difficulty = 'easy'
-        elif theta < 0.6:
-            target_difficulty = 'medium'
-        else:
-            target_difficulty = 'hard'
-        
-        # Adjust based on pacing
-        if pacing_decision == PacingDecision.SHARP_SLOWDOWN:
-            # Focus on easy questions
-            target_difficulty = 'easy'
-            count = 3
-        elif pacing_decision == PacingDecision.SLOW_DOWN:
-            # Mix of easy and medium
-            easy_count = 2
-            medium_count = 1
-        elif pacing_decision == PacingDecision.STAY:
-            # Mix based on ability
-            if target_difficulty == 'easy':
-                easy_count, medium_count, hard_count = 2, 1, 0
-            elif target_difficulty == 'medium':
-                easy_count, medium_count, hard_count = 1, 2, 0
-            else:  # hard
-                easy_count, medium_count, hard_count = 0, 2, 1
-        else:  # SPEED_UP
-            # Challenge with harder questions
-            if target_difficulty == 'easy':
-                easy_count, medium_count, hard_count = 1, 2, 0
-            elif target_difficulty == 'medium':
-                easy_count, medium_count, hard_count = 0, 2, 1
-            else:  # hard
-                easy_count, medium_count, hard_count = 0, 1, 2
-        
-        # Select questions (up to available)
-        for difficulty, count in [('easy', easy_count), ('medium', medium_count), ('hard', hard_count)]:
-            if count > 0 and difficulty in available_questions:
-                pool = available_questions[difficulty]
-                # Select without replacement
-                to_select = min(count, len(pool))
-                if to_select > 0:
-                    selected.extend(random.sample(pool, to_select))
-        
-        return selected
-    
     def generate_teaching_content(self, atom_name: str, subject: str, 
                                   concept: str, knowledge_level: str,
                                   error_history: List[str] = None,
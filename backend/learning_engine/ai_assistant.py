@@ -3,9 +3,11 @@
 import google.generativeai as genai
 from django.conf import settings
 
+from .llm_clients import configure_generativeai
+
 
 # Configure Gemini
-genai.configure(api_key=settings.GOOGLE_API_KEY)
+configure_generativeai(genai, settings.GOOGLE_API_KEY)
 
 model = genai.GenerativeModel("gemini-3-flash-preview")
 
@@ -5,8 +5,10 @@ import json
 import re
 from datetime import date, timedelta
 
+from .llm_clients import configure_generativeai
+
 # Configure Gemini
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+configure_generativeai(genai, os.getenv("GOOGLE_API_KEY"))
 
 # List available models (for debugging)
 try:
@@ -18,7 +20,7 @@ except Exception as e:
 # Use a valid model - gemini-1.5-flash or gemini-1.5-pro
 model = genai.GenerativeModel("gemini-2.0-flash")  # Changed from gemini-2.5-flash
 
-def generate_subtopics(subject, goal, num_topics=8):
+def generate_subtopics(subject, goal, num_topics=8, timeout=None):
     """
     Generate subtopics for a given subject using Gemini AI
     
@@ -26,6 +28,7 @@ def generate_subtopics(subject, goal, num_topics=8):
         subject: The subject name (e.g., "Mathematics", "Physics")
         goal: The learning goal (e.g., "Exam Preparation", "Regular Study")
         num_topics: Number of topics to generate (default 8)
+        timeout: Seconds before the Gemini request is abandoned (default topics then)
     
     Returns:
         List of subtopics
@@ -51,7 +54,7 @@ def generate_subtopics(subject, goal, num_topics=8):
 
     try:
         print(f"Generating topics for {subject}...")
-        response = model.generate_content(prompt)
+        response = model.generate_content(prompt, request_options={'timeout': timeout} if timeout else None)
         
         # Get the response text
         response_text = response.text
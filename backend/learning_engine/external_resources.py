@@ -1,22 +1,64 @@
 # backend/learning_engine/external_resources.py
+# Videos (YouTube search) and images (SerpAPI) for a concept. Every search is
+# a third-party HTTP round trip, so they run concurrently on a shared pool and
+# a whole lookup is bounded by FETCH_DEADLINE: searches still running then are
+# left to finish in the background and their results dropped. Callers go
+# through accounts/resource_cache.py, which keeps the results.
 
 import os
-import requests
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from youtube_search import YoutubeSearch
 from serpapi import Client  # Changed import
 from django.conf import settings
 import logging
-import json
 
 logger = logging.getLogger(__name__)
 
+FETCH_DEADLINE = 6.0     # seconds for one get_resources_for_concept, all searches together
+FETCH_WORKERS = 8
+GENERAL_SEARCH_HEDGE = 0.5   # of the deadline: priority sites still out then → start the general search
+
+# Priority sites for educational content
+PRIORITY_SITES = [
+    "geeksforgeeks.org",
+    "medium.com",
+    "tutorialspoint.com",
+    "javatpoint.com",
+    "programiz.com",
+    "w3schools.com"
+]
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _executor():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix='resources')
+    return _pool
+
+
+def _answered(future, what):
+    """The search's result if it finished in time without raising, else []."""
+    if not future.done():
+        logger.warning(f"{what} missed the deadline")
+        return []
+    if future.exception() is not None:
+        logger.error(f"{what} failed: {future.exception()}")
+        return []
+    return future.result()
+
+
 class ExternalResourceFetcher:
     """Fetch external learning resources (images, videos) for concepts"""
     
     def __init__(self):
         self.serpapi_key = getattr(settings, 'SERPAPI_KEY', os.getenv('SERPAPI_KEY', ''))
-        self.download_folder = os.path.join(settings.BASE_DIR, 'media', 'concept_images')
-        os.makedirs(self.download_folder, exist_ok=True)
     
     def get_youtube_videos(self, topic, max_results=3):
         """
@@ -50,98 +92,78 @@ class ExternalResourceFetcher:
             logger.error(f"Error in get_youtube_videos: {e}")
             return []
     
-    def get_images(self, query, max_images=3):
+    def _search_images(self, params):
+        """One SerpAPI google_images request; its images_results (or [])."""
+        result = Client(api_key=self.serpapi_key).search({**params, "engine": "google_images", "ijn": 0,
+                                                          "api_key": self.serpapi_key})
+        if hasattr(result, 'get') and result.get('images_results'):
+            return result['images_results']
+        return []
+
+    def get_images(self, query, max_images=3, deadline=FETCH_DEADLINE):
         """
-        Fetch relevant images/diagrams for a concept using SerpAPI
+        Fetch relevant images/diagrams for a concept using SerpAPI.
+        The priority-site queries run concurrently. The general search (one
+        more paid call) only starts once they can't fill max_images: a site
+        answered with nothing, or some are still out at GENERAL_SEARCH_HEDGE
+        of the deadline. Whatever has answered after `deadline` seconds is used.
         """
         if not self.serpapi_key:
             logger.warning("SERPAPI_KEY not set, skipping image fetch")
             return self.get_fallback_images(query, max_images)
-        
+
         try:
-            # Priority sites for educational content
-            priority_sites = [
-                "geeksforgeeks.org",
-                "medium.com",
-                "tutorialspoint.com",
-                "javatpoint.com",
-                "programiz.com",
-                "w3schools.com"
+            pool = _executor()
+            started = time.monotonic()
+            give_up_at, hedge_at = started + deadline, started + deadline * GENERAL_SEARCH_HEDGE
+            site_searches = [
+                (site, pool.submit(self._search_images, {"q": f"{query} diagram OR illustration site:{site}", "num": 1}))
+                for site in PRIORITY_SITES[:max_images]
             ]
-            
+            general_search = None
+            while True:
+                now = time.monotonic()
+                outstanding = [f for _, f in site_searches if not f.done()]
+                missed = any(f.done() and (f.exception() is not None or not f.result()) for _, f in site_searches)
+                if general_search is None and (missed or (outstanding and now >= hedge_at)):
+                    general_search = pool.submit(self._search_images,
+                                                 {"q": f"{query} educational diagram", "num": max_images})
+                if general_search is not None and not general_search.done():
+                    outstanding.append(general_search)
+                if not outstanding or now >= give_up_at:
+                    break
+                wake_at = hedge_at if general_search is None and now < hedge_at else give_up_at
+                wait(outstanding, timeout=wake_at - now, return_when=FIRST_COMPLETED)
+
             image_urls = []
-            
-            # First try to get images from priority sites
-            for site in priority_sites[:max_images]:
+            # Priority sites first, in order
+            for site, search in site_searches:
+                images = _answered(search, f"image search on {site}")
+                if images:
+                    image_urls.append({
+                        'url': images[0].get('original', ''),
+                        'title': images[0].get('title', ''),
+                        'source': site,
+                        'thumbnail': images[0].get('thumbnail', '')
+                    })
+
+            # Then fill up from the general search
+            for img in _answered(general_search, "general image search") if general_search else ():
                 if len(image_urls) >= max_images:
                     break
-                
-                try:
-                    # Using the Client approach for serpapi
-                    client = Client(api_key=self.serpapi_key)
-                    
-                    full_query = f"{query} diagram OR illustration site:{site}"
-                    
-                    # Create params for image search
-                    params = {
-                        "engine": "google_images",
-                        "q": full_query,
-                        "num": 1,
-                        "ijn": 0,
-                        "api_key": self.serpapi_key
-                    }
-                    
-                    # Make the request
-                    result = client.search(params)
-                    
-                    if hasattr(result, 'get') and result.get('images_results'):
-                        images = result['images_results']
-                        if images and len(images) > 0:
-                            image_urls.append({
-                                'url': images[0].get('original', ''),
-                                'title': images[0].get('title', ''),
-                                'source': site,
-                                'thumbnail': images[0].get('thumbnail', '')
-                            })
-                            logger.info(f"Found image from {site}")
-                except Exception as e:
-                    logger.error(f"Error fetching image from {site}: {e}")
-                    continue
-            
-            # If we still need more images, do a general search
-            if len(image_urls) < max_images:
-                try:
-                    client = Client(api_key=self.serpapi_key)
-                    params = {
-                        "engine": "google_images",
-                        "q": f"{query} educational diagram",
-                        "num": max_images - len(image_urls),
-                        "ijn": 0,
-                        "api_key": self.serpapi_key
-                    }
-                    
-                    result = client.search(params)
-                    
-                    if hasattr(result, 'get') and result.get('images_results'):
-                        images = result['images_results']
-                        for img in images:
-                            if len(image_urls) >= max_images:
-                                break
-                            image_urls.append({
-                                'url': img.get('original', ''),
-                                'title': img.get('title', ''),
-                                'source': img.get('source', ''),
-                                'thumbnail': img.get('thumbnail', '')
-                            })
-                except Exception as e:
-                    logger.error(f"Error in general image search: {e}")
-            
+                image_urls.append({
+                    'url': img.get('original', ''),
+                    'title': img.get('title', ''),
+                    'source': img.get('source', ''),
+                    'thumbnail': img.get('thumbnail', '')
+                })
+
             return image_urls
-            
+
         except Exception as e:
             logger.error(f"Error in get_images: {e}")
             return self.get_fallback_images(query, max_images)
-    
+
     def get_fallback_images(self, query, max_images=3):
         """Provide fallback placeholder images when API fails"""
         fallback_images = []
@@ -154,9 +176,10 @@ class ExternalResourceFetcher:
             })
         return fallback_images
     
-    def get_resources_for_concept(self, subject, concept, atom_name=None):
+    def get_resources_for_concept(self, subject, concept, atom_name=None, deadline=FETCH_DEADLINE):
         """
-        Get both videos and images for a concept
+        Get both videos and images for a concept, searched concurrently and
+        within `deadline` seconds overall (fallback query included).
         """
         # Create search queries
         if atom_name:
@@ -165,30 +188,26 @@ class ExternalResourceFetcher:
         else:
             main_query = f"{subject} {concept}"
             specific_query = concept
-        
-        # Fetch resources with error handling
-        videos = []
-        images = []
-        
-        try:
-            videos = self.get_youtube_videos(main_query, max_results=2)
-        except Exception as e:
-            logger.error(f"Error fetching videos: {e}")
-        
-        try:
-            images = self.get_images(main_query, max_images=3)
-        except Exception as e:
-            logger.error(f"Error fetching images: {e}")
-        
+
+        give_up_at = time.monotonic() + deadline
+        videos, images = self._search(main_query, give_up_at)
+
         # If no results, try more specific query
-        if not videos and not images:
-            try:
-                videos = self.get_youtube_videos(specific_query, max_results=2)
-                images = self.get_images(specific_query, max_images=3)
-            except Exception as e:
-                logger.error(f"Error in fallback search: {e}")
-        
+        if not videos and not images and time.monotonic() < give_up_at:
+            videos, images = self._search(specific_query, give_up_at)
+
         return {
             'videos': videos,
             'images': images
-        }
\ No newline at end of file
+        }
+
+    def _search(self, query, give_up_at):
+        """Videos and images for one query, the YouTube search running next to the image searches."""
+        video_search = _executor().submit(self.get_youtube_videos, query, max_results=2)
+        images = []
+        try:
+            images = self.get_images(query, max_images=3, deadline=max(give_up_at - time.monotonic(), 0))
+        except Exception as e:
+            logger.error(f"Error fetching images: {e}")
+        wait([video_search], timeout=max(give_up_at - time.monotonic(), 0))
+        return _answered(video_search, "YouTube search"), images
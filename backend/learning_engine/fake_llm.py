@@ -0,0 +1,418 @@
+# backend/learning_engine/fake_llm.py
+# Local fake LLM provider for offline load / latency testing.
+# Emulates the two HTTP APIs the app talks to:
+#   - Groq chat completions     POST /openai/v1/chat/completions  (stream or not)
+#   - Gemini generateContent    POST /v1beta/models/<model>:generateContent
+#                               POST /v1beta/models/<model>:streamGenerateContent
+# Response bodies are shaped after the prompt (questions, atoms, teaching content,
+# overview, summary, JSON string arrays, plain text) so callers exercise their real
+# parse/validate/persist path. Latency, token streaming and error injection are
+# configurable and seeded, so runs are reproducible.
+#
+# Point the app at it with FAKE_LLM_URL=http://127.0.0.1:8765 and start it with
+# `python manage.py run_fake_llm`.
+
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+
+# ════════════════════════════════════════════════════════════════
+#  CONFIGURATION
+# ════════════════════════════════════════════════════════════════
+
+LATENCY_DISTRIBUTIONS = ('constant', 'uniform', 'normal', 'lognormal')
+
+
+@dataclass
+class FakeLLMConfig:
+    """
+    Knobs for the fake provider.
+
+    latency: '<dist>:<params>' in milliseconds, one of
+        constant:<ms> | uniform:<lo>,<hi> | normal:<mean>,<sd> | lognormal:<median>,<sigma>
+    token_delay_ms: delay between streamed chunks.
+    error_rate: probability a request fails with one of error_codes.
+    malformed_rate: probability a 200 response carries unparseable content
+        (exercises the callers' fallback path).
+    """
+    latency: str = 'lognormal:600,0.5'
+    token_delay_ms: float = 15.0
+    error_rate: float = 0.0
+    error_codes: List[int] = field(default_factory=lambda: [429, 500, 503])
+    malformed_rate: float = 0.0
+    seed: int = 42
+
+
+def parse_latency(spec: str) -> Tuple[str, List[float]]:
+    """Parse a latency spec like 'lognormal:600,0.5' into (dist, params)."""
+    dist, _, raw = (spec or 'constant:0').partition(':')
+    dist = dist.strip().lower()
+    if dist not in LATENCY_DISTRIBUTIONS:
+        raise ValueError(f"Unknown latency distribution '{dist}' (use one of {', '.join(LATENCY_DISTRIBUTIONS)})")
+    params = [float(p) for p in raw.split(',') if p.strip()] if raw else []
+    needed = {'constant': 1, 'uniform': 2, 'normal': 2, 'lognormal': 2}[dist]
+    if len(params) != needed:
+        raise ValueError(f"Latency '{dist}' needs {needed} parameter(s), got {len(params)}")
+    return dist, params
+
+
+class _Sampler:
+    """Thread-safe seeded sampler for latency and fault injection."""
+
+    def __init__(self, config: FakeLLMConfig):
+        self.config = config
+        self.dist, self.params = parse_latency(config.latency)
+        self._rng = random.Random(config.seed)
+        self._lock = threading.Lock()
+
+    def latency_seconds(self) -> float:
+        with self._lock:
+            if self.dist == 'constant':
+                ms = self.params[0]
+            elif self.dist == 'uniform':
+                ms = self._rng.uniform(self.params[0], self.params[1])
+            elif self.dist == 'normal':
+                ms = self._rng.gauss(self.params[0], self.params[1])
+            else:
+                ms = self.params[0] * math.exp(self._rng.gauss(0.0, self.params[1]))
+        return max(ms, 0.0) / 1000.0
+
+    def injected_error(self) -> Optional[int]:
+        with self._lock:
+            if self.config.error_codes and self._rng.random() < self.config.error_rate:
+                return self._rng.choice(self.config.error_codes)
+        return None
+
+    def malformed(self) -> bool:
+        with self._lock:
+            return self._rng.random() < self.config.malformed_rate
+
+
+# ════════════════════════════════════════════════════════════════
+#  CONTENT SYNTHESIS (prompt → schema-valid body)
+# ════════════════════════════════════════════════════════════════
+
+def _field(prompt: str, label: str, default: str) -> str:
+    match = re.search(rf'^\s*{label}:\s*(.+?)\s*$', prompt, re.MULTILINE)
+    return match.group(1).strip() if match else default
+
+
+def _question_counts(prompt: str) -> Dict[str, int]:
+    """Work out how many questions of each difficulty the prompt asks for."""
+    counts = {}
+    for label in ('easy', 'medium', 'hard'):
+        match = re.search(rf'^\s*{label.capitalize()} \((\d+)\):', prompt, re.MULTILINE)
+        if match:
+            counts[label] = int(match.group(1))
+    if counts:
+        return counts
+    match = re.search(r'Generate EXACTLY (\d+) (easy|medium|hard)', prompt)
+    if match:
+        return {match.group(2): int(match.group(1))}
+    match = re.search(r'EXACTLY (\d+)', prompt)
+    return {'medium': int(match.group(1)) if match else 3}
+
+
+def _questions(prompt: str, rng: random.Random) -> Dict:
+    atom = _field(prompt, 'Atomic Concept', _field(prompt, 'Concept', 'the topic'))
+    ops = {'easy': ['recall', 'apply'], 'medium': ['apply', 'analyze'], 'hard': ['analyze', 'apply']}
+    times = {'easy': 40, 'medium': 60, 'hard': 90}
+    questions = []
+    for difficulty, count in _question_counts(prompt).items():
+        for i in range(count):
+            questions.append({
+                'difficulty': difficulty,
+                'cognitive_operation': rng.choice(ops[difficulty]),
+                'estimated_time': times[difficulty],
+                'question': (
+                    f"A student applies {atom} in scenario {i + 1} and observes an unexpected result; "
+                    f"which explanation best accounts for what happened at {difficulty} depth?"
+                ),
+                'options': [f"{atom} explanation {chr(65 + k)} ({difficulty} #{i + 1})" for k in range(4)],
+                'correct_index': rng.randrange(4),
+            })
+    return {'questions': questions}
+
+
+def _atoms(prompt: str, rng: random.Random) -> Dict:
+    concept = _field(prompt, 'Concept', 'Concept')
+    parts = ['Foundations', 'Core Structure', 'Key Operations', 'Common Patterns', 'Applications', 'Limitations']
+    return {'atoms': [f"{concept} {p}" for p in parts[:rng.randint(4, 6)]]}
+
+
+def _teaching(prompt: str, rng: random.Random) -> Dict:
+    atom = _field(prompt, 'Atomic Concept', 'this idea')
+    return {
+        'explanation': f"1. {atom} breaks a problem into smaller parts.\n2. Each part follows a simple rule.\n3. Combining the parts gives the full result.",
+        'example': f"When organising a library, {atom} decides where each book goes.",
+        'analogy': f"{atom} is like sorting laundry before washing it.",
+        'misconception': f"Students often think {atom} applies everywhere; it only helps when its preconditions hold.",
+        'practical_application': f"Engineers rely on {atom} to keep large systems predictable.",
+    }
+
+
+def _overview(prompt: str, rng: random.Random) -> Dict:
+    concept = _field(prompt, 'Concept', 'This concept')
+    atoms = re.findall(r'^\s+\d+\.\s+(.+)$', prompt, re.MULTILINE)
+    return {
+        'overview': f"{concept} is about understanding how a few simple ideas fit together.",
+        'why_it_matters': f"{concept} shows up in everyday tools and in later topics.",
+        'what_you_will_learn': [f"You will learn how {a} works in practice" for a in atoms],
+        'key_terms': [{'term': a, 'simple_definition': f"A building block of {concept}."} for a in atoms[:4]],
+        'encouragement': "Take it one step at a time — you've got this!",
+    }
+
+
+def _summary(prompt: str, rng: random.Random) -> Dict:
+    atom = _field(prompt, 'Atom', 'this atom')
+    return {
+        'summary': f"{atom} is a core building block; remember its rule and when it applies.",
+        'quick_notes': [f"{atom} has one central rule", "Check preconditions first", "Practice with small examples"],
+        'must_remember': [f"The definition of {atom}", "Where it is used"],
+        'common_pitfalls': [f"Applying {atom} when its preconditions do not hold"],
+        'suggestions': ["Review one worked example", "Move on to the next atom"],
+        'confidence_boost': "Nice work — keep going!",
+    }
+
+
+def _string_array(prompt: str, rng: random.Random) -> List[str]:
+    match = (re.search(r'[Gg]enerate exactly (\d+)', prompt)
+             or re.search(r'(?:List|Suggest|into) (\d+)', prompt))
+    count = int(match.group(1)) if match else 8
+    subject = re.search(r'"([^"]+)"', prompt)
+    base = subject.group(1) if subject else 'Topic'
+    return [f"{base} Topic {i + 1}" for i in range(count)]
+
+
+def _plain_text(prompt: str, rng: random.Random) -> str:
+    topic = _field(prompt, 'Topic', 'this topic')
+    return (f"Here is a short explanation of {topic}. Start from the basic rule, work through one example, "
+            f"and check each step. Once that feels natural, try a slightly harder variation.")
+
+
+def synthesize(prompt: str) -> str:
+    """Return response text for a prompt. Deterministic for a given prompt."""
+    rng = random.Random(int(hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:12], 16))
+    if '"questions"' in prompt:
+        body = _questions(prompt, rng)
+    elif '"atoms"' in prompt:
+        body = _atoms(prompt, rng)
+    elif '"explanation"' in prompt and '"analogy"' in prompt:
+        body = _teaching(prompt, rng)
+    elif '"overview"' in prompt:
+        body = _overview(prompt, rng)
+    elif '"quick_notes"' in prompt:
+        body = _summary(prompt, rng)
+    elif 'JSON array' in prompt:
+        body = _string_array(prompt, rng)
+    else:
+        return _plain_text(prompt, rng)
+    return json.dumps(body)
+
+
+def _chunks(text: str, size: int = 16) -> List[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)] or ['']
+
+
+def _token_count(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+# ════════════════════════════════════════════════════════════════
+#  HTTP HANDLER
+# ════════════════════════════════════════════════════════════════
+
+_GEMINI_PATH = re.compile(r'^/v1(?:beta)?/models/(?P<model>[^:/]+):(?P<method>generateContent|streamGenerateContent)$')
+_GEMINI_STATUS = {429: 'RESOURCE_EXHAUSTED', 500: 'INTERNAL', 503: 'UNAVAILABLE'}
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    server_version = 'FakeLLM/1.0'
+    protocol_version = 'HTTP/1.1'
+
+    # Set per server instance in make_server()
+    sampler: _Sampler = None
+
+    def log_message(self, format, *args):  # keep load-test output clean
+        pass
+
+    # ── plumbing ──
+
+    def _read_json(self) -> Dict:
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return {}
+
+    def _send_json(self, status: int, payload) -> None:
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if status == 429:
+            self.send_header('Retry-After', '0')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _start_sse(self) -> None:
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+    def _send_event(self, data: str) -> None:
+        self.wfile.write(f"data: {data}\n\n".encode('utf-8'))
+        self.wfile.flush()
+
+    def _stream(self, pieces: List[str]) -> None:
+        delay = self.sampler.config.token_delay_ms / 1000.0
+        for i, piece in enumerate(pieces):
+            if i and delay:
+                time.sleep(delay)
+            self._send_event(piece)
+
+    def _prepare(self, prompt: str) -> Tuple[Optional[int], str]:
+        """Sleep for the sampled latency and decide the outcome."""
+        time.sleep(self.sampler.latency_seconds())
+        error = self.sampler.injected_error()
+        if error:
+            return error, ''
+        text = synthesize(prompt)
+        if self.sampler.malformed():
+            text = text[: max(1, len(text) // 2)]
+        return None, text
+
+    # ── routes ──
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path in ('/', '/healthz'):
+            self._send_json(200, {'status': 'ok'})
+        elif path in ('/v1beta/models', '/v1/models'):
+            self._send_json(200, {'models': [{
+                'name': f'models/{m}',
+                'supportedGenerationMethods': ['generateContent', 'streamGenerateContent'],
+            } for m in ('gemini-2.0-flash', 'gemini-2.5-flash', 'gemini-3-flash-preview')]})
+        else:
+            self._send_json(404, {'error': {'message': f'Unknown path {path}'}})
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        if path == '/openai/v1/chat/completions':
+            return self._groq_chat()
+        match = _GEMINI_PATH.match(path)
+        if match:
+            return self._gemini_generate(match.group('model'), match.group('method') == 'streamGenerateContent')
+        self._send_json(404, {'error': {'message': f'Unknown path {path}'}})
+
+    def _groq_chat(self):
+        req = self._read_json()
+        model = req.get('model', 'llama-3.3-70b-versatile')
+        prompt = '\n'.join(str(m.get('content', '')) for m in req.get('messages', []))
+        error, text = self._prepare(prompt)
+        if error:
+            return self._send_json(error, {'error': {
+                'message': f'Injected fake error {error}',
+                'type': 'rate_limit_exceeded' if error == 429 else 'internal_server_error',
+            }})
+
+        completion_id = f"chatcmpl-{hashlib.md5(f'{prompt}{time.time()}'.encode()).hexdigest()[:24]}"
+        created = int(time.time())
+        usage = {
+            'prompt_tokens': _token_count(prompt),
+            'completion_tokens': _token_count(text),
+            'total_tokens': _token_count(prompt) + _token_count(text),
+        }
+
+        if not req.get('stream'):
+            return self._send_json(200, {
+                'id': completion_id, 'object': 'chat.completion', 'created': created, 'model': model,
+                'system_fingerprint': 'fp_fake',
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text},
+                             'logprobs': None, 'finish_reason': 'stop'}],
+                'usage': usage,
+            })
+
+        def chunk(delta, finish=None):
+            return json.dumps({
+                'id': completion_id, 'object': 'chat.completion.chunk', 'created': created, 'model': model,
+                'system_fingerprint': 'fp_fake',
+                'choices': [{'index': 0, 'delta': delta, 'logprobs': None, 'finish_reason': finish}],
+            })
+
+        pieces = [chunk({'role': 'assistant', 'content': ''})]
+        pieces += [chunk({'content': c}) for c in _chunks(text)]
+        pieces += [chunk({}, 'stop'), '[DONE]']
+        self._start_sse()
+        self._stream(pieces)
+
+    def _gemini_generate(self, model: str, stream: bool):
+        req = self._read_json()
+        prompt = '\n'.join(
+            str(part.get('text', ''))
+            for content in req.get('contents', [])
+            for part in (content.get('parts', []) if isinstance(content, dict) else [])
+        )
+        error, text = self._prepare(prompt)
+        if error:
+            return self._send_json(error, {'error': {
+                'code': error, 'message': f'Injected fake error {error}',
+                'status': _GEMINI_STATUS.get(error, 'INTERNAL'),
+            }})
+
+        def response(piece, finish=None):
+            candidate = {'content': {'parts': [{'text': piece}], 'role': 'model'}, 'index': 0}
+            if finish:
+                candidate['finishReason'] = finish
+            return {
+                'candidates': [candidate],
+                'usageMetadata': {
+                    'promptTokenCount': _token_count(prompt),
+                    'candidatesTokenCount': _token_count(text),
+                    'totalTokenCount': _token_count(prompt) + _token_count(text),
+                },
+                'modelVersion': model,
+            }
+
+        if not stream:
+            return self._send_json(200, response(text, 'STOP'))
+
+        chunks = _chunks(text)
+        pieces = [json.dumps(response(c, 'STOP' if i == len(chunks) - 1 else None)) for i, c in enumerate(chunks)]
+        self._start_sse()
+        self._stream(pieces)
+
+
+# ════════════════════════════════════════════════════════════════
+#  SERVER LIFECYCLE
+# ════════════════════════════════════════════════════════════════
+
+def make_server(config: Optional[FakeLLMConfig] = None, host: str = '127.0.0.1', port: int = 8765) -> ThreadingHTTPServer:
+    """Build (but do not start) a fake provider server. Use port=0 for an ephemeral port."""
+    handler = type('BoundFakeLLMHandler', (FakeLLMHandler,), {'sampler': _Sampler(config or FakeLLMConfig())})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_thread(config: Optional[FakeLLMConfig] = None, host: str = '127.0.0.1', port: int = 0):
+    """Start a server on a daemon thread. Returns (server, base_url); call server.shutdown() to stop."""
+    server = make_server(config, host, port)
+    thread = threading.Thread(target=server.serve_forever, name='fake-llm', daemon=True)
+    thread.start()
+    bound_host, bound_port = server.server_address[:2]
+    return server, f'http://{bound_host}:{bound_port}'
@@ -0,0 +1,127 @@
+# backend/learning_engine/item_selection.py
+# Maximum-information item selection (computerized adaptive testing).
+# A 2PL item's Fisher information a²·p·(1-p) peaks where theta = b, so items are
+# kept sorted by b and a selection only scores a small window around theta:
+# O(log n) to locate, O(window) to score, whatever the bank size.
+#   - exposure control: "randomesque" — pick at random among the top few items,
+#     and skip items already served more than MAX_EXPOSURE_RATE of the time
+#   - content balancing: serve the cognitive operation furthest below its share
+# Pools are cached and shared across request threads (accounts/question_bank.py):
+# a selection and the exposure counts it reads and bumps happen under the pool's lock.
+
+import bisect
+import math
+import random
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+RANDOMESQUE = 3            # pick among this many most informative candidates
+WINDOW = 24                # candidates scored around theta per selection
+MAX_EXPOSURE_RATE = 0.35   # share of selections one item may take (once the pool is warm)
+MIN_SELECTIONS_FOR_EXPOSURE = 20
+TARGET_SE = 0.4            # theta standard error at which the estimate counts as settled
+
+
+def fisher_information(theta: float, a: float, b: float) -> float:
+    p = 1 / (1 + math.exp(-max(-30.0, min(30.0, a * (theta - b)))))
+    return a * a * p * (1 - p)
+
+
+class ItemPool:
+    """
+    Items of one pool (e.g. an atom's servable questions) sorted by difficulty b.
+
+    items: (key, a, b, content) tuples; content is the balancing category
+    (cognitive operation) and payload-free so a pool is cheap to cache.
+    """
+
+    def __init__(self, items: Iterable[Tuple[Any, float, float, str]]):
+        self.items = sorted(items, key=lambda item: item[2])
+        self.bs = [item[2] for item in self.items]
+        self.content_of = {item[0]: item[3] for item in self.items}
+        self.contents = Counter(self.content_of.values())
+        self.exposures: Counter = Counter()
+        self.selections = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.items)
+
+    def _window(self, theta: float, allowed) -> List[Tuple[Any, float, float, str]]:
+        """Up to WINDOW allowed items closest to theta in b, walking outward from bisect."""
+        right = bisect.bisect_left(self.bs, theta)
+        left = right - 1
+        found = []
+        while len(found) < WINDOW and (left >= 0 or right < len(self.items)):
+            take_right = left < 0 or (right < len(self.items) and self.bs[right] - theta <= theta - self.bs[left])
+            if take_right:
+                item, right = self.items[right], right + 1
+            else:
+                item, left = self.items[left], left - 1
+            if allowed(item):
+                found.append(item)
+        return found
+
+    def _content_target(self, served: Counter) -> Optional[str]:
+        """Category furthest below its share of the pool, given what was served so far."""
+        total = sum(served.values()) + 1
+        gaps = {c: n / len(self.items) - served.get(c, 0) / total for c, n in self.contents.items()}
+        return max(sorted(gaps), key=gaps.get) if gaps else None
+
+    def select(self, theta: float, exclude: Iterable = (), served_content: Optional[Counter] = None,
+               content: Optional[Sequence[str]] = None, rng=random) -> Optional[Tuple[Any, float]]:
+        """
+        Next item for ability theta: (key, information), or None if nothing is left.
+
+        exclude: keys already answered / served. served_content: categories served
+        so far in this sitting (for balancing). content: restrict to these categories.
+        """
+        excluded = set(exclude)
+        target = self._content_target(served_content or Counter())
+        preferred = [target] if target and (content is None or target in content) else content
+        with self._lock:
+            return self._select(theta, excluded, preferred, content, rng)
+
+    def _select(self, theta, excluded, preferred, content, rng) -> Optional[Tuple[Any, float]]:
+        limit = MAX_EXPOSURE_RATE * self.selections if self.selections >= MIN_SELECTIONS_FOR_EXPOSURE else None
+
+        def allowed_in(categories, exposure_control):
+            def allowed(item):
+                if item[0] in excluded or (categories is not None and item[3] not in categories):
+                    return False
+                return not (exposure_control and limit is not None and self.exposures[item[0]] > limit)
+            return allowed
+
+        for categories, exposure_control in [(preferred, True), (content, True), (content, False)]:
+            window = self._window(theta, allowed_in(categories, exposure_control))
+            if window:
+                break
+        else:
+            return None
+
+        scored = sorted(((fisher_information(theta, a, b), key) for key, a, b, _ in window), reverse=True)
+        info, key = rng.choice(scored[:RANDOMESQUE])
+        self.exposures[key] += 1
+        self.selections += 1
+        return key, info
+
+
+def theta_standard_error(theta: float, items: Iterable[Tuple[float, float]]) -> Optional[float]:
+    """SE of an ability estimate after answering items [(a, b), ...]: 1 / sqrt(test information)."""
+    information = sum(fisher_information(theta, a, b) for a, b in items)
+    return 1 / math.sqrt(information) if information > 0 else None
+
+
+def select_items(theta: float, pool: ItemPool, n: int, exclude: Iterable = (),
+                 content: Optional[Sequence[str]] = None, rng=random) -> List[Tuple[Any, float]]:
+    """n items for one sitting, content-balanced among themselves."""
+    chosen, served, skip = [], Counter(), set(exclude)
+    for _ in range(n):
+        picked = pool.select(theta, skip, served, content, rng)
+        if picked is None:
+            break
+        chosen.append(picked)
+        skip.add(picked[0])
+        served[pool.content_of[picked[0]]] += 1
+    return chosen
@@ -237,6 +237,34 @@ import math
 import numpy as np
 from typing import Dict, Any, Optional, Tuple
 
+# IRT item parameters implied by a question's labels. Used as priors for items that
+# have not been calibrated from responses yet (see accounts/item_params.py).
+ITEM_DIFFICULTY_PRIORS = {
+    'easy': -1.0,
+    'medium': 0.0,
+    'hard': 1.0
+}
+ITEM_DISCRIMINATION_PRIORS = {
+    'recall': 0.8,
+    'apply': 1.2,
+    'analyze': 1.5
+}
+
+
+def item_parameters(question: Dict[str, Any]) -> Tuple[float, float]:
+    """
+    (a, b) for a question: calibrated 'irt_a' / 'irt_b' when present,
+    otherwise the priors for its cognitive operation and difficulty.
+    """
+    a = question.get('irt_a')
+    b = question.get('irt_b')
+    if a is None:
+        a = ITEM_DISCRIMINATION_PRIORS.get(question.get('cognitive_operation', 'recall'), 1.0)
+    if b is None:
+        b = ITEM_DIFFICULTY_PRIORS.get(question.get('difficulty', 'medium'), 0.0)
+    return float(a), float(b)
+
+
 def calculate_updated_mastery(
     current_mastery: float,
     current_theta: float,
@@ -252,6 +280,7 @@ def calculate_updated_mastery(
         current_mastery: Current mastery score (0-1)
         current_theta: Current ability parameter
         question: Question dictionary with difficulty, estimated_time
+                  (and calibrated irt_a / irt_b when known)
         correct: Whether answer was correct
         time_taken: Time taken in seconds
         error_type: Classified error type or None if correct
@@ -262,23 +291,9 @@ def calculate_updated_mastery(
     # Extract question parameters
     difficulty = question.get('difficulty', 'medium')
     estimated_time = question.get('estimated_time', 60)
-    cognitive = question.get('cognitive_operation', 'recall')
-    
-    # Map difficulty to item parameter b (IRT difficulty)
-    difficulty_map = {
-        'easy': -1.0,
-        'medium': 0.0,
-        'hard': 1.0
-    }
-    b = difficulty_map.get(difficulty, 0.0)
     
-    # Map cognitive to discrimination a (IRT discrimination)
-    cognitive_map = {
-        'recall': 0.8,
-        'apply': 1.2,
-        'analyze': 1.5
-    }
-    a = cognitive_map.get(cognitive, 1.0)
+    # IRT discrimination a and difficulty b (calibrated, or label priors)
+    a, b = item_parameters(question)
     
     # Calculate time ratio (normalized)
     time_ratio = time_taken / estimated_time if estimated_time > 0 else 1.0
@@ -0,0 +1,50 @@
+# backend/learning_engine/llm_clients.py
+# Single place where the Groq / Gemini SDK clients are constructed.
+# When settings.FAKE_LLM_URL is set, every client is pointed at the local fake
+# provider (learning_engine/fake_llm.py) instead of the real APIs, so load tests
+# run the real parse/validate/persist code without network or API spend.
+
+from django.conf import settings
+
+# Any non-empty key works against the fake provider
+FAKE_API_KEY = 'fake-llm-key'
+
+
+def fake_llm_url() -> str:
+    return (getattr(settings, 'FAKE_LLM_URL', '') or '').rstrip('/')
+
+
+def make_groq_client(api_key):
+    """Return a Groq client, or None when there is no key and no fake provider."""
+    from groq import Groq
+
+    url = fake_llm_url()
+    if url:
+        return Groq(api_key=api_key or FAKE_API_KEY, base_url=url)
+    return Groq(api_key=api_key) if api_key else None
+
+
+def make_genai_client(api_key):
+    """Return a google.genai Client, or None when there is no key and no fake provider."""
+    from google import genai
+
+    url = fake_llm_url()
+    if url:
+        return genai.Client(
+            api_key=api_key or FAKE_API_KEY,
+            http_options=genai.types.HttpOptions(base_url=url),
+        )
+    return genai.Client(api_key=api_key) if api_key else None
+
+
+def configure_generativeai(genai_module, api_key):
+    """Configure the legacy google.generativeai module (REST transport when faked)."""
+    url = fake_llm_url()
+    if url:
+        genai_module.configure(
+            api_key=api_key or FAKE_API_KEY,
+            transport='rest',
+            client_options={'api_endpoint': url},
+        )
+    else:
+        genai_module.configure(api_key=api_key)
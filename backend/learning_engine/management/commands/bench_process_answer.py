@@ -0,0 +1,132 @@
+import dataclasses
+import gc
+import sys
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from learning_engine.adaptive_flow import AdaptiveLearningEngine
+from learning_engine.models import TeachingAtomState
+from learning_engine.pacing_engine import PacingContext, PacingResult
+
+QUESTION = {
+    'id': 1, 'difficulty': 'medium', 'cognitive_operation': 'apply', 'estimated_time': 45,
+    'question': 'Which structure serves requests in arrival order?',
+    'options': ['Stack', 'Queue', 'Heap', 'Tree'], 'correct_index': 1,
+}
+
+
+def _history(n):
+    return [{'correct': i % 3 != 0, 'time_taken': 20 + i % 7, 'error_type': None if i % 3 else 'factual'}
+            for i in range(n)]
+
+
+def _atom_state():
+    # What SubmitAtomAnswerView builds from a StudentProgress row on every answer
+    return TeachingAtomState(id=1, name='FIFO', mastery_score=0.55, phase='practice', streak=2, hint_usage=1,
+                             error_history=['factual', 'procedural', 'factual'])
+
+
+def _dict_backed(cls):
+    """Same fields as a slotted dataclass, but a regular (__dict__) dataclass — the old layout."""
+    fields = [(f.name, f.type, dataclasses.field(default=f.default, default_factory=f.default_factory))
+              for f in dataclasses.fields(cls)]
+    return dataclasses.make_dataclass(f'{cls.__name__}Dict', fields)
+
+
+def _instance_bytes(obj):
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def _layout_rows(engine):
+    result = engine.pacing_engine.decide_pacing(_context())
+    samples = {
+        'TeachingAtomState': _atom_state(),
+        'PacingContext': _context(),
+        'PacingResult': result,
+    }
+    rows = []
+    for name, obj in samples.items():
+        values = {f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)}
+        legacy = _dict_backed(type(obj))(**values)
+        rows.append((name, _instance_bytes(legacy), _instance_bytes(obj)))
+    return rows
+
+
+def _context():
+    return PacingContext(accuracy=0.6, mastery_score=0.55, streak=2, error_types=['factual'], theta=0.3,
+                         questions_answered=12, knowledge_level='intermediate', phase='practice',
+                         avg_response_time=25, expected_response_time=45,
+                         time_per_question_history=[20.0 + i for i in range(12)],
+                         recent_accuracy_trend=[1.0, 0.0, 1.0, 1.0], recent_response_times=[22.0, 31.0, 18.0])
+
+
+def measure(engine, explain, iterations, history_len):
+    history = _history(history_len)
+
+    def one():
+        return engine.process_answer(atom_state=_atom_state(), theta=0.3, question=QUESTION, selected_answer=1,
+                                     time_taken=25.0, knowledge_level='intermediate', questions_history=history,
+                                     explain=explain)
+
+    for _ in range(50):
+        one()
+
+    gc.collect()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        one()
+    per_answer_us = (time.perf_counter() - started) / iterations * 1e6
+
+    # Allocation profile: blocks / bytes still referenced by the results, and the
+    # transient peak of a single call
+    sample = max(1, min(iterations, 200))
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.take_snapshot()
+    kept = [one() for _ in range(sample)]
+    stats = tracemalloc.take_snapshot().compare_to(base, 'filename')
+    tracemalloc.reset_peak()
+    current, _ = tracemalloc.get_traced_memory()
+    one()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+
+    return {
+        'mode': 'explain' if explain else 'lean',
+        'us_per_answer': per_answer_us,
+        'blocks_per_answer': sum(s.count_diff for s in stats) / sample,
+        'bytes_per_answer': sum(s.size_diff for s in stats) / sample,
+        'peak_bytes': peak - current,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Micro-benchmark AdaptiveLearningEngine.process_answer (the per-answer path of "
+        "SubmitAtomAnswerView): time and allocations with and without the pacing "
+        "reasoning breakdown, and slotted vs dict-backed state object sizes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=5000)
+        parser.add_argument('--history', type=int, default=20, help='Previous answers in the session')
+
+    def handle(self, *args, **opts):
+        engine = AdaptiveLearningEngine()
+
+        self.stdout.write(f"{'object':<20}{'dict-backed B':>15}{'slotted B':>12}")
+        for name, legacy, slotted in _layout_rows(engine):
+            self.stdout.write(f"{name:<20}{legacy:>15}{slotted:>12}")
+
+        self.stdout.write('')
+        self.stdout.write(f"{'process_answer':<16}{'us/answer':>11}{'blocks/answer':>15}{'bytes/answer':>14}{'peak B':>10}")
+        for explain in (True, False):
+            r = measure(engine, explain, opts['iterations'], opts['history'])
+            self.stdout.write(f"{r['mode']:<16}{r['us_per_answer']:>11.1f}{r['blocks_per_answer']:>15.1f}"
+                              f"{r['bytes_per_answer']:>14.0f}{r['peak_bytes']:>10}")
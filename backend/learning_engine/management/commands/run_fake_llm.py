@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from learning_engine.fake_llm import FakeLLMConfig, make_server, parse_latency
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the local fake LLM provider (Groq chat-completions + Gemini generateContent). "
+        "Point the app at it with FAKE_LLM_URL=http://<host>:<port>."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--latency', default='lognormal:600,0.5',
+                            help="constant:<ms> | uniform:<lo>,<hi> | normal:<mean>,<sd> | lognormal:<median>,<sigma>")
+        parser.add_argument('--token-delay', type=float, default=15.0,
+                            help='Milliseconds between streamed chunks')
+        parser.add_argument('--error-rate', type=float, default=0.0,
+                            help='Fraction of requests that fail with an injected HTTP error')
+        parser.add_argument('--error-codes', default='429,500,503',
+                            help='Comma-separated status codes used for injected errors')
+        parser.add_argument('--malformed-rate', type=float, default=0.0,
+                            help='Fraction of 200 responses with truncated (unparseable) content')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        try:
+            parse_latency(options['latency'])
+            error_codes = [int(c) for c in options['error_codes'].split(',') if c.strip()]
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        config = FakeLLMConfig(
+            latency=options['latency'],
+            token_delay_ms=options['token_delay'],
+            error_rate=options['error_rate'],
+            error_codes=error_codes,
+            malformed_rate=options['malformed_rate'],
+            seed=options['seed'],
+        )
+        server = make_server(config, options['host'], options['port'])
+        host, port = server.server_address[:2]
+        self.stdout.write(self.style.SUCCESS(
+            f"Fake LLM provider on http://{host}:{port} (latency={config.latency}, "
+            f"error_rate={config.error_rate}, malformed_rate={config.malformed_rate})"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
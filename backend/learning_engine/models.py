@@ -33,7 +33,7 @@ class PacingDecision(str, Enum):
     RETREAT = "retreat"
 
 
-@dataclass
+@dataclass(slots=True)
 class TeachingAtomState:
     """Represents a teaching atom's state in memory — enriched for the 10-feature pacing engine."""
     id: int
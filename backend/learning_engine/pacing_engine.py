@@ -21,6 +21,8 @@ from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple
 
+from .timeseries import VelocitySeries
+
 
 # ════════════════════════════════════════════════════════════════
 #  Enums
@@ -55,9 +57,10 @@ class FatigueLevel(str, Enum):
 
 # ════════════════════════════════════════════════════════════════
 #  Data classes
+#  Slotted: one context and one result are built per submitted answer
 # ════════════════════════════════════════════════════════════════
 
-@dataclass
+@dataclass(slots=True)
 class PacingContext:
     """All signals the pacing engine consumes for one decision."""
     # Core performance
@@ -102,12 +105,12 @@ class PacingContext:
     diagnostic_pacing: Optional[str] = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PacingResult:
     """Rich result returned by the engine."""
     decision: PacingDecision
     next_action: NextAction
-    reasoning: Dict[str, Any]
+    reasoning: Dict[str, Any]               # full explanation, or just primary_factors / severity
     fatigue: FatigueLevel
     recommended_difficulty: str
     mastery_verdict: str                    # "not_reached" | "approaching" | "reached" | "exceeded"
@@ -178,55 +181,65 @@ class PacingEngine:
     #  PUBLIC API
     # ────────────────────────────────────────────────────────────
 
-    def decide_pacing(self, ctx: PacingContext) -> PacingResult:
-        """Full-featured pacing decision."""
-
-        reasoning: Dict[str, Any] = {
-            "accuracy": ctx.accuracy,
-            "mastery": ctx.mastery_score,
-            "streak": ctx.streak,
-            "primary_factors": [],
-            "error_analysis": {},
-            "fatigue_factors": [],
-            "retention_factors": [],
-            "hint_factors": [],
-            "velocity_factors": [],
-        }
+    def decide_pacing(self, ctx: PacingContext, explain: bool = True) -> PacingResult:
+        """
+        Full-featured pacing decision.
+
+        explain=False skips the explanatory entries of ``reasoning`` (signal
+        breakdowns), keeping only primary_factors / severity — the decision
+        itself is identical.
+        """
+
+        reasoning: Dict[str, Any] = {"primary_factors": []}
+        if explain:
+            reasoning.update({
+                "accuracy": ctx.accuracy,
+                "mastery": ctx.mastery_score,
+                "streak": ctx.streak,
+                "error_analysis": {},
+                "fatigue_factors": [],
+                "retention_factors": [],
+                "hint_factors": [],
+                "velocity_factors": [],
+            })
 
         # ── 1  Diagnostic baseline (feature 1) ─────────────────
-        initial_band, initial_pace = self._diagnostic_baseline(ctx)
-        reasoning["diagnostic_baseline"] = {
-            "initial_difficulty_band": initial_band,
-            "initial_pace": initial_pace,
-        }
+        if explain:
+            initial_band, initial_pace = self._diagnostic_baseline(ctx)
+            reasoning["diagnostic_baseline"] = {
+                "initial_difficulty_band": initial_band,
+                "initial_pace": initial_pace,
+            }
 
         # ── 2  Learning speed analysis (feature 2) ─────────────
         speed_signal = self._learning_speed_signal(ctx)
-        reasoning["learning_speed"] = speed_signal
 
         # ── 3  Error-type analysis (feature 3) ─────────────────
         error_signal = self._error_type_signal(ctx)
-        reasoning["error_analysis"] = error_signal
 
         # ── 7  Hint depth analysis (feature 7) ─────────────────
         hint_signal = self._hint_depth_signal(ctx)
-        reasoning["hint_factors"] = hint_signal
 
         # ── 8  Fatigue detection (feature 8) ───────────────────
         fatigue_level = self._detect_fatigue(ctx)
-        reasoning["fatigue_level"] = fatigue_level.value
 
         # ── 6  Retention check (feature 6) ─────────────────────
         retention_action = self._retention_signal(ctx)
-        reasoning["retention_action"] = retention_action
 
         # ── 9  Engagement / interest signal (feature 9) ────────
         engagement_adj = self._engagement_signal(ctx)
-        reasoning["engagement_adjustment"] = engagement_adj
 
         # ── 10  Velocity snapshot (feature 10) ─────────────────
-        velocity = self._velocity_snapshot(ctx, speed_signal)
-        reasoning["velocity_snapshot"] = velocity
+        velocity = self._velocity_snapshot(ctx, speed_signal, fatigue_level)
+
+        if explain:
+            reasoning["learning_speed"] = speed_signal
+            reasoning["error_analysis"] = error_signal
+            reasoning["hint_factors"] = hint_signal
+            reasoning["fatigue_level"] = fatigue_level.value
+            reasoning["retention_action"] = retention_action
+            reasoning["engagement_adjustment"] = engagement_adj
+            reasoning["velocity_snapshot"] = velocity
 
         # ── 4  Core adaptive pacing rules (feature 4) ──────────
         decision, next_action = self._core_pacing_rules(
@@ -820,20 +833,21 @@ class PacingEngine:
     #  FEATURE 10 — Learning velocity graph data
     # ────────────────────────────────────────────────────────────
 
-    def _velocity_snapshot(self, ctx: PacingContext, speed_signal: Dict) -> Dict[str, float]:
+    def _velocity_snapshot(self, ctx: PacingContext, speed_signal: Dict,
+                           fatigue: Optional[FatigueLevel] = None) -> Dict[str, float]:
         return {
             "mastery": round(ctx.mastery_score, 3),
             "theta": round(ctx.theta, 3),
             "accuracy": round(ctx.accuracy, 3),
             "speed_ratio": speed_signal.get("speed_ratio", 1.0),
             "questions_answered": ctx.questions_answered,
-            "fatigue_score": self._fatigue_numeric(ctx),
+            "fatigue_score": self._fatigue_numeric(ctx, fatigue),
             "engagement": round(ctx.engagement_score, 3),
             "hint_dependency": round(ctx.hint_usage_count / max(ctx.questions_answered, 1), 3),
         }
 
-    def _fatigue_numeric(self, ctx: PacingContext) -> float:
-        f = self._detect_fatigue(ctx)
+    def _fatigue_numeric(self, ctx: PacingContext, fatigue: Optional[FatigueLevel] = None) -> float:
+        f = fatigue if fatigue is not None else self._detect_fatigue(ctx)
         mapping = {
             FatigueLevel.FRESH: 0.0,
             FatigueLevel.MILD: 0.25,
@@ -843,7 +857,10 @@ class PacingEngine:
         }
         return mapping.get(f, 0.0)
 
-    def compute_velocity_graph(self, snapshots: List[Dict[str, float]]) -> Dict[str, Any]:
+    def compute_velocity_graph(self, snapshots, zoom: str = 'raw') -> Dict[str, Any]:
+        """Trend summary of a VelocitySeries at the `zoom` tier (raw / minute / session), or of snapshot dicts."""
+        if isinstance(snapshots, VelocitySeries):
+            snapshots = snapshots.points(zoom)
         if not snapshots:
             return {"points": [], "trend": "none", "avg_velocity": 0.0}
 
@@ -3,25 +3,22 @@
 import json
 import os
 from typing import Dict, List, Optional
-from groq import Groq
-from google import genai
 from django.conf import settings
 import re   
 
+from .llm_clients import make_genai_client, make_groq_client
+
 class QuestionGenerator:
     """Generate questions and atoms for learning using AI"""
     
     def __init__(self):
         # Initialize Groq client
         groq_key = getattr(settings, 'GROQ_API_KEY', '')
-        self.groq_client = Groq(api_key=groq_key) if groq_key else None
+        self.groq_client = make_groq_client(groq_key)
         
         # Initialize Gemini client
         gemini_key = getattr(settings, 'GOOGLE_API_KEY', '')
-        if gemini_key:
-            self.gemini_client = genai.Client(api_key=gemini_key)
-        else:
-            self.gemini_client = None
+        self.gemini_client = make_genai_client(gemini_key)
 
     @staticmethod
     def _validate_questions(questions: list) -> list:
@@ -0,0 +1,164 @@
+# backend/learning_engine/timeseries.py
+# Bounded velocity time series (Feature 10 storage).
+# One series per learning session and per (student, atom): fixed columns held
+# as float32 ring buffers at three resolutions
+#   - raw:     the last RAW_POINTS answers
+#   - minute:  per-minute means, the last MINUTE_POINTS minutes
+#   - session: per-session means, the last SESSION_POINTS sessions
+# so a learner's lifetime costs the same bytes as their first week. The
+# coarser tiers keep a running sum for the open bucket and push its mean when
+# the bucket closes. Stored as a compact binary blob (encode / decode).
+
+import struct
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+COLUMNS = ('mastery', 'theta', 'accuracy', 'speed_ratio', 'questions_answered',
+           'fatigue_score', 'engagement', 'hint_dependency', 'time_taken')
+RAW_POINTS = 64
+MINUTE_POINTS = 60
+SESSION_POINTS = 50
+TIERS = ('raw', 'minute', 'session')
+
+_MAGIC = b'VS'
+_VERSION = 1
+_HEADER = struct.Struct('<2sBB')          # magic, version, column count
+_COUNT = struct.Struct('<H')
+_BUCKET = struct.Struct('<?dqdI')         # open, first t, key, last t, n
+
+
+class _Ring:
+    """Fixed-capacity ring of (t, row) points."""
+
+    __slots__ = ('t', 'v', 'head', 'count')
+
+    def __init__(self, capacity: int):
+        self.t = np.zeros(capacity, dtype=np.float64)
+        self.v = np.zeros((capacity, len(COLUMNS)), dtype=np.float32)
+        self.head = 0
+        self.count = 0
+
+    def push(self, t: float, row) -> None:
+        self.t[self.head] = t
+        self.v[self.head] = row
+        self.head = (self.head + 1) % len(self.t)
+        self.count = min(self.count + 1, len(self.t))
+
+    def ordered(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Oldest-first copies of the filled part."""
+        if self.count < len(self.t):
+            return self.t[:self.count].copy(), self.v[:self.count].copy()
+        return np.roll(self.t, -self.head), np.roll(self.v, -self.head, axis=0)
+
+    def load(self, t: np.ndarray, v: np.ndarray) -> None:
+        n = min(len(t), len(self.t))
+        self.t[:n], self.v[:n] = t[len(t) - n:], v[len(v) - n:]
+        self.count, self.head = n, n % len(self.t)
+
+
+class _Bucket:
+    """Running mean of the points sharing one key (a minute, a session)."""
+
+    __slots__ = ('key', 'first', 'last', 'n', 'total')
+
+    def __init__(self):
+        self.key = None
+        self.first = self.last = 0.0
+        self.n = 0
+        self.total = np.zeros(len(COLUMNS), dtype=np.float64)
+
+    def mean(self) -> np.ndarray:
+        return (self.total / max(self.n, 1)).astype(np.float32)
+
+
+class VelocitySeries:
+    def __init__(self):
+        self.tiers = {'raw': _Ring(RAW_POINTS), 'minute': _Ring(MINUTE_POINTS), 'session': _Ring(SESSION_POINTS)}
+        self.buckets = {'minute': _Bucket(), 'session': _Bucket()}
+
+    def __len__(self):
+        return self.tiers['raw'].count
+
+    def append(self, t: float, values: Mapping[str, float], session_id: Optional[int] = None) -> None:
+        """Record one point at unix time t; missing columns count as 0."""
+        row = np.array([float(values.get(c) or 0.0) for c in COLUMNS], dtype=np.float64)
+        self.tiers['raw'].push(t, row)
+        self._accumulate('minute', int(t // 60), t, row)
+        self._accumulate('session', -1 if session_id is None else int(session_id), t, row)
+
+    def _accumulate(self, tier: str, key: int, t: float, row: np.ndarray) -> None:
+        bucket = self.buckets[tier]
+        if bucket.n and bucket.key != key:
+            self.tiers[tier].push(bucket.first, bucket.mean())
+            bucket.n, bucket.total[:] = 0, 0.0
+        if not bucket.n:
+            bucket.key, bucket.first = key, t
+        bucket.last = t
+        bucket.n += 1
+        bucket.total += row
+
+    def arrays(self, tier: str = 'raw') -> Tuple[np.ndarray, np.ndarray]:
+        """(timestamps, values[n, len(COLUMNS)]) oldest first; coarse tiers end with the open bucket."""
+        t, v = self.tiers[tier].ordered()
+        bucket = self.buckets.get(tier)
+        if bucket is not None and bucket.n:
+            t, v = np.append(t, bucket.first), np.vstack([v, bucket.mean()])
+        return t, v
+
+    def points(self, tier: str = 'raw', columns: Iterable[str] = COLUMNS) -> List[Dict[str, float]]:
+        """JSON-ready points: {'timestamp': unix seconds, column: value, ...}."""
+        columns = list(columns)
+        index = [COLUMNS.index(c) for c in columns]
+        t, v = self.arrays(tier)
+        values = np.round(v[:, index].astype(np.float64), 3).tolist()
+        return [dict(zip(columns, row), timestamp=ts) for ts, row in zip(t.tolist(), values)]
+
+    # ── binary form ─────────────────────────────────────────────
+
+    def encode(self) -> bytes:
+        parts = [_HEADER.pack(_MAGIC, _VERSION, len(COLUMNS))]
+        for tier in TIERS:
+            t, v = self.tiers[tier].ordered()
+            parts += [_COUNT.pack(len(t)), t.tobytes(), v.tobytes()]
+        for tier in ('minute', 'session'):
+            b = self.buckets[tier]
+            parts += [_BUCKET.pack(bool(b.n), b.first, b.key or 0, b.last, b.n), b.total.tobytes()]
+        return b''.join(parts)
+
+    @classmethod
+    def decode(cls, data: Optional[bytes]) -> 'VelocitySeries':
+        """Series from encode() output; empty for None / b''."""
+        series = cls()
+        if not data:
+            return series
+        data = bytes(data)
+        magic, version, width = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION or width != len(COLUMNS):
+            raise ValueError('Unsupported velocity series encoding')
+        offset = _HEADER.size
+        for tier in TIERS:
+            n, = _COUNT.unpack_from(data, offset)
+            offset += _COUNT.size
+            t = np.frombuffer(data, np.float64, n, offset)
+            offset += 8 * n
+            v = np.frombuffer(data, np.float32, n * width, offset).reshape(n, width)
+            offset += 4 * n * width
+            series.tiers[tier].load(t, v)
+        for tier in ('minute', 'session'):
+            is_open, first, key, last, n = _BUCKET.unpack_from(data, offset)
+            offset += _BUCKET.size
+            bucket = series.buckets[tier]
+            bucket.total[:] = np.frombuffer(data, np.float64, width, offset)
+            offset += 8 * width
+            if is_open:
+                bucket.key, bucket.first, bucket.last, bucket.n = key, first, last, n
+        return series
+
+
+def append_point(blob: Optional[bytes], t: float, values: Mapping[str, float],
+                 session_id: Optional[int] = None) -> bytes:
+    """decode → append → encode, for model fields holding a series."""
+    series = VelocitySeries.decode(blob)
+    series.append(t, values, session_id)
+    return series.encode()
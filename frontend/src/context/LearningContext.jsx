@@ -5,6 +5,9 @@ import axios from '../axiosConfig';
 
 const LearningContext = createContext(null);
 
+const RESOURCE_POLL_INTERVAL_MS = 1500;
+const RESOURCE_POLL_ATTEMPTS = 20;
+
 export const LearningProvider = ({ children }) => {
     const [currentSession, setCurrentSession] = useState(null);
     const [currentAtom, setCurrentAtom] = useState(null);
@@ -50,6 +53,34 @@ export const LearningProvider = ({ children }) => {
     // Race-condition guard: track latest generation request
     const latestQuestionGenId = useRef(0);
 
+    // Resources are searched in the background: poll the handle the teaching
+    // response carries and merge videos/images in once it is 'ready'.
+    // Starting a new poll (or a new atom) abandons the previous one.
+    const latestResourcePoll = useRef(0);
+
+    const pollResources = useCallback(async (handle) => {
+        const pollId = ++latestResourcePoll.current;
+        if (!handle?.id || handle.status === 'ready') return;
+        for (let attempt = 0; attempt < RESOURCE_POLL_ATTEMPTS; attempt++) {
+            await new Promise(resolve => setTimeout(resolve, RESOURCE_POLL_INTERVAL_MS));
+            if (pollId !== latestResourcePoll.current) return;
+            try {
+                const response = await axios.get(`/auth/api/resource-status/${handle.id}/`);
+                if (pollId !== latestResourcePoll.current) return;
+                if (response.data?.status === 'ready') {
+                    setTeachingContent(prev => prev && ({
+                        ...prev,
+                        videos: Array.isArray(response.data.videos) ? response.data.videos : [],
+                        images: Array.isArray(response.data.images) ? response.data.images : [],
+                    }));
+                    return;
+                }
+            } catch (error) {
+                return;
+            }
+        }
+    }, []);
+
     // Generate atoms for a concept (no questions)
     const generateConcept = useCallback(async (subject, concept, knowledgeLevel = 'intermediate') => {
         setLoading(true);
@@ -128,6 +159,7 @@ export const LearningProvider = ({ children }) => {
             };
 
             setTeachingContent(normalized);
+            pollResources(response.data?.resources);
             setCurrentAtom({
                 id: atom_id,
                 name: response.data?.atom_name || response.data?.name || raw.atom_name || raw.name,
@@ -147,7 +179,7 @@ export const LearningProvider = ({ children }) => {
         } finally {
             setLoading(false);
         }
-    }, []);
+    }, [pollResources]);
 
     // Generate questions based on teaching content
     const generateQuestionsFromTeaching = useCallback(async ({ session_id, atom_id, force_new = false }) => {
@@ -639,10 +671,11 @@ export const LearningProvider = ({ children }) => {
                 misconception: raw.misconception || examples[2] || '',
                 practical_application: raw.practical_application || examples[1] || '',
                 examples: examples,
-                videos: [],
-                images: [],
+                videos: Array.isArray(response.data?.videos) ? response.data.videos : [],
+                images: Array.isArray(response.data?.images) ? response.data.images : [],
             };
             setTeachingContent(normalized);
+            pollResources(response.data?.resources);
             if (response.data.updated_mastery !== undefined) {
                 setAtomMastery(response.data.updated_mastery);
             }
@@ -655,7 +688,7 @@ export const LearningProvider = ({ children }) => {
         } finally {
             setLoading(false);
         }
-    }, []);
+    }, [pollResources]);
 
     const getAllAtomsMastery = useCallback(async ({ session_id, concept_id }) => {
         setLoading(true);